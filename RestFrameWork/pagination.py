@@ -0,0 +1,61 @@
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+
+# ✅ Keyset (cursor) pagination on (reservation_start, id)
+def encode_cursor(reservation_start, pk):
+    raw = json.dumps([reservation_start.isoformat(), pk]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        start, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        start = parse_datetime(start)
+        if start is None:
+            raise ValueError(cursor)
+        return start, int(pk)
+    except (ValueError, TypeError):
+        raise ValidationError({"cursor": "Invalid cursor."})
+
+
+def _after_cursor(queryset, cursor):
+    queryset = queryset.order_by('reservation_start', 'id')
+    if cursor:
+        start, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(reservation_start__gt=start) | Q(reservation_start=start, id__gt=pk)
+        )
+    return queryset
+
+
+def instance_key(reservation):
+    return reservation.reservation_start, reservation.pk
+
+
+def _split_page(rows, limit, key):
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*key(rows[-1]))
+
+
+def keyset_page(queryset, cursor=None, limit=50, key=instance_key):
+    """Return ``(rows, next_cursor)`` for the page after ``cursor``.
+
+    Pages are fetched with ``WHERE (start, id) > (cursor)`` instead of OFFSET,
+    so the cost of a page does not grow with how deep the client has scrolled.
+    ``key`` reads ``(reservation_start, pk)`` from a row, for ``values_list()``
+    querysets.
+    """
+    return _split_page(list(_after_cursor(queryset, cursor)[:limit + 1]), limit, key)
+
+
+async def akeyset_page(queryset, cursor=None, limit=50, key=instance_key):
+    """Async counterpart of :func:`keyset_page`."""
+    rows = [row async for row in _after_cursor(queryset, cursor)[:limit + 1]]
+    return _split_page(rows, limit, key)
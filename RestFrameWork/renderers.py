@@ -0,0 +1,78 @@
+import math
+from itertools import chain
+
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # Optional: the stdlib encoder is used instead
+    orjson = None
+
+
+def _has_non_finite_float(data):
+    """``True`` when ``data`` holds NaN or an infinity, which orjson writes as ``null``.
+
+    Walks one nesting level at a time so the per-value work stays in C.
+    """
+    level = [data]
+    while level:
+        kinds = set(map(type, level))
+        if any(issubclass(kind, float) for kind in kinds):
+            if not all(map(math.isfinite, [value for value in level if isinstance(value, float)])):
+                return True
+        nested = []
+        if any(issubclass(kind, dict) for kind in kinds):
+            nested.extend(chain.from_iterable(value.values() for value in level if isinstance(value, dict)))
+        if any(issubclass(kind, (list, tuple)) for kind in kinds):
+            nested.extend(chain.from_iterable(value for value in level if isinstance(value, (list, tuple))))
+        level = nested
+    return False
+
+
+# ✅ JSON renderer that encodes with orjson when it is installed
+class FastJSONRenderer(JSONRenderer):
+    """The output of DRF's ``JSONRenderer``, encoded by orjson when it can be.
+
+    DRF's encoder still renders indented output, ``UNICODE_JSON = False``,
+    ``COMPACT_JSON = False``, data holding NaN or infinities (so they raise
+    ``ValueError`` under ``STRICT_JSON``) and anything orjson rejects. Dates
+    and times are handed back to DRF's encoder, which writes UTC as ``Z``
+    where orjson would write ``+00:00``.
+
+    One difference remains: floats of 1e16 and above or below 1e-4 keep
+    orjson's notation, e.g. ``1e16`` and ``1e-7`` or ``0.00001`` where DRF
+    writes ``1e+16``, ``1e-07`` and ``1e-05``. They parse to the same values.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or self.ensure_ascii or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        encode = self.encoder_class().default
+
+        def default(value):
+            encoded = encode(value)
+            if _has_non_finite_float(encoded):  # e.g. Decimal('NaN')
+                raise TypeError(f"{encoded!r} is left to DRF's encoder")
+            return encoded
+
+        try:
+            body = orjson.dumps(data, default=default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except TypeError:  # Lazy strings, big integers, lone surrogates, ... are left to DRF's encoder
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'null' in body and _has_non_finite_float(data):  # Or None; DRF raises on NaN and infinities
+            return super().render(data, accepted_media_type, renderer_context)
+        # DRF escapes U+2028 and U+2029 so the output is also valid JavaScript
+        return body.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+def dumps(data):
+    """Compact UTF-8 JSON bytes, the same as a ``FastJSONRenderer`` response body."""
+    return FastJSONRenderer().render(data)
+
+
+def json_response(data, status=200):
+    return HttpResponse(dumps(data), status=status, content_type='application/json')
@@ -1,11 +1,32 @@
 from rest_framework import serializers
+from rest_framework.fields import ISO_8601
+from rest_framework.settings import api_settings
+from django.conf import settings
 from django.utils import timezone
 from rest_framework.exceptions import ValidationError
 from Resturant.models import Table_Reservation, Table
+from Resturant.availability import is_table_available
+from Resturant.rules import validate_window
+from django.core.exceptions import ValidationError as DjangoValidationError
 from datetime import datetime
 
 
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Resolve ids from ``context['preloaded'][Model]`` before querying the database."""
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get('preloaded', {}).get(self.get_queryset().model)
+        if preloaded is not None:
+            try:
+                return preloaded[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+        return super().to_internal_value(data)
+
+
 class Table_Reservation_Serializer(serializers.ModelSerializer):
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
+
     class Meta:
         model = Table_Reservation
         fields = "__all__"
@@ -29,37 +50,22 @@ class Table_Reservation_Serializer(serializers.ModelSerializer):
         if 'reservation_start' in data and 'reservation_end' in data:
             reservation_start = data['reservation_start']
             reservation_end = data['reservation_end']
-            now = timezone.now()
-
-            # Make sure reservation times are timezone-aware or naive consistently
-            if reservation_start.tzinfo is None:
-                reservation_start = timezone.make_aware(reservation_start)
-            if reservation_end.tzinfo is None:
-                reservation_end = timezone.make_aware(reservation_end)
-
-            if reservation_start >= reservation_end:
-                raise ValidationError("Reservation start must be before reservation end.")
-            if reservation_start < now:
-                raise ValidationError("Reservation start must be in the future.")
-            # Restrict reservation hours between 8 and 23
-            if not (8 <= reservation_start.hour <= 23):
-                raise ValidationError("Reservations can only be made between 08:00 and 23:00 hours.")
+            try:
+                validate_window(reservation_start, reservation_end)
+            except DjangoValidationError as error:
+                raise ValidationError(error.messages)
 
         # Check for overlapping reservations on the same table
+        # (batch requests check the whole batch against the database instead)
+        if self.context.get('skip_overlap_check'):
+            return data
         if 'table' in data and 'reservation_start' in data and 'reservation_end' in data:
             table = data['table']
             reservation_start = data['reservation_start']
             reservation_end = data['reservation_end']
 
-            overlapping_reservations = Table_Reservation.objects.filter(
-                table=table,
-                reservation_start__lt=reservation_end,
-                reservation_end__gt=reservation_start,
-            )
-            if instance:
-                overlapping_reservations = overlapping_reservations.exclude(id=instance.id)
-
-            if overlapping_reservations.exists():
+            exclude_pk = instance.id if instance else None
+            if not is_table_available(table, reservation_start, reservation_end, exclude_pk=exclude_pk):
                 raise ValidationError("The table is already reserved for the specified date and time range.")
 
         return data
@@ -69,3 +75,71 @@ class TableSerializer(serializers.ModelSerializer):
     class Meta:
         model = Table
         fields = "__all__"
+
+
+# ✅ Read-only fast path: ``values_list()`` rows encoded without per-instance Field objects
+class CompactRowSerializer:
+    """Encode ``values_list`` rows exactly as ``serializer_class`` encodes instances.
+
+    The columns are derived from the serializer's fields, so the output keys
+    and values match ``serializer_class(...).data``. Only ``DateTimeField``
+    needs converting; every other model field is passed through as loaded.
+    """
+
+    def __init__(self, serializer_class):
+        fields = serializer_class().fields
+        model = serializer_class.Meta.model
+        self.fields = tuple(fields)
+        self.columns = tuple(model._meta.get_field(field.source).attname for field in fields.values())
+        self.datetimes = tuple(
+            (position, field) for position, field in enumerate(fields.values())
+            if isinstance(field, serializers.DateTimeField)
+        )
+
+    def project(self, queryset):
+        return queryset.values_list(*self.columns)
+
+    def index(self, column):
+        return self.columns.index(column)
+
+    def _encoders(self):
+        encoders = []
+        current = timezone.get_current_timezone()
+        for position, field in self.datetimes:
+            output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+            if settings.USE_TZ and output_format and output_format.lower() == ISO_8601 \
+                    and not hasattr(field, 'timezone'):
+                encoders.append((position, lambda value: _isoformat(value, current)))
+            else:
+                encoders.append((position, field.to_representation))
+        return encoders
+
+    def encode(self, rows):
+        """Yield each row as a list of JSON-ready values in ``self.fields`` order."""
+        encoders = self._encoders()
+        for row in rows:
+            row = list(row)
+            for position, encoder in encoders:
+                row[position] = encoder(row[position])
+            yield row
+
+    def as_dicts(self, rows):
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in self.encode(rows)]
+
+    def as_columns(self, rows):
+        """One array per field (parallel arrays) instead of one object per row."""
+        encoded = list(self.encode(rows))
+        if not encoded:
+            return {field: [] for field in self.fields}
+        return dict(zip(self.fields, map(list, zip(*encoded))))
+
+
+def _isoformat(value, tz):
+    if not value:
+        return None
+    value = value.astimezone(tz).isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+reservation_rows = CompactRowSerializer(Table_Reservation_Serializer)
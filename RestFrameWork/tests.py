@@ -1,3 +1,313 @@
+import json
+import uuid
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from asgiref.sync import sync_to_async
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from Resturant.availability import engine
+from Resturant.models import Table, Table_Reservation
+from RestFrameWork.renderers import FastJSONRenderer
+from RestFrameWork.serializers import Table_Reservation_Serializer, reservation_rows
+
+
+# ------------------ Compact Serializer ------------------
+class CompactRowSerializerTests(TestCase):
+
+    def setUp(self):
+        engine.reset()
+        self.user = User.objects.create(username='admin', is_staff=True)
+        start = timezone.make_aware(datetime(2030, 1, 7, 12, 0))
+        for index in range(3):
+            table = Table.objects.create(name=f'Table {index}', seats=4)
+            Table_Reservation.objects.create(
+                user=self.user, table=table, number_of_party=2, special_order='window' if index else None,
+                reservation_start=start + timedelta(days=index),
+                reservation_end=start + timedelta(days=index, hours=2),
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_rows_match_model_serializer(self):
+        queryset = Table_Reservation.objects.order_by('pk')
+        self.assertEqual(
+            reservation_rows.as_dicts(reservation_rows.project(queryset)),
+            Table_Reservation_Serializer(queryset, many=True).data,
+        )
+
+    def test_listing_pages_and_columns(self):
+        first = self.client.get('/api/', {'limit': 2}).json()
+        self.assertEqual(len(first['results']), 2)
+        rest = self.client.get('/api/', {'limit': 2, 'cursor': first['next_cursor']}).json()
+        self.assertEqual([row['id'] for row in rest['results']], [Table_Reservation.objects.order_by('pk').last().pk])
+
+        columns = self.client.get('/api/', {'layout': 'columns'}).json()['results']
+        self.assertEqual(columns['id'], [row['id'] for row in first['results'] + rest['results']])
+        self.assertEqual(set(columns), set(reservation_rows.fields))
+
+
+# ------------------ Reservation Listing ------------------
+class ReservationStreamTests(TestCase):
+
+    def setUp(self):
+        engine.reset()
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.guest = User.objects.create(username='guest')
+        self.tables = [Table.objects.create(name=f'Table {index}', seats=4) for index in range(2)]
+        start = timezone.make_aware(datetime(2030, 1, 7, 12, 0))
+        for day in range(3):
+            for table in self.tables:
+                Table_Reservation.objects.create(
+                    user=self.guest if day else self.admin, table=table, number_of_party=2,
+                    reservation_start=start + timedelta(days=day),
+                    reservation_end=start + timedelta(days=day, hours=2),
+                )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def stream(self, **params):
+        response = self.client.get(reverse('reservation-list'), dict(params, stream='ndjson'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        body = b''.join(response.streaming_content).decode()
+        self.assertTrue(body.endswith('\n'))
+        return [json.loads(line) for line in body.splitlines()]
+
+    def test_one_record_per_line(self):
+        records = self.stream()
+        queryset = Table_Reservation.objects.order_by('reservation_start', 'id')
+        self.assertEqual(records, list(Table_Reservation_Serializer(queryset, many=True).data))
+
+    def test_filters_apply(self):
+        table = self.tables[1]
+        records = self.stream(table=table.pk, user=self.guest.pk, start_date='2030-01-08', end_date='2030-01-08')
+        self.assertEqual([(record['table'], record['user']) for record in records], [(table.pk, self.guest.pk)])
+        self.assertEqual(records[0]['reservation_start'], '2030-01-08T12:00:00Z')
+
+        self.assertEqual(len(self.stream(start_date='2030-01-08')), 4)
+        self.assertEqual(self.client.get(reverse('reservation-list'), {'stream': 'ndjson', 'table': 'x'}).status_code, 400)
+
+
+class AsyncReservationListTests(TestCase):
+
+    def setUp(self):
+        engine.reset()
+        self.admin = User.objects.create(username='admin', is_staff=True)
+        self.guest = User.objects.create(username='guest')
+        table = Table.objects.create(name='Patio', seats=4)
+        start = timezone.make_aware(datetime(2030, 1, 7, 12, 0))
+        for day in range(3):
+            Table_Reservation.objects.create(
+                user=self.guest, table=table, number_of_party=2,
+                reservation_start=start + timedelta(days=day), reservation_end=start + timedelta(days=day, hours=2),
+            )
+
+    def bearer(self, user):
+        return {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+    async def both(self, headers, params=None):
+        """``(sync, async)`` responses of the listing for the same request."""
+        sync = await sync_to_async(self.client.get)(reverse('reservation-list'), params, headers=headers)
+        response = await self.async_client.get(reverse('reservation-list-async'), params, headers=headers)
+        return sync, response
+
+    async def test_pages_match_sync(self):
+        sync, response = await self.both(self.bearer(self.admin), {'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), sync.json())
+        cursor = response.json()['next_cursor']
+        for params in ({'limit': 2, 'cursor': cursor}, {'limit': 2, 'layout': 'columns'}, {'start_date': '2030-01-08'}):
+            sync, response = await self.both(self.bearer(self.admin), params)
+            self.assertEqual(response.json(), sync.json())
+        self.assertEqual(len(response.json()['results']), 2)
+
+    async def test_auth_failures_match_sync(self):
+        for headers in ({}, {'Authorization': 'Bearer not-a-token'}, self.bearer(self.guest)):
+            with self.subTest(headers=headers):
+                sync, response = await self.both(headers)
+                self.assertEqual(response.status_code, sync.status_code)
+                self.assertEqual(response.json(), sync.json())
+                self.assertEqual(response.get('WWW-Authenticate'), sync.get('WWW-Authenticate'))
+
+    async def test_bad_parameters(self):
+        sync, response = await self.both(self.bearer(self.admin), {'limit': 'x'})
+        self.assertEqual((response.status_code, response.json()), (400, sync.json()))
+
+
+# ------------------ Batch Reservations ------------------
+class BatchReservationViewTests(TestCase):
+
+    def setUp(self):
+        engine.reset()
+        self.user = User.objects.create(username='diner')
+        self.table = Table.objects.create(name='Patio', seats=4)
+        self.start = timezone.make_aware(datetime(2030, 1, 7, 12, 0))
+        self.reservation = Table_Reservation.objects.create(
+            user=self.user, table=self.table, number_of_party=2,
+            reservation_start=self.start, reservation_end=self.start + timedelta(hours=2),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def item(self, start_hours, **extra):
+        return dict({
+            'table': self.table.pk, 'number_of_party': 2,
+            'reservation_start': (self.start + timedelta(hours=start_hours)).isoformat(),
+            'reservation_end': (self.start + timedelta(hours=start_hours + 1)).isoformat(),
+        }, **extra)
+
+    def post(self, items, mode='atomic'):
+        return self.client.post('/api/batch/', {'reservations': items, 'mode': mode}, format='json')
+
+    def test_duplicate_ids_are_rejected(self):
+        response = self.post([self.item(3, id=self.reservation.pk), self.item(5, id=self.reservation.pk)], 'best_effort')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([result['status'] for result in response.json()['results']], ['invalid', 'invalid'])
+        self.assertEqual(Table_Reservation.objects.get().reservation_start, self.start)
+
+    def test_non_scalar_ids_are_rejected(self):
+        response = self.post([self.item(3, table=[self.table.pk]), self.item(5, id=[self.reservation.pk])])
+        self.assertEqual(response.status_code, 400)
+        results = response.json()['results']
+        self.assertEqual([list(result['errors']) for result in results], [['table'], ['id']])
+
+        response = self.post([self.item(3, id={'pk': 1}), self.item(5)], 'best_effort')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([result['status'] for result in response.json()['results']], ['invalid', 'created'])
+
+    def test_update_and_conflict(self):
+        response = self.post([self.item(3, id=self.reservation.pk), self.item(3)])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual([result['status'] for result in response.json()['results']], ['skipped', 'conflict'])
+        self.assertEqual(Table_Reservation.objects.get().reservation_start, self.start)
+
+
+# ------------------ JSON Rendering ------------------
+class FastJSONRendererTests(TestCase):
+
+    def test_output_matches_drf(self):
+        aware = timezone.make_aware(datetime(2030, 1, 7, 12, 30, 15, 123456))
+        data = {
+            'utc': aware,
+            'offset': aware.astimezone(timezone.get_fixed_timezone(120)),
+            'naive': datetime(2030, 1, 7, 12, 30),
+            'date': date(2030, 1, 7),
+            'time': time(12, 30, 15, 500),
+            'decimal': Decimal('12.50'),
+            'uuid': uuid.UUID(int=7),
+            'lazy': gettext_lazy('Table'),
+            'text': 'Café "Ω"\n',
+            'numbers': [0, -1, 2 ** 40, 1.5, 0.1, True, None],
+            'nested': {'empty': {}, 'list': [[], ['a']]},
+        }
+        for value in [data, *data.values(), [], {}]:
+            with self.subTest(value=value):
+                self.assertEqual(FastJSONRenderer().render(value), JSONRenderer().render(value))
+
+    def test_line_separators_are_escaped_like_drf(self):
+        for value in ('line\u2028paragraph\u2029end', {'\u2028key': ['\u2029']}):
+            with self.subTest(value=value):
+                self.assertEqual(FastJSONRenderer().render(value), JSONRenderer().render(value))
+
+    def test_float_notation(self):
+        plain = [0.0, -0.0, 0.0001, 12.5, 1e15, 9999999999999998.0, Decimal('12.50')]
+        self.assertEqual(FastJSONRenderer().render(plain), JSONRenderer().render(plain))
+        # Outside [1e-4, 1e16) only the exponent notation differs
+        scientific = [1e16, 1e-7, 1e-5, -2.5e-9, 1e300, 5e-324, Decimal('1e-7')]
+        fast, drf = FastJSONRenderer().render(scientific), JSONRenderer().render(scientific)
+        self.assertNotEqual(fast, drf)
+        self.assertEqual(json.loads(fast), json.loads(drf))
+
+    def test_non_finite_floats_raise_like_drf(self):
+        for value in (float('nan'), float('inf'), {'rows': [[1.5, -float('inf')]]}, [Decimal('NaN')]):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    JSONRenderer().render(value)
+                with self.assertRaises(ValueError):
+                    FastJSONRenderer().render(value)
+
+    def test_non_default_settings_use_drf(self):
+        data = {'text': 'Café', 'numbers': [1, 2.5]}
+        for options in ({'ensure_ascii': True}, {'compact': False}):
+            with self.subTest(options=options):
+                fast = type('Renderer', (FastJSONRenderer,), options)
+                drf = type('Renderer', (JSONRenderer,), options)
+                self.assertEqual(fast().render(data), drf().render(data))
+
+    def test_check_table_availability_uses_drf_encoding(self):
+        user = User.objects.create(username='host')
+        table = Table.objects.create(name='Patio', seats=4)
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get('/api/api/check-table-availability/', {
+            'table_id': table.pk, 'date': '2030-01-07', 'time': '12:00',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+        self.assertEqual(response.json()['start'], '2030-01-07T12:00:00Z')
+
+
+# ------------------ Table Availability ------------------
+class CheckTableAvailabilityTests(TestCase):
+
+    def setUp(self):
+        engine.reset()
+        self.user = User.objects.create(username='host')
+        self.patio = Table.objects.create(name='Patio', seats=4)
+        self.bar = Table.objects.create(name='Bar', seats=2)
+        # Patio is booked 11:00-13:00
+        start = timezone.make_aware(datetime(2030, 1, 7, 11, 0))
+        Table_Reservation.objects.create(
+            user=self.user, table=self.patio, number_of_party=2,
+            reservation_start=start, reservation_end=start + timedelta(hours=2),
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def check(self, time, table_ids, **params):
+        response = self.client.get(reverse('check-table-availability'), dict(
+            {'table_id': table_ids, 'date': '2030-01-07', 'time': time}, **params
+        ))
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_booking_that_started_earlier_overlaps(self):
+        result = self.check('12:00', [self.patio.pk])
+        self.assertEqual(result['available'], False)
+        self.assertEqual(result['tables'], {str(self.patio.pk): False})
+
+    def test_adjacent_windows_are_free(self):
+        self.assertTrue(self.check('13:00', [self.patio.pk])['available'])
+        self.assertTrue(self.check('09:00', [self.patio.pk])['available'])  # Ends at 11:00
+
+    def test_multiple_tables(self):
+        result = self.check('12:00', [self.patio.pk, self.bar.pk])
+        self.assertEqual(result['tables'], {str(self.patio.pk): False, str(self.bar.pk): True})
+        self.assertFalse(result['available'])
+        # Comma-separated ids work too
+        self.assertEqual(self.check('12:00', f'{self.patio.pk},{self.bar.pk}')['tables'], result['tables'])
+
+    def test_custom_duration(self):
+        self.assertTrue(self.check('10:00', [self.patio.pk], duration=60)['available'])
+        result = self.check('10:00', [self.patio.pk], duration=61)
+        self.assertFalse(result['available'])
+        self.assertEqual((result['start'], result['end']), ('2030-01-07T10:00:00Z', '2030-01-07T11:01:00Z'))
 
-# Create your tests here.
+    def test_invalid_parameters(self):
+        url = reverse('check-table-availability')
+        for params in (
+            {'date': '2030-01-07', 'time': '12:00'},
+            {'table_id': 'x', 'date': '2030-01-07', 'time': '12:00'},
+            {'table_id': self.patio.pk, 'date': '2030-01-07', 'time': '12:00', 'duration': 0},
+            {'table_id': self.patio.pk, 'date': '2030-01-07', 'time': '22:30'},  # Past closing time
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(url, params).status_code, 400)
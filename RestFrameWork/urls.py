@@ -2,10 +2,13 @@ from django.urls import path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from .views import (
     ViewReservationView,
+    reservation_list_async,
     CreateAPIReservationView,
+    BatchReservationView,
     UpdateReservationView,
     autocomplete_table_name,
     check_table_availability,
+    daily_revenue_report,
 )
 
 urlpatterns = [
@@ -15,8 +18,11 @@ urlpatterns = [
 
     # API endpoints for reservations
     path('', ViewReservationView.as_view(), name='reservation-list'),
+    path('async/', reservation_list_async, name='reservation-list-async'),
     path('create/', CreateAPIReservationView.as_view(), name='reservation-create'),
+    path('batch/', BatchReservationView.as_view(), name='reservation-batch'),
     path('update/<int:pk>/', UpdateReservationView.as_view(), name='reservation-update'),
+    path('revenue/', daily_revenue_report, name='revenue-report'),
 
     # Autocomplete endpoint for table names (likely an AJAX GET)
     path('autocomplete-table/', autocomplete_table_name, name='autocomplete-table'),
@@ -1,5 +1,11 @@
+from collections import Counter
+from operator import itemgetter
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db.models import Q
 from django.utils import timezone
 from datetime import datetime, timedelta
@@ -7,18 +13,99 @@ from datetime import datetime, timedelta
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated, PermissionDenied, ValidationError
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.settings import api_settings
 
 from Resturant.models import Table_Reservation, Table
-from RestFrameWork.serializers import Table_Reservation_Serializer, TableSerializer
+from Resturant.booking import book, book_batch, BookingConflict
+from Resturant.autocomplete import table_names
+from Resturant.conditional import make_etag, revalidate
+from Resturant.orders import daily_revenue
+from Resturant.rules import validate_window
+from RestFrameWork.serializers import Table_Reservation_Serializer, TableSerializer, reservation_rows
+from RestFrameWork.pagination import keyset_page, akeyset_page
+from RestFrameWork.renderers import FastJSONRenderer, dumps, json_response
 from rest_framework.decorators import permission_classes,api_view
 
-# ✅ View all reservations (admin/general)
+# ✅ Reads go through the values_list() fast path; ?layout=columns answers parallel arrays
+LAYOUTS = ('rows', 'columns')
+ROW_KEY = itemgetter(reservation_rows.index('reservation_start'), reservation_rows.index('id'))
+
+
+def get_layout(params):
+    layout = params.get('layout', 'rows')
+    if layout not in LAYOUTS:
+        raise ValidationError({"error": f"Invalid layout; choose from {', '.join(LAYOUTS)}"})
+    return layout
+
+
+def encode_rows(rows, layout):
+    if layout == 'columns':
+        return reservation_rows.as_columns(rows)
+    return reservation_rows.as_dicts(rows)
+
+
+# ✅ View all reservations (admin): filtered, keyset-paginated or streamed (?stream=ndjson)
 class ViewReservationView(APIView):
+    permission_classes = [IsAdminUser]
+    # Large pages of plain rows; orjson encodes them without DRF's encoder
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    default_limit = 50
+    max_limit = 500
+    stream_chunk_size = 500
+
+    def get_queryset(self, params):
+        filters = Q()
+        try:
+            if params.get('table'):
+                filters &= Q(table_id=int(params['table']))
+            if params.get('user'):
+                filters &= Q(user_id=int(params['user']))
+            if params.get('start_date'):
+                start_date = datetime.strptime(params['start_date'], '%Y-%m-%d')
+                filters &= Q(reservation_start__gte=timezone.make_aware(start_date))
+            if params.get('end_date'):
+                end_date = datetime.strptime(params['end_date'], '%Y-%m-%d') + timedelta(days=1)
+                filters &= Q(reservation_start__lt=timezone.make_aware(end_date))
+        except ValueError:
+            raise ValidationError({"error": "Invalid table, user or date filter"})
+        return Table_Reservation.objects.filter(filters)
+
+    def get_limit(self, params):
+        try:
+            limit = min(int(params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            raise ValidationError({"error": "Invalid limit"})
+        return limit
+
+    def stream(self, queryset):
+        rows = queryset.order_by('reservation_start', 'id').iterator(chunk_size=self.stream_chunk_size)
+        for row in reservation_rows.encode(rows):
+            yield dumps(dict(zip(reservation_rows.fields, row))) + b"\n"
+
     def get(self, request):
-        reservations = Table_Reservation.objects.all()
-        serializer = Table_Reservation_Serializer(reservations, many=True)
-        return Response(serializer.data, status=200)
+        queryset = reservation_rows.project(self.get_queryset(request.GET))
+
+        if request.GET.get('stream') == 'ndjson':
+            return StreamingHttpResponse(self.stream(queryset), content_type='application/x-ndjson')
+
+        limit = self.get_limit(request.GET)
+        layout = get_layout(request.GET)
+        rows, next_cursor = keyset_page(queryset, request.GET.get('cursor'), limit, key=ROW_KEY)
+        return Response({"results": encode_rows(rows, layout), "next_cursor": next_cursor}, status=200)
+
+
+def book_serializer(serializer, exclude_pk=None):
+    data = serializer.validated_data
+    return book(
+        data['table'], data['reservation_start'], data['reservation_end'],
+        serializer.save, exclude_pk=exclude_pk
+    )
 
 
 # ✅ Create reservation and fetch current user's reservations
@@ -26,21 +113,179 @@ class CreateAPIReservationView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        reservations = Table_Reservation.objects.filter(user=request.user)
-        serializer = Table_Reservation_Serializer(reservations, many=True)
-        return Response(serializer.data, status=200)
+        rows = reservation_rows.project(Table_Reservation.objects.filter(user=request.user))
+        return Response(encode_rows(rows, get_layout(request.GET)), status=200)
 
     def post(self, request):
         data = request.data.copy()
         data['user'] = request.user.id
-        serializer = Table_Reservation_Serializer(data=data)
+        serializer = Table_Reservation_Serializer(data=data, context={'request': request})
 
         if serializer.is_valid():
-            serializer.save()
+            try:
+                book_serializer(serializer)
+            except BookingConflict as error:
+                return Response({"error": str(error)}, status=status.HTTP_409_CONFLICT)
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
 
 
+def unauthorized(request, detail):
+    """401 with the body and ``WWW-Authenticate`` header DRF's sync views send."""
+    if not isinstance(detail, dict):
+        detail = {"detail": detail}
+    response = JsonResponse(detail, status=401)
+    response['WWW-Authenticate'] = api_settings.DEFAULT_AUTHENTICATION_CLASSES[0]().authenticate_header(request)
+    return response
+
+
+# ✅ Async (ASGI) variant of the admin reservation listing (session or JWT auth)
+async def reservation_list_async(request):
+    user = await request.auser()
+    if not user.is_authenticated:
+        try:
+            authenticated = await sync_to_async(JWTAuthentication().authenticate)(request)
+        except AuthenticationFailed as error:
+            return unauthorized(request, error.detail)
+        if authenticated:
+            user = authenticated[0]
+    if not user.is_authenticated:
+        return unauthorized(request, NotAuthenticated.default_detail)
+    if not user.is_staff:
+        return JsonResponse({"detail": PermissionDenied.default_detail}, status=403)
+
+    listing = ViewReservationView()
+    try:
+        queryset = reservation_rows.project(listing.get_queryset(request.GET))
+        limit = listing.get_limit(request.GET)
+        layout = get_layout(request.GET)
+        rows, next_cursor = await akeyset_page(queryset, request.GET.get('cursor'), limit, key=ROW_KEY)
+    except ValidationError as error:
+        return JsonResponse(error.detail, status=400)
+
+    return json_response({"results": encode_rows(rows, layout), "next_cursor": next_cursor})
+
+
+# ✅ Create or update many reservations in one request
+class BatchReservationView(APIView):
+    permission_classes = [IsAuthenticated]
+    max_batch_size = 1000
+
+    @staticmethod
+    def primary_key(value):
+        """``value`` as an integer id; anything else (lists, objects, floats, bools) raises ``ValueError``."""
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise ValueError(value)
+        return int(value)
+
+    def build(self, request, item, pk):
+        """Validate one item and return an unsaved reservation, or ``(None, errors)``."""
+        instance = None
+        if pk is not None:
+            instance = self.owned.get(pk)
+            if instance is None:
+                return None, {"id": ["Reservation not found."]}
+
+        data = dict(item, user=request.user.id)
+        serializer = Table_Reservation_Serializer(instance, data=data, context=self.serializer_context)
+        if not serializer.is_valid():
+            return None, serializer.errors
+
+        reservation = instance or Table_Reservation()
+        for field, value in serializer.validated_data.items():
+            setattr(reservation, field, value)
+        return reservation, None
+
+    def post(self, request):
+        items = request.data.get('reservations') if isinstance(request.data, dict) else None
+        mode = request.data.get('mode', 'atomic') if isinstance(request.data, dict) else None
+
+        if not isinstance(items, list) or not items:
+            return Response({"error": "'reservations' must be a non-empty list"}, status=400)
+        if len(items) > self.max_batch_size:
+            return Response({"error": f"At most {self.max_batch_size} reservations per batch"}, status=400)
+        if mode not in ('atomic', 'best_effort'):
+            return Response({"error": "'mode' must be 'atomic' or 'best_effort'"}, status=400)
+
+        # Ids are used as lookup keys, so check their type before anything else
+        item_errors = [None] * len(items)
+        pks = [None] * len(items)
+        table_ids = set()
+        for position, item in enumerate(items):
+            if not isinstance(item, dict):
+                item_errors[position] = {"non_field_errors": ["Expected an object."]}
+                continue
+            errors = {}
+            for field in ('id', 'table'):
+                if item.get(field) is None:
+                    continue
+                try:
+                    value = self.primary_key(item[field])
+                except ValueError:
+                    errors[field] = ["A valid integer is required."]
+                    continue
+                if field == 'id':
+                    pks[position] = value
+                else:
+                    table_ids.add(value)
+            item_errors[position] = errors or None
+
+        # The same reservation twice would be written from one shared instance
+        seen = Counter(pk for pk in pks if pk is not None)
+        for position, pk in enumerate(pks):
+            if seen[pk] > 1 and item_errors[position] is None:
+                item_errors[position] = {"id": ["Reservation appears more than once in the batch."]}
+
+        # Load every referenced row once instead of per item
+        self.owned = Table_Reservation.objects.filter(user=request.user).in_bulk(set(seen))
+        self.serializer_context = {
+            'request': request,
+            'skip_overlap_check': True,
+            'preloaded': {
+                Table: Table.objects.in_bulk(table_ids),
+                User: {request.user.id: request.user},
+            },
+        }
+
+        results = [None] * len(items)
+        reservations = []
+        positions = []
+        for position, item in enumerate(items):
+            reservation, errors = None, item_errors[position]
+            if errors is None:
+                reservation, errors = self.build(request, item, pks[position])
+            if errors is not None:
+                results[position] = {"index": position, "status": "invalid", "errors": errors}
+            else:
+                reservations.append(reservation)
+                positions.append(position)
+
+        invalid = any(results)
+        if mode == 'atomic' and invalid:
+            statuses = ['skipped'] * len(reservations)
+        else:
+            statuses = book_batch(reservations, all_or_nothing=(mode == 'atomic')) if reservations else []
+
+        for position, reservation, item_status in zip(positions, reservations, statuses):
+            result = {"index": position, "status": item_status}
+            if item_status in ('created', 'updated'):
+                result["id"] = reservation.pk
+            elif item_status == 'conflict':
+                result["errors"] = {"non_field_errors": [
+                    "The table is already reserved for the specified date and time range."
+                ]}
+            results[position] = result
+
+        written = sum(result["status"] in ('created', 'updated') for result in results)
+        if written == len(items):
+            response_status = status.HTTP_201_CREATED
+        elif mode == 'atomic':
+            response_status = status.HTTP_409_CONFLICT if not invalid else status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_207_MULTI_STATUS
+        return Response({"mode": mode, "written": written, "results": results}, status=response_status)
+
+
 # ✅ Update a reservation only if the user owns it
 class UpdateReservationView(APIView):
     permission_classes = [IsAuthenticated]
@@ -60,42 +305,107 @@ class UpdateReservationView(APIView):
         except Table_Reservation.DoesNotExist:
             return Response({"error": "Reservation not found"}, status=404)
 
-        serializer = Table_Reservation_Serializer(reservation, data=request.data)
+        serializer = Table_Reservation_Serializer(reservation, data=request.data, context={'request': request})
         if serializer.is_valid():
-            serializer.save()
+            try:
+                book_serializer(serializer, exclude_pk=reservation.pk)
+            except BookingConflict as error:
+                return Response({"error": str(error)}, status=status.HTTP_409_CONFLICT)
             return Response(serializer.data, status=200)
         return Response(serializer.errors, status=400)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def check_table_availability(request):
-    table_id = request.GET.get('table_id')
+    # Accepts ?table_id=1&table_id=2 or ?table_id=1,2
+    table_ids = [
+        value for param in request.GET.getlist('table_id')
+        for value in param.split(',') if value
+    ]
     date_str = request.GET.get('date')  # format: 'YYYY-MM-DD'
     time_str = request.GET.get('time')  # format: 'HH:MM'
-    
-    if not (table_id and date_str and time_str):
+    duration_str = request.GET.get('duration', '120')  # minutes
+
+    if not (table_ids and date_str and time_str):
         return Response({"error": "Missing required parameters"}, status=status.HTTP_400_BAD_REQUEST)
-    
+
     try:
-        reservation_datetime = datetime.strptime(f"{date_str} {time_str}", '%Y-%m-%d %H:%M')
+        table_ids = [int(table_id) for table_id in table_ids]
+        duration = int(duration_str)
+        reservation_start = timezone.make_aware(
+            datetime.strptime(f"{date_str} {time_str}", '%Y-%m-%d %H:%M')
+        )
     except ValueError:
-        return Response({"error": "Invalid date or time format"}, status=status.HTTP_400_BAD_REQUEST)
-    
-    reservation_end = reservation_datetime + timedelta(hours=2)  # Duration assumed 2 hours
-    
-    conflicts = Table_Reservation.objects.filter(
-        table_id=table_id,
-        reservation_time__lt=reservation_end,
-        reservation_time__gte=reservation_datetime
-    ).exists()
-    
-    return Response({"available": not conflicts}, status=status.HTTP_200_OK)
-
-# ✅ Autocomplete API for table names
+        return Response({"error": "Invalid table id, duration, date or time format"}, status=status.HTTP_400_BAD_REQUEST)
+
+    if not 0 < duration <= 24 * 60:
+        return Response({"error": "Duration must be between 1 and 1440 minutes"}, status=status.HTTP_400_BAD_REQUEST)
+
+    reservation_end = reservation_start + timedelta(minutes=duration)
+    try:
+        validate_window(reservation_start, reservation_end, allow_past=True)
+    except DjangoValidationError as error:
+        return Response({"error": error.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Single overlap query for every requested table (uses reservation_table_time_idx)
+    booked = set(
+        Table_Reservation.objects.filter(
+            table_id__in=table_ids,
+            reservation_start__lt=reservation_end,
+            reservation_end__gt=reservation_start,
+        ).values_list('table_id', flat=True).distinct()
+    )
+    tables = {str(table_id): table_id not in booked for table_id in table_ids}
+
+    return Response({
+        "available": not booked,
+        "tables": tables,
+        "start": reservation_start,
+        "end": reservation_end,
+    }, status=status.HTTP_200_OK)
+
+# ✅ Daily revenue rollup (admin): one grouped query over the cached reservation totals
+REVENUE_MAX_DAYS = 366
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def daily_revenue_report(request):
+    today = timezone.localdate()
+    try:
+        last_day = datetime.strptime(request.GET['end'], '%Y-%m-%d').date() if request.GET.get('end') else today
+        first_day = datetime.strptime(request.GET['start'], '%Y-%m-%d').date() if request.GET.get('start') \
+            else last_day - timedelta(days=29)
+    except ValueError:
+        return Response({"error": "Dates must be YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+    if not 0 <= (last_day - first_day).days < REVENUE_MAX_DAYS:
+        return Response(
+            {"error": f"The range must cover 1 to {REVENUE_MAX_DAYS} days"}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    days = [
+        dict(row, revenue=round(row['revenue'] or 0, 2))
+        for row in daily_revenue(first_day, last_day)
+    ]
+    return Response({
+        "start": first_day,
+        "end": last_day,
+        "revenue": round(sum(day['revenue'] for day in days), 2),
+        "days": days,
+    }, status=status.HTTP_200_OK)
+
+# ✅ Autocomplete API for table names (served from the in-memory prefix index)
+AUTOCOMPLETE_MAX_LIMIT = 50
+
+@revalidate(lambda request: make_etag(
+    table_names.digest(), request.headers.get('x-requested-with') == 'XMLHttpRequest'
+))
 def autocomplete_table_name(request):
     if request.headers.get('x-requested-with') == 'XMLHttpRequest':
         query = request.GET.get('term', '')
-        matches = Table.objects.filter(name__icontains=query).values_list('name', flat=True).distinct()
-        return JsonResponse(list(matches), safe=False)
+        try:
+            limit = min(int(request.GET.get('limit', 10)), AUTOCOMPLETE_MAX_LIMIT)
+        except ValueError:
+            limit = 10
+        return JsonResponse(table_names.complete(query, limit), safe=False)
     return JsonResponse([], safe=False)
 
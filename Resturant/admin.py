@@ -20,9 +20,11 @@ class TableAdmin(admin.ModelAdmin):
 
 @admin.register(Table_Reservation)
 class TableReservationAdmin(admin.ModelAdmin):
-    list_display = ['user', 'table', 'reservation_start', 'reservation_end', 'number_of_party']
+    list_display = ['user', 'table', 'reservation_start', 'reservation_end', 'number_of_party', 'order_total']
+    list_select_related = ['user', 'table']
     search_fields = ['user__username', 'table__name', 'special_order']
     list_filter = ['reservation_start']
+    readonly_fields = ['order_total']
 
 
 @admin.register(Category)
@@ -51,11 +53,24 @@ class TableOrderItemInline(admin.TabularInline):
 
 @admin.register(TableOrder)
 class TableOrderAdmin(admin.ModelAdmin):
-    list_display = ('reservation', 'ordered_items_summary')
+    list_display = ('reservation', 'ordered_items_summary', 'order_total')
     inlines = [TableOrderItemInline]
     search_fields = ('reservation__user__username',)
 
+    def get_queryset(self, request):
+        # Totals come from SQL and items are prefetched, so the changelist costs a fixed number of queries
+        return super().get_queryset(request) \
+            .with_totals() \
+            .select_related('reservation') \
+            .prefetch_related('items__menu_item')
+
     def ordered_items_summary(self, obj):
         return ", ".join(f"{item.menu_item.item_name} (x{item.quantity})" for item in obj.items.all())
 
-    ordered_items_summary.short_description = "Ordered Items"
\ No newline at end of file
+    ordered_items_summary.short_description = "Ordered Items"
+
+    def order_total(self, obj):
+        return f"{obj.total:.2f}"
+
+    order_total.short_description = "Total"
+    order_total.admin_order_field = 'total'
\ No newline at end of file
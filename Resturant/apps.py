@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ResturantConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Resturant'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from . import occupancy
+from .availability import _aware, engine
+from .models import Table
+from .rules import calendar
+
+
+def _idle_minutes(table_id, start, end, exclude_pk=None):
+    """Minutes the table would sit empty right before and after ``[start, end)``."""
+    opening, closing = next(
+        ((opening, closing) for opening, closing in calendar.intervals(timezone.localtime(start).date())
+         if opening <= start < closing),
+        (start, end),
+    )
+    previous_end, next_start = engine.neighbours(table_id, start, end, exclude_pk)
+    before = start - max(previous_end or opening, opening)
+    after = min(next_start or closing, closing) - end
+    return (max(before, timedelta(0)) + max(after, timedelta(0))) // timedelta(minutes=1)
+
+
+def free_tables(number_of_party, start, end, exclude_pk=None, tables=None):
+    """Tables seating ``number_of_party`` that are free for ``[start, end)``, smallest first."""
+    start, end = _aware(start), _aware(end)
+    tables = (Table.objects.all() if tables is None else tables) \
+        .filter(seats__gte=number_of_party).order_by('seats', 'pk')
+    colliding = occupancy.candidate_table_ids(start, end)
+    return [
+        table for table in tables
+        if table.pk not in colliding or engine.is_available(table.pk, start, end, exclude_pk)
+    ]
+
+
+def assign_table(number_of_party, start, end, pack=None, exclude_pk=None, tables=None):
+    """Best-fit table for a party: the smallest free table with enough seats, or ``None``.
+
+    With ``pack`` (default ``TABLE_ASSIGNMENT_PACK``), ties between tables of
+    that size go to the one whose neighbouring bookings leave the least idle
+    time, so long free stretches stay open for later requests. ``tables``
+    narrows the choice to a queryset.
+    """
+    start, end = _aware(start), _aware(end)
+    tables = free_tables(number_of_party, start, end, exclude_pk, tables)
+    if not tables:
+        return None
+    if pack is None:
+        pack = getattr(settings, 'TABLE_ASSIGNMENT_PACK', False)
+    if not pack:
+        return tables[0]
+
+    best_fit = [table for table in tables if table.seats == tables[0].seats]
+    return min(best_fit, key=lambda table: _idle_minutes(table.pk, start, end, exclude_pk))
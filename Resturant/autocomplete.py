@@ -0,0 +1,85 @@
+import bisect
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+
+from .models import Table
+
+
+class TableNameIndex:
+    """Sorted prefix index of table names for autocomplete.
+
+    Each name is stored under its full lowercase form and under every word
+    after the first, so ``"win"`` finds ``"Window 2"`` and ``"2"`` finds it
+    too. Matches on the start of the full name are ranked before word
+    matches. The index is rebuilt lazily after a ``Table`` is saved or
+    deleted (see ``Resturant.signals``), and after ``TABLE_NAMES_MAX_AGE``
+    seconds so changes made by other worker processes show up too.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = None  # sorted [(key, is_word_match, name)]
+        self._digest = None
+        self._loaded_at = None
+
+    def invalidate(self):
+        with self._lock:
+            self._keys = None
+            self._digest = None
+
+    def _build(self):
+        keys = set()
+        for name in Table.objects.values_list('name', flat=True).distinct():
+            lowered = name.lower()
+            keys.add((lowered, False, name))
+            for word in lowered.split()[1:]:
+                keys.add((word, True, name))
+        return sorted(keys)
+
+    def _load(self):
+        max_age = getattr(settings, 'TABLE_NAMES_MAX_AGE', 60)
+        if self._keys is not None and max_age is not None and time.monotonic() - self._loaded_at > max_age:
+            self._keys = None
+        if self._keys is None:
+            self._loaded_at = time.monotonic()
+            self._keys = self._build()
+            self._digest = hashlib.blake2b(repr(self._keys).encode(), digest_size=12).hexdigest()
+
+    def _entries(self):
+        with self._lock:
+            self._load()
+            return self._keys
+
+    def digest(self):
+        """Fingerprint of the indexed names; equal in every process serving the same tables."""
+        with self._lock:
+            self._load()
+            return self._digest
+
+    def complete(self, term, limit=10):
+        term = term.strip().lower()
+        if not term or limit <= 0:
+            return []
+        keys = self._entries()
+        position = bisect.bisect_left(keys, (term,))
+        exact, words = [], []
+        while position < len(keys) and keys[position][0].startswith(term):
+            _, is_word_match, name = keys[position]
+            (words if is_word_match else exact).append(name)
+            position += 1
+            if len(exact) >= limit:
+                break
+
+        results = []
+        for name in exact + words:
+            if name not in results:
+                results.append(name)
+                if len(results) == limit:
+                    break
+        return results
+
+
+table_names = TableNameIndex()
@@ -0,0 +1,330 @@
+import bisect
+import threading
+import time
+from datetime import datetime, time as dt_time, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Table, Table_Reservation, TableOccupancy
+from . import occupancy
+from .rules import calendar
+
+
+
+# ------------------ Helpers ------------------
+def _aware(value):
+    if value is not None and timezone.is_naive(value):
+        return timezone.make_aware(value)
+    return value
+
+
+# ------------------ Per-table Index ------------------
+class TableIntervalIndex:
+    """Reservations of one table kept sorted by start time.
+
+    ``starts`` mirrors ``intervals`` so lookups can bisect on plain datetimes.
+    ``max_length`` is the longest booking seen; anything starting earlier than
+    ``start - max_length`` cannot reach into the queried window.
+    """
+
+    def __init__(self):
+        self.starts = []
+        self.intervals = []  # (start, end, pk)
+        self.max_length = timedelta(0)
+
+    def __len__(self):
+        return len(self.intervals)
+
+    def add(self, pk, start, end):
+        position = bisect.bisect_right(self.starts, start)
+        self.starts.insert(position, start)
+        self.intervals.insert(position, (start, end, pk))
+        if end - start > self.max_length:
+            self.max_length = end - start
+
+    def discard(self, pk, start):
+        position = bisect.bisect_left(self.starts, start)
+        while position < len(self.intervals) and self.starts[position] == start:
+            if self.intervals[position][2] == pk:
+                del self.starts[position]
+                del self.intervals[position]
+                return True
+            position += 1
+        return False
+
+    def overlapping(self, start, end, exclude_pk=None):
+        low = bisect.bisect_right(self.starts, start - self.max_length)
+        high = bisect.bisect_left(self.starts, end)
+        return [
+            interval for interval in self.intervals[low:high]
+            if interval[1] > start and (exclude_pk is None or interval[2] != exclude_pk)
+        ]
+
+    def neighbours(self, start, end, exclude_pk=None):
+        """``(previous_end, next_start)`` around a free window; ``None`` where there is none.
+
+        Assumes the table's bookings do not overlap, so the latest booking
+        starting before ``start`` is also the one that ends last.
+        """
+        previous_end = next_start = None
+        for position in range(bisect.bisect_right(self.starts, start) - 1, -1, -1):
+            if exclude_pk is None or self.intervals[position][2] != exclude_pk:
+                previous_end = self.intervals[position][1]
+                break
+        for position in range(bisect.bisect_left(self.starts, end), len(self.intervals)):
+            if exclude_pk is None or self.intervals[position][2] != exclude_pk:
+                next_start = self.intervals[position][0]
+                break
+        return previous_end, next_start
+
+
+# ------------------ Availability Engine ------------------
+class AvailabilityEngine:
+    """Process-local overlap lookups for ``Table_Reservation``.
+
+    Tables are loaded lazily (one query per table, or one for all of them) and
+    kept current by the signal handlers in ``Resturant.signals`` once the
+    write commits. Writes that bypass signals (``bulk_create``,
+    ``QuerySet.update``) must call :meth:`add` / :meth:`discard` themselves,
+    from ``transaction.on_commit``. Other worker processes are only
+    picked up when the index expires after ``AVAILABILITY_INDEX_MAX_AGE``
+    seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._tables = {}
+            self._locations = {}  # pk -> (table_id, start)
+            self._loaded_all = False
+            self._loaded_at = time.monotonic()
+
+    def _expire_if_stale(self):
+        max_age = getattr(settings, 'AVAILABILITY_INDEX_MAX_AGE', 60)
+        if max_age is not None and time.monotonic() - self._loaded_at > max_age:
+            self.reset()
+
+    def _load(self, table_ids=None):
+        rows = Table_Reservation.objects.values_list(
+            'table_id', 'pk', 'reservation_start', 'reservation_end'
+        ).order_by('reservation_start')
+        if table_ids is not None:
+            rows = rows.filter(table_id__in=table_ids)
+            for table_id in table_ids:
+                self._tables[table_id] = TableIntervalIndex()
+        for table_id, pk, start, end in rows.iterator(chunk_size=2000):
+            self._tables.setdefault(table_id, TableIntervalIndex()).add(pk, start, end)
+            self._locations[pk] = (table_id, start)
+
+    def _index_for(self, table_id):
+        with self._lock:
+            self._expire_if_stale()
+            if table_id not in self._tables and not self._loaded_all:
+                self._load([table_id])
+            return self._tables.get(table_id, TableIntervalIndex())
+
+    def _all_indexes(self):
+        with self._lock:
+            self._expire_if_stale()
+            if not self._loaded_all:
+                self._tables = {}
+                self._locations = {}
+                self._load()
+                self._loaded_all = True
+            return dict(self._tables)
+
+    def overlapping(self, table_id, start, end, exclude_pk=None):
+        with self._lock:
+            return self._index_for(table_id).overlapping(_aware(start), _aware(end), exclude_pk)
+
+    def is_available(self, table_id, start, end, exclude_pk=None):
+        return not self.overlapping(table_id, start, end, exclude_pk)
+
+    def neighbours(self, table_id, start, end, exclude_pk=None):
+        with self._lock:
+            return self._index_for(table_id).neighbours(_aware(start), _aware(end), exclude_pk)
+
+    def booked_table_ids(self, start, end):
+        start, end = _aware(start), _aware(end)
+        with self._lock:
+            return {
+                table_id for table_id, index in self._all_indexes().items()
+                if index.overlapping(start, end)
+            }
+
+    def add(self, reservation):
+        with self._lock:
+            self.discard(reservation)
+            # Tables that were never loaded will pick the row up from the DB.
+            index = self._tables.get(reservation.table_id)
+            if index is None and self._loaded_all:
+                index = self._tables[reservation.table_id] = TableIntervalIndex()
+            if index is not None:
+                start = _aware(reservation.reservation_start)
+                index.add(reservation.pk, start, _aware(reservation.reservation_end))
+                self._locations[reservation.pk] = (reservation.table_id, start)
+
+    def discard(self, reservation):
+        with self._lock:
+            location = self._locations.pop(reservation.pk, None)
+            if location is not None:
+                table_id, start = location
+                self._tables[table_id].discard(reservation.pk, start)
+
+
+engine = AvailabilityEngine()
+
+
+def is_table_available(table, start, end, exclude_pk=None):
+    """Exact overlap check that only loads the table's interval index when needed.
+
+    The precomputed occupancy bitsets answer "certainly free" with one constant
+    cost query; only a slot collision falls through to the exact index.
+    """
+    table_id = getattr(table, 'pk', table)
+    if table_id not in occupancy.candidate_table_ids(_aware(start), _aware(end), [table_id]):
+        return True
+    return engine.is_available(table_id, start, end, exclude_pk=exclude_pk)
+
+
+def booked_table_ids(start, end):
+    """Tables with a reservation overlapping ``[start, end)``, via the occupancy bitsets."""
+    start, end = _aware(start), _aware(end)
+    return {
+        table_id for table_id in occupancy.candidate_table_ids(start, end)
+        if engine.overlapping(table_id, start, end)
+    }
+
+
+# ------------------ Availability Grid ------------------
+def _slot_mask(day_start, slot, slot_count, start, end):
+    first = max(0, (start - day_start) // slot)
+    last = min(slot_count, -(-(end - day_start) // slot))
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def encode_bits(bits, slot_count):
+    """Bitstring with slot 0 first, e.g. ``'0011'`` -> slots 2 and 3 booked."""
+    return format(bits, f'0{slot_count}b')[::-1] if slot_count else ''
+
+
+def encode_runs(bits, slot_count):
+    """Run-length pairs ``[value, length]`` covering every slot of the day."""
+    runs = []
+    for position in range(slot_count):
+        value = (bits >> position) & 1
+        if runs and runs[-1][0] == value:
+            runs[-1][1] += 1
+        else:
+            runs.append([value, 1])
+    return runs
+
+
+class GridFrame:
+    """Slot layout of an availability grid plus the queries that fill it."""
+
+    def __init__(self, first_day, last_day, slot_minutes):
+        self.slot = timedelta(minutes=slot_minutes)
+        # Every day spans the widest opening hours so rows line up across days
+        opening, closing = calendar.span()
+        self.day_length = closing - opening
+        self.slot_count = -(-self.day_length // self.slot)
+
+        self.first_day, self.last_day = first_day, last_day
+        # Slots that line up with the 15-minute occupancy rows are read from them
+        opening_slots, remainder = divmod(opening, occupancy.SLOT)
+        self.slot_ratio = self.slot // occupancy.SLOT
+        self.from_occupancy = not remainder and not self.slot % occupancy.SLOT
+        self.opening_slot = opening_slots
+
+        self.day_starts = []
+        day = first_day
+        while day <= last_day:
+            self.day_starts.append(_aware(datetime.combine(day, dt_time(0)) + opening))
+            day += timedelta(days=1)
+
+    def tables(self):
+        return Table.objects.values_list('id', 'name', 'seats')
+
+    def reservations(self):
+        if not self.day_starts:
+            return Table_Reservation.objects.none().values_list('table_id', 'reservation_start', 'reservation_end')
+        # The last slot may run past closing time when it does not divide the day
+        return Table_Reservation.objects.filter(
+            reservation_start__lt=self.day_starts[-1] + self.slot_count * self.slot,
+            reservation_end__gt=self.day_starts[0],
+        ).values_list('table_id', 'reservation_start', 'reservation_end')
+
+    def occupancy_rows(self):
+        return TableOccupancy.objects.filter(
+            date__range=(self.first_day, self.last_day)
+        ).values_list('table_id', 'date', 'slots')
+
+    def fold_occupancy(self, tables, rows):
+        """Widen the 15-minute occupancy bits of each row into grid slots."""
+        bitmaps = {table_id: [0] * len(self.day_starts) for table_id, _, _ in tables}
+        group = (1 << self.slot_ratio) - 1
+        for table_id, day, slots in rows:
+            table_rows = bitmaps.get(table_id)
+            if table_rows is None:
+                continue
+            bits = occupancy.to_bits(slots) >> self.opening_slot
+            value = 0
+            for index in range(self.slot_count):
+                if bits >> (index * self.slot_ratio) & group:
+                    value |= 1 << index
+            table_rows[(day - self.first_day).days] = value
+        return self.result(tables, bitmaps)
+
+    def fold(self, tables, reservations):
+        day_starts = self.day_starts
+        bitmaps = {table_id: [0] * len(day_starts) for table_id, _, _ in tables}
+        for table_id, start, end in reservations:
+            rows = bitmaps.get(table_id)
+            if rows is None:
+                continue
+            first = max(0, (start - day_starts[0]).days)
+            for offset in range(first, len(day_starts)):
+                day_start = day_starts[offset]
+                if day_start >= end:
+                    break
+                rows[offset] |= _slot_mask(day_start, self.slot, self.slot_count, start, end)
+        return self.result(tables, bitmaps)
+
+    def result(self, tables, bitmaps):
+        return {
+            'slot_count': self.slot_count,
+            'slot_starts': self.day_starts,
+            'tables': tables,
+            'bitmaps': bitmaps,
+        }
+
+
+def availability_grid(first_day, last_day, slot_minutes=30):
+    """Tables x slots booking bitmaps for every day in ``first_day..last_day``.
+
+    Each table's day is a Python int whose bit ``i`` is set when slot ``i``
+    overlaps a booking. Slot sizes that are multiples of 15 minutes are read
+    from the precomputed occupancy rows (one row per table and day); other
+    sizes fall back to a single range query over the reservations.
+    """
+    frame = GridFrame(first_day, last_day, slot_minutes)
+    if frame.from_occupancy:
+        return frame.fold_occupancy(list(frame.tables()), frame.occupancy_rows())
+    return frame.fold(list(frame.tables()), frame.reservations().iterator(chunk_size=2000))
+
+
+async def aavailability_grid(first_day, last_day, slot_minutes=30):
+    """Async counterpart of :func:`availability_grid` using the async ORM."""
+    frame = GridFrame(first_day, last_day, slot_minutes)
+    tables = [row async for row in frame.tables()]
+    if frame.from_occupancy:
+        return frame.fold_occupancy(tables, [row async for row in frame.occupancy_rows()])
+    reservations = [row async for row in frame.reservations()]
+    return frame.fold(tables, reservations)
@@ -0,0 +1,133 @@
+import threading
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+
+from django.db import transaction
+
+from . import live, occupancy
+from .availability import TableIntervalIndex, engine
+from .models import Table, Table_Reservation
+
+
+class BookingConflict(Exception):
+    """The requested window overlaps a reservation that is already saved."""
+
+
+_table_locks = {}
+_table_locks_guard = threading.Lock()
+
+
+def _process_lock(table_id):
+    with _table_locks_guard:
+        return _table_locks.setdefault(table_id, threading.Lock())
+
+
+@contextmanager
+def lock_tables(table_ids):
+    """Hold the booking lock of every table in ``table_ids`` inside one transaction.
+
+    Threads of this process queue on a per-table lock. Across processes the
+    transaction locks the ``Table`` rows with ``SELECT ... FOR UPDATE`` on
+    Postgres; on SQLite the ``IMMEDIATE`` transaction mode takes the database
+    write lock instead. Locks are taken in id order so batches cannot deadlock.
+    """
+    table_ids = sorted(set(table_ids))
+    with ExitStack() as stack:
+        for table_id in table_ids:
+            stack.enter_context(_process_lock(table_id))
+        stack.enter_context(transaction.atomic())
+        list(Table.objects.select_for_update().filter(pk__in=table_ids).order_by('pk').values_list('pk', flat=True))
+        yield
+
+
+def book(table, reservation_start, reservation_end, save, exclude_pk=None):
+    """Run ``save()`` only if the table is still free, serialized per table.
+
+    The overlap check reads the database rather than the in-memory
+    availability index, which can lag behind other workers.
+    """
+    table_id = getattr(table, 'pk', table)
+    with lock_tables([table_id]):
+        overlapping = Table_Reservation.objects.filter(
+            table_id=table_id,
+            reservation_start__lt=reservation_end,
+            reservation_end__gt=reservation_start,
+        )
+        if exclude_pk:
+            overlapping = overlapping.exclude(pk=exclude_pk)
+        if overlapping.exists():
+            raise BookingConflict("The table is already reserved for the specified date and time.")
+
+        return save()
+
+
+BOOKING_FIELDS = ['user', 'table', 'number_of_party', 'reservation_start', 'reservation_end', 'special_order']
+
+
+def book_batch(reservations, all_or_nothing=True):
+    """Create or update many reservations under one lock, returning a status per item.
+
+    Each affected table is read with a single range query covering the batch's
+    window; items are then checked in memory against those rows and against
+    earlier items of the same batch. Statuses are ``'created'``, ``'updated'``,
+    ``'conflict'`` or, when ``all_or_nothing`` aborts the batch, ``'skipped'``.
+    """
+    statuses = [None] * len(reservations)
+    positions_by_table = defaultdict(list)
+    for position, reservation in enumerate(reservations):
+        positions_by_table[reservation.table_id].append(position)
+
+    with lock_tables(positions_by_table):
+        indexes = {}
+        locations = {}  # pk -> (table_id, start) of rows already in an index
+        for table_id, positions in positions_by_table.items():
+            window_start = min(reservations[p].reservation_start for p in positions)
+            window_end = max(reservations[p].reservation_end for p in positions)
+            index = indexes[table_id] = TableIntervalIndex()
+            rows = Table_Reservation.objects.filter(
+                table_id=table_id,
+                reservation_start__lt=window_end,
+                reservation_end__gt=window_start,
+            ).values_list('pk', 'reservation_start', 'reservation_end')
+            for pk, start, end in rows:
+                index.add(pk, start, end)
+                locations[pk] = (table_id, start)
+
+        for position, reservation in enumerate(reservations):
+            index = indexes[reservation.table_id]
+            start, end = reservation.reservation_start, reservation.reservation_end
+            if index.overlapping(start, end, exclude_pk=reservation.pk):
+                statuses[position] = 'conflict'
+                continue
+            if reservation.pk in locations:
+                old_table_id, old_start = locations.pop(reservation.pk)
+                indexes[old_table_id].discard(reservation.pk, old_start)
+            index.add(reservation.pk, start, end)
+            statuses[position] = 'updated' if reservation.pk else 'created'
+
+        if all_or_nothing and 'conflict' in statuses:
+            return [status if status == 'conflict' else 'skipped' for status in statuses]
+
+        to_create = [r for r, status in zip(reservations, statuses) if status == 'created']
+        to_update = [r for r, status in zip(reservations, statuses) if status == 'updated']
+        # Occupancy days the updated rows are leaving must be recomputed too
+        touched = {
+            pair
+            for table_id, start, end in Table_Reservation.objects.filter(
+                pk__in=[r.pk for r in to_update]
+            ).values_list('table_id', 'reservation_start', 'reservation_end')
+            for pair in occupancy.affected(table_id, start, end)
+        } if to_update else set()
+        Table_Reservation.objects.bulk_create(to_create)
+        Table_Reservation.objects.bulk_update(to_update, BOOKING_FIELDS)
+        for r in to_create + to_update:
+            touched |= occupancy.affected(r.table_id, r.reservation_start, r.reservation_end)
+        occupancy.refresh(touched)
+        live.publish_resync(day for _, day in touched)
+
+    # bulk_create/bulk_update skip post_save
+    def index():
+        for reservation in to_create + to_update:
+            engine.add(reservation)
+    transaction.on_commit(index)
+    return statuses
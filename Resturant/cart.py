@@ -0,0 +1,93 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, ExpressionWrapper, F, FloatField, Sum
+from django.db.models.functions import Coalesce
+
+from .models import CartItem, Menu
+
+SESSION_KEY = 'cart'
+
+LINE_TOTAL = ExpressionWrapper(F('quantity') * F('menu_item__item_price'), output_field=FloatField())
+
+
+def add(user, menu_id, quantity=1):
+    """Add ``quantity`` of a menu item with one ``UPDATE ... SET quantity = quantity + n``.
+
+    The first add of an item inserts its row instead; the unique constraint on
+    (user, menu_item) turns a concurrent first add into a retry of the update.
+    """
+    for _ in range(2):
+        if CartItem.objects.filter(user=user, menu_item_id=menu_id).update(quantity=F('quantity') + quantity):
+            return
+        try:
+            with transaction.atomic():
+                CartItem.objects.create(user=user, menu_item_id=menu_id, quantity=quantity)
+            return
+        except IntegrityError:
+            continue
+
+
+def add_many(user, quantities):
+    """Add ``{menu_id: quantity}`` in one transaction; unknown menu ids are skipped.
+
+    Returns the ids that were added.
+    """
+    quantities = {menu_id: quantity for menu_id, quantity in quantities.items() if quantity > 0}
+    with transaction.atomic():
+        menu_ids = set(Menu.objects.filter(pk__in=quantities).values_list('pk', flat=True))
+        existing = list(CartItem.objects.select_for_update().filter(user=user, menu_item_id__in=menu_ids))
+        for item in existing:
+            item.quantity = F('quantity') + quantities[item.menu_item_id]
+        CartItem.objects.bulk_update(existing, ['quantity'])
+
+        known = {item.menu_item_id for item in existing}
+        created = [
+            CartItem(user=user, menu_item_id=menu_id, quantity=quantities[menu_id])
+            for menu_id in menu_ids - known
+        ]
+        try:
+            with transaction.atomic():
+                CartItem.objects.bulk_create(created)
+        except IntegrityError:
+            # A concurrent first add inserted one of the rows; fall back to add's retry per item
+            for item in created:
+                add(user, item.menu_item_id, item.quantity)
+    return menu_ids
+
+
+def items(user):
+    """The user's cart rows with their menu items and ``line_total`` in one query."""
+    return CartItem.objects.filter(user=user) \
+        .select_related('menu_item__category') \
+        .annotate(line_total=LINE_TOTAL) \
+        .order_by('menu_item__item_name')
+
+
+def summary(user):
+    """``{'lines', 'units', 'total'}`` of the user's cart from a single aggregate query."""
+    totals = CartItem.objects.filter(user=user).aggregate(
+        lines=Count('id'),
+        units=Coalesce(Sum('quantity'), 0),
+        total=Coalesce(Sum(LINE_TOTAL), 0.0),
+    )
+    totals['total'] = round(totals['total'], 2)
+    return totals
+
+
+def quantities(user):
+    return dict(CartItem.objects.filter(user=user).values_list('menu_item_id', 'quantity'))
+
+
+def clear(user):
+    CartItem.objects.filter(user=user).delete()
+
+
+def adopt_session_cart(request):
+    """Move a cart kept in the session by older versions into ``CartItem`` rows."""
+    legacy = request.session.get(SESSION_KEY)
+    if legacy is None:
+        return
+    if legacy:
+        add_many(request.user, Counter(legacy))
+    del request.session[SESSION_KEY]
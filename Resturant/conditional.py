@@ -0,0 +1,40 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib import messages
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from .menu_cache import catalog
+
+
+def make_etag(*parts):
+    return hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+
+
+def revalidate(etag_func, last_modified_func=None):
+    """``condition()`` plus ``Cache-Control: private, no-cache``.
+
+    Browsers and tablets keep the response but ask again on every use; an
+    unchanged resource then costs a 304 with an empty body instead of a render.
+    """
+    def decorator(view):
+        return cache_control(private=True, no_cache=True)(
+            condition(etag_func=etag_func, last_modified_func=last_modified_func)(view)
+        )
+    return decorator
+
+
+def page_etag(request, *parts):
+    """ETag of a rendered page, or ``None`` (always render) while flash messages are pending.
+
+    Pages show who is logged in and embed the CSRF token, so both are part of
+    the tag.
+    """
+    if len(messages.get_messages(request)):
+        return None
+    return make_etag(request.user.pk, request.COOKIES.get(settings.CSRF_COOKIE_NAME), *parts)
+
+
+def menu_etag(request, *args, **kwargs):
+    return page_etag(request, catalog.digest())
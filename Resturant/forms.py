@@ -1,9 +1,13 @@
 from django import forms
+from django.core.exceptions import NON_FIELD_ERRORS
 from django.forms import modelformset_factory
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
-from django.utils import timezone
 from .models import Table_Reservation, TableOrder, TableOrderItem, Menu
+from .availability import is_table_available
+from .assignment import assign_table
+from .rules import validate_window
+from .menu_cache import catalog
 
 # ✅ Form for the main table order
 class TableOrderForm(forms.ModelForm):
@@ -21,6 +25,11 @@ class TableOrderItemForm(forms.ModelForm):
             'quantity': forms.NumberInput(attrs={'min': '1', 'class': 'form-control'})
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Render the dropdown from the cached catalog instead of one query per form
+        self.fields['menu_item'].choices = catalog.choices()
+
 # ✅ FormSet to manage multiple items in one order
 TableOrderItemFormSet = modelformset_factory(
     TableOrderItem,
@@ -43,7 +52,6 @@ class CustomRegistrationForm(UserCreationForm):
         )
 
 # ✅ Form for making a table reservation
-from django.utils import timezone
 from django import forms
 from datetime import timedelta
 
@@ -61,49 +69,52 @@ class Table_ReservationForm(forms.ModelForm):
         model = Table_Reservation
         fields = ('table', 'number_of_party', 'reservation_start', 'reservation_end', 'special_order')
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # ✅ Leaving the table blank picks the best free table for the party
+        self.fields['table'].required = False
+        self.fields['table'].empty_label = "Any table (best fit)"
+        self.table_assigned = False
+        self.table_booked = False
+
     def clean(self):
         cleaned_data = super().clean()
         reservation_start = cleaned_data.get('reservation_start')
         reservation_end = cleaned_data.get('reservation_end')
         table = cleaned_data.get('table')
+        number_of_party = cleaned_data.get('number_of_party')
 
-        if not reservation_start or not reservation_end or not table:
+        if not reservation_start or not reservation_end or not number_of_party:
             return cleaned_data
 
-        now = timezone.now()
+        validate_window(reservation_start, reservation_end)
 
-        if reservation_start < now:
-            raise forms.ValidationError("Reservation can't be made in the past.")
-        if reservation_start.weekday() == 5:  # Saturday closed
-            raise forms.ValidationError("Reservations cannot be made on Saturdays.")
-        if not (8 <= reservation_start.hour < 23):
-            raise forms.ValidationError("Reservations are allowed only between 08:00 and 23:00.")
-
-        if reservation_end <= reservation_start:
-            raise forms.ValidationError("Reservation end must be after the start time.")
-        if reservation_end.weekday() == 5:
-            raise forms.ValidationError("Restaurant is closed on Saturdays.")
-        if not (8 <= reservation_end.hour < 23):
-            raise forms.ValidationError("Reservations are allowed only between 08:00 and 23:00.")
+        if table is None:
+            table = assign_table(number_of_party, reservation_start, reservation_end, exclude_pk=self.instance.pk)
+            if table is None:
+                raise forms.ValidationError(f"No table for a party of {number_of_party} is free during this time.")
+            cleaned_data['table'] = table
+            self.table_assigned = True
+            return cleaned_data
 
         # Check if party size fits table seats
-        if cleaned_data.get('number_of_party') > table.seats:
+        if number_of_party > table.seats:
             raise forms.ValidationError(f"The party size exceeds the seats available at the table ({table.seats}).")
 
         # Check if the table is already booked for the requested time slot
-        overlapping_reservations = Table_Reservation.objects.filter(
-            table=table,
-            reservation_start__lt=reservation_end,
-            reservation_end__gt=reservation_start,
-        )
-        if self.instance.pk:
-            overlapping_reservations = overlapping_reservations.exclude(pk=self.instance.pk)
-
-        if overlapping_reservations.exists():
+        if not is_table_available(table, reservation_start, reservation_end, exclude_pk=self.instance.pk):
+            self.table_booked = True
             raise forms.ValidationError(f"The table '{table.name}' is already booked during this time. Please choose a different table or time.")
 
         return cleaned_data
 
+    def _post_clean(self):
+        super()._post_clean()
+        # ✅ Model.clean() repeats the rules above; show each message once
+        if NON_FIELD_ERRORS in self._errors:
+            messages = list(dict.fromkeys(self._errors[NON_FIELD_ERRORS]))
+            self._errors[NON_FIELD_ERRORS] = self.error_class(messages, error_class='nonfield', renderer=self.renderer)
+
 
 # ✅ Form to search menu items
 class MenuSearchForm(forms.Form):
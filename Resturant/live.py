@@ -0,0 +1,262 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.utils.module_loading import import_string
+
+from .models import Table, Table_Reservation
+from .occupancy import aware, day_start, days_spanned
+from .rules import opening_hours
+
+logger = logging.getLogger(__name__)
+
+RESYNC = {'type': 'resync'}
+# Reconnect delay suggested to EventSource clients
+RETRY_MS = 3000
+
+
+def channel(day):
+    return f"availability:{day.isoformat()}"
+
+
+# ------------------ Brokers ------------------
+class Subscription:
+    """Bounded queue of one subscriber, fed from any thread.
+
+    A subscriber that falls behind loses its backlog and gets a single
+    ``resync`` message instead, so a slow client cannot grow memory.
+    """
+
+    def __init__(self, broker, name, maxsize):
+        self.broker = broker
+        self.name = name
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+    def put(self, message):
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:  # The subscriber's event loop has closed
+            self.close()
+
+    def _put(self, message):
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            message = RESYNC
+        self.queue.put_nowait(message)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """In-process pub/sub: messages reach the subscribers of this process only.
+
+    Enough for a single ASGI worker, and the stand-in used by tests.
+    """
+
+    queue_size = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def publish(self, name, message):
+        self.deliver(name, message)
+
+    def deliver(self, name, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(name, ()))
+        for subscription in subscribers:
+            subscription.put(message)
+
+    def subscribe(self, name):
+        subscription = Subscription(self, name, self.queue_size)
+        with self._lock:
+            self._subscribers[name].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.name)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.name]
+
+
+class PostgresBroker(LocalBroker):
+    """Pub/sub across workers through PostgreSQL ``LISTEN``/``NOTIFY`` (psycopg2).
+
+    Publishing sends a ``NOTIFY`` on the default connection; every process
+    runs one listener thread on its own connection and hands what it hears
+    to its local subscribers, including the publisher's own.
+    """
+
+    pg_channel = 'resturant_live'
+    poll_seconds = 5
+
+    def __init__(self, alias='default'):
+        super().__init__()
+        self.alias = alias
+        self._listener = None
+
+    def publish(self, name, message):
+        payload = json.dumps({'name': name, 'message': message}, cls=DjangoJSONEncoder)
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.pg_channel, payload])
+
+    def subscribe(self, name):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self.listen, name='live-listener', daemon=True)
+                self._listener.start()
+        return super().subscribe(name)
+
+    def listen(self):
+        wrapper = connections[self.alias]
+        while True:
+            raw = None
+            try:
+                raw = wrapper.get_new_connection(wrapper.get_connection_params())
+                raw.autocommit = True
+                with raw.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.pg_channel}")
+                # Messages sent while reconnecting are lost; have every stream reload
+                self.deliver_all(RESYNC)
+                while True:
+                    if select.select([raw], [], [], self.poll_seconds) == ([], [], []):
+                        continue
+                    raw.poll()
+                    while raw.notifies:
+                        notification = json.loads(raw.notifies.pop(0).payload)
+                        self.deliver(notification['name'], notification['message'])
+            except Exception:
+                logger.exception("Live availability listener failed; reconnecting")
+                if raw is not None:
+                    raw.close()
+                time.sleep(self.poll_seconds)
+
+    def deliver_all(self, message):
+        with self._lock:
+            names = list(self._subscribers)
+        for name in names:
+            self.deliver(name, message)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """The broker named by ``settings.LIVE_BROKER`` (a dotted path), created once."""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(getattr(settings, 'LIVE_BROKER', 'Resturant.live.LocalBroker'))()
+        return _broker
+
+
+def reset_broker():
+    global _broker
+    with _broker_lock:
+        _broker = None
+
+
+# ------------------ Publishing ------------------
+def _publish_after_commit(messages):
+    def send():
+        broker = get_broker()
+        for day, message in messages:
+            broker.publish(channel(day), message)
+    transaction.on_commit(send, robust=True)
+
+
+def publish_reservation(pk, window=None, previous=None):
+    """Queue ``released``/``booked`` deltas for every day of the old and new ``(table_id, start, end)``."""
+    messages = []
+    if previous:
+        table_id, start, end = previous
+        messages += [
+            (day, {'type': 'released', 'reservation': pk, 'table': table_id})
+            for day in days_spanned(aware(start), aware(end))
+        ]
+    if window:
+        table_id, start, end = window
+        start, end = aware(start), aware(end)
+        messages += [
+            (day, {
+                'type': 'booked', 'reservation': pk, 'table': table_id,
+                'start': start.isoformat(), 'end': end.isoformat(),
+            })
+            for day in days_spanned(start, end)
+        ]
+    if messages:
+        _publish_after_commit(messages)
+
+
+def publish_resync(days):
+    """Bulk writes skip the model signals; streams of ``days`` reload their snapshot instead."""
+    days = set(days)
+    if days:
+        _publish_after_commit([(day, RESYNC) for day in days])
+
+
+# ------------------ Streams ------------------
+def snapshot(day):
+    start = day_start(day)
+    reservations = Table_Reservation.objects.filter(
+        reservation_start__lt=day_start(day + timedelta(days=1)),
+        reservation_end__gt=start,
+    ).order_by('reservation_start').values_list('pk', 'table_id', 'reservation_start', 'reservation_end')
+    return {
+        'date': day,
+        'open': opening_hours(day),
+        'tables': list(Table.objects.order_by('pk').values('id', 'name', 'seats')),
+        'reservations': [
+            {'reservation': pk, 'table': table_id, 'start': start, 'end': end}
+            for pk, table_id, start, end in reservations
+        ],
+    }
+
+
+def _event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+async def event_stream(day: date):
+    """Server-sent events for ``day``: a ``snapshot``, then ``booked``/``released`` deltas.
+
+    Deltas are keyed by reservation id, so one that also made it into the
+    snapshot can be applied twice without harm.
+    """
+    heartbeat = getattr(settings, 'LIVE_HEARTBEAT_SECONDS', 15)
+    subscription = get_broker().subscribe(channel(day))
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        yield _event('snapshot', await sync_to_async(snapshot)(day))
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if message['type'] == 'resync':
+                yield _event('snapshot', await sync_to_async(snapshot)(day))
+            else:
+                yield _event(message['type'], message)
+    finally:
+        subscription.close()
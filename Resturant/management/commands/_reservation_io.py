@@ -0,0 +1,39 @@
+import csv
+import json
+import sys
+from contextlib import contextmanager
+
+
+FIELDS = ['id', 'user', 'table', 'number_of_party', 'reservation_start', 'reservation_end', 'special_order']
+FORMATS = ('csv', 'ndjson')
+
+
+def guess_format(path, requested=None):
+    if requested:
+        return requested
+    return 'ndjson' if str(path).endswith(('.ndjson', '.jsonl')) else 'csv'
+
+
+@contextmanager
+def open_stream(path, mode):
+    if path == '-':
+        yield sys.stdin if 'r' in mode else sys.stdout
+    else:
+        with open(path, mode, newline='', encoding='utf-8') as stream:
+            yield stream
+
+
+def read_rows(stream, file_format):
+    """Yield ``(row, error)`` pairs one line at a time, never loading the whole file."""
+    if file_format == 'csv':
+        for row in csv.DictReader(stream):
+            yield row, None
+    else:
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line), None
+            except ValueError as error:
+                yield None, f"invalid JSON ({error})"
@@ -0,0 +1,186 @@
+"""Deterministic synthetic restaurant data for the benchmark suite.
+
+Every row comes from one ``random.Random(seed)`` and a fixed first day, so the
+same options always produce the same database.
+"""
+import random
+from datetime import date, timedelta
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import CommandError
+
+from Resturant import occupancy, orders, search
+from Resturant.availability import engine
+from Resturant.autocomplete import table_names
+from Resturant.menu_cache import catalog
+from Resturant.models import CartItem, Category, Menu, Table, Table_Reservation, TableOrder, TableOrderItem
+from Resturant.rules import calendar
+
+FIRST_DAY = date(2040, 1, 2)
+
+CATEGORIES = ('Starters', 'Soups', 'Salads', 'Mains', 'Grill', 'Pasta', 'Desserts', 'Drinks')
+DISHES = (
+    'chicken', 'beef', 'lamb', 'salmon', 'tuna', 'prawn', 'tofu', 'mushroom', 'tomato', 'potato',
+    'spinach', 'lentil', 'pumpkin', 'chocolate', 'lemon', 'mango', 'cheese', 'garlic', 'pepper', 'rice',
+)
+STYLES = ('soup', 'salad', 'curry', 'risotto', 'burger', 'skewers', 'pie', 'tart', 'stew', 'roast')
+INGREDIENTS = (
+    'onion', 'butter', 'cream', 'basil', 'thyme', 'chili', 'ginger', 'coriander', 'olive oil',
+    'parmesan', 'honey', 'sesame', 'yoghurt', 'walnut', 'paprika', 'cumin', 'mint', 'lime',
+)
+SEATS = (2, 2, 4, 4, 4, 6, 8)
+LENGTHS = (60, 90, 90, 120, 120, 150)
+GAPS = (0, 0, 15, 30, 60)
+# Consecutive days without room for a booking after which the opening hours are taken to have none
+IDLE_DAYS = 366
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class SyntheticData:
+    """Seed tables, users, menu items, reservations and orders with ``bulk_create``."""
+
+    def __init__(self, seed=7, tables=50, users=200, menu_items=300, reservations=10_000,
+                 order_ratio=0.2, batch_size=5000):
+        self.rng = random.Random(seed)
+        self.scale = {
+            'seed': seed,
+            'tables': tables,
+            'users': users,
+            'menu_items': menu_items,
+            'reservations': reservations,
+            'order_ratio': order_ratio,
+        }
+        self.batch_size = batch_size
+        self.last_day = FIRST_DAY
+
+    def seed(self):
+        self.tables = Table.objects.bulk_create(
+            Table(name=f"Table {index + 1}", seats=self.rng.choice(SEATS))
+            for index in range(self.scale['tables'])
+        )
+        self.users = self.seed_users()
+        self.menu = self.seed_menu()
+        for batch in batched(self.reservations(), self.batch_size):
+            Table_Reservation.objects.bulk_create(batch)
+            self.seed_orders(batch)
+
+        # bulk_create skips the signals that maintain these
+        occupancy.rebuild(batch_size=self.batch_size)
+        orders.refresh_totals()
+        search.reindex()
+        self.reset_caches()
+        return self
+
+    @staticmethod
+    def reset_caches():
+        engine.reset()
+        catalog.bump()
+        table_names.invalidate()
+        calendar.reset()
+
+    def seed_users(self):
+        # One hash for everybody; the suite logs in with force_login
+        password = make_password('benchmark')
+        users = User.objects.bulk_create(
+            User(username=f"diner{index}", password=password)
+            for index in range(self.scale['users'] - 1)
+        )
+        staff = User.objects.create(username='bench-staff', password=password, is_staff=True)
+        return [staff, *users]
+
+    def seed_menu(self):
+        categories = Category.objects.bulk_create(Category(type=name) for name in CATEGORIES)
+        menu = []
+        for index in range(self.scale['menu_items']):
+            dish, style = self.rng.choice(DISHES), self.rng.choice(STYLES)
+            menu.append(Menu(
+                item_name=f"{dish.title()} {style} {index + 1}",
+                item_price=round(self.rng.uniform(3, 40), 2),
+                ingredients=', '.join([dish, *self.rng.sample(INGREDIENTS, 4)]),
+                category=self.rng.choice(categories),
+            ))
+        return Menu.objects.bulk_create(menu, batch_size=self.batch_size)
+
+    def reservations(self):
+        """Non-overlapping bookings packed table by table into each open day."""
+        remaining = self.scale['reservations']
+        day = FIRST_DAY
+        idle_days = 0
+        while remaining:
+            before = remaining
+            for opening, closing in calendar.intervals(day):
+                for table in self.tables:
+                    start = opening
+                    while remaining:
+                        start += timedelta(minutes=self.rng.choice(GAPS))
+                        end = start + timedelta(minutes=self.rng.choice(LENGTHS))
+                        if end > closing:
+                            break
+                        yield Table_Reservation(
+                            user=self.rng.choice(self.users),
+                            table=table,
+                            number_of_party=self.rng.randint(1, table.seats),
+                            reservation_start=start,
+                            reservation_end=end,
+                        )
+                        remaining -= 1
+                        start = end
+            idle_days = idle_days + 1 if remaining == before else 0
+            self.check_idle(idle_days, day)
+            self.last_day = day
+            day += timedelta(days=1)
+
+    @staticmethod
+    def check_idle(idle_days, day):
+        if idle_days >= IDLE_DAYS:
+            raise CommandError(
+                f"No open interval long enough for a booking in the {IDLE_DAYS} days up to {day}; "
+                "check OPENING_HOURS, CLOSED_DATES and SPECIAL_HOURS."
+            )
+
+    def seed_orders(self, reservations):
+        ordered = [
+            reservation for reservation in reservations
+            if self.rng.random() < self.scale['order_ratio']
+        ]
+        table_orders = TableOrder.objects.bulk_create(
+            TableOrder(reservation=reservation) for reservation in ordered
+        )
+        TableOrderItem.objects.bulk_create([
+            TableOrderItem(table_order=table_order, menu_item=menu_item, quantity=self.rng.randint(1, 3))
+            for table_order in table_orders
+            for menu_item in self.rng.sample(self.menu, min(len(self.menu), self.rng.randint(1, 4)))
+        ], batch_size=self.batch_size)
+
+    def fill_cart(self, user, lines):
+        CartItem.objects.bulk_create(
+            CartItem(user=user, menu_item=menu_item, quantity=self.rng.randint(1, 3))
+            for menu_item in self.rng.sample(self.menu, min(lines, len(self.menu)))
+        )
+
+    def free_windows(self, count):
+        """``count`` distinct ``(table, start, end)`` windows after the seeded days."""
+        windows = []
+        day = self.last_day + timedelta(days=1)
+        idle_days = 0
+        while len(windows) < count:
+            before = len(windows)
+            for opening, closing in calendar.intervals(day):
+                start = opening
+                while start + timedelta(hours=1) <= closing and len(windows) < count:
+                    for table in self.tables:
+                        windows.append((table, start, start + timedelta(hours=1)))
+                        if len(windows) == count:
+                            break
+                    start += timedelta(hours=1)
+            idle_days = idle_days + 1 if len(windows) == before else 0
+            self.check_idle(idle_days, day)
+            day += timedelta(days=1)
+        return windows
@@ -0,0 +1,107 @@
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from Resturant.assignment import assign_table
+from Resturant.availability import engine
+from Resturant.models import Table, Table_Reservation
+from Resturant.rules import calendar
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay synthetic booking days through the table assignment engine and report "
+        "assignment latency and seat utilization. Everything runs in a rolled-back transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=3)
+        parser.add_argument('--bookings', type=int, default=1500, help="Requests per day.")
+        parser.add_argument('--tables', default='2x20,4x20,6x10,8x6', help="Synthetic floor as SEATSxCOUNT,...")
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        requests = self.synthetic_requests(options)
+        for label, pack in (("best fit", False), ("best fit + packing", True)):
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            try:
+                with transaction.atomic():
+                    self.report(*self.replay(requests, pack, options))
+                    raise Rollback
+            except Rollback:
+                pass
+            finally:
+                # Signals fed the rolled-back rows into the index
+                engine.reset()
+
+    def synthetic_requests(self, options):
+        rng = random.Random(options['seed'])
+        self.open_minutes = 0
+        day = timezone.localdate() + timedelta(days=365)
+
+        requests = []
+        for _ in range(options['days']):
+            while not calendar.intervals(day):
+                day += timedelta(days=1)
+            intervals = calendar.intervals(day)
+            self.open_minutes += sum((closing - opening) // timedelta(minutes=1) for opening, closing in intervals)
+            for _ in range(options['bookings']):
+                party = rng.choices([1, 2, 3, 4, 5, 6, 8], weights=[5, 30, 15, 25, 8, 10, 7])[0]
+                length = rng.choice([60, 90, 120, 150])
+                opening, closing = rng.choice(intervals)
+                offset = rng.randrange(0, max(1, (closing - opening) // timedelta(minutes=1) - length + 1), 15)
+                start = opening + timedelta(minutes=offset)
+                requests.append((party, start, start + timedelta(minutes=length)))
+            day += timedelta(days=1)
+        return requests
+
+    def floor(self, options):
+        tables = []
+        for group in options['tables'].split(','):
+            seats, count = (int(part) for part in group.split('x'))
+            tables += [Table(name=f"Bench {seats}-{index}", seats=seats) for index in range(count)]
+        return Table.objects.bulk_create(tables)
+
+    def replay(self, requests, pack, options):
+        tables = self.floor(options)
+        floor = Table.objects.filter(pk__in=[table.pk for table in tables])
+        engine.reset()
+        user, _ = User.objects.get_or_create(username='assignment-benchmark')
+
+        latencies, booked, seated_minutes, table_minutes = [], 0, 0, 0
+        for party, start, end in requests:
+            started = time.perf_counter()
+            table = assign_table(party, start, end, pack=pack, tables=floor)
+            latencies.append(time.perf_counter() - started)
+            if table is None:
+                continue
+            Table_Reservation.objects.create(
+                user=user, table=table, number_of_party=party, reservation_start=start, reservation_end=end
+            )
+            minutes = (end - start) // timedelta(minutes=1)
+            booked += 1
+            seated_minutes += party * minutes
+            table_minutes += table.seats * minutes
+
+        capacity = sum(table.seats for table in tables) * self.open_minutes
+        return latencies, booked, len(requests), seated_minutes, table_minutes, capacity
+
+    def report(self, latencies, booked, requested, seated_minutes, table_minutes, capacity):
+        latencies = sorted(latency * 1000 for latency in latencies)
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+        self.stdout.write(
+            f"  latency      p50 {statistics.median(latencies):6.2f} ms  p95 {p95:6.2f} ms\n"
+            f"  booked       {booked}/{requested} requests ({booked / requested:.1%})\n"
+            f"  seat fill    {seated_minutes / table_minutes if table_minutes else 0:.1%} of seats at booked tables\n"
+            f"  utilization  {seated_minutes / capacity if capacity else 0:.1%} of all seat-minutes"
+        )
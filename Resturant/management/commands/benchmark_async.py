@@ -0,0 +1,98 @@
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the throughput of the sync (WSGI) and async (ASGI) variants of the hot read "
+        "endpoints under concurrent load, in-process through Django's test clients."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Staff username to log in as (default: first staff user).")
+        parser.add_argument('--requests', type=int, default=400, help="Requests per endpoint and mode.")
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--date', default=timezone.localdate().isoformat(), help="YYYY-MM-DD to query.")
+        parser.add_argument('--query', default='a', help="Menu search term.")
+
+    def endpoints(self, options):
+        date, query = options['date'], options['query']
+        return [
+            ("check_availability", f"/check-availability/?date={date}&time=19:00",
+             f"/async/check-availability/?date={date}&time=19:00"),
+            ("availability grid", f"/availability-grid/?date={date}",
+             f"/async/availability-grid/?date={date}"),
+            ("reservation list API", "/api/?limit=50", "/api/async/?limit=50"),
+            # Both sides run the same search: 8 results, no total count
+            ("menu typeahead", f"/search/typeahead/?term={query}", f"/async/search/typeahead/?term={query}"),
+        ]
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_staff=True)
+        if options['user']:
+            users = users.filter(username=options['user'])
+        self.user = users.order_by('pk').first()
+        if self.user is None:
+            raise CommandError("A staff user is required (see --user).")
+        # The REST listing only accepts token auth; the page views use the session
+        self.authorization = f"Bearer {AccessToken.for_user(self.user)}"
+
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for label, sync_path, async_path in self.endpoints(options):
+                self.stdout.write(self.style.MIGRATE_HEADING(label))
+                self.report("sync  (WSGI)", self.run_sync(sync_path, options))
+                self.report("async (ASGI)", asyncio.run(self.run_async(async_path, options)))
+
+    def run_sync(self, path, options):
+        local = threading.local()
+
+        def request(_):
+            if not hasattr(local, 'client'):
+                local.client = Client(HTTP_AUTHORIZATION=self.authorization)
+                local.client.force_login(self.user)
+            started = time.perf_counter()
+            response = local.client.get(path)
+            return time.perf_counter() - started, response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = list(pool.map(request, range(options['requests'])))
+        return results, time.perf_counter() - started
+
+    async def run_async(self, path, options):
+        client = AsyncClient(headers={'Authorization': self.authorization})
+        await client.aforce_login(self.user)
+        semaphore = asyncio.Semaphore(options['concurrency'])
+
+        async def request():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(path)
+                return time.perf_counter() - started, response.status_code
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(request() for _ in range(options['requests'])))
+        return results, time.perf_counter() - started
+
+    def report(self, label, run):
+        results, elapsed = run
+        latencies = sorted(latency * 1000 for latency, _ in results)
+        failures = sum(1 for _, status_code in results if status_code != 200)
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+        line = (
+            f"  {label}: {len(results) / elapsed:8.1f} req/s  "
+            f"p50 {statistics.median(latencies):6.1f} ms  p95 {p95:6.1f} ms"
+        )
+        if failures:
+            line += f"  ({failures} non-200 responses)"
+        self.stdout.write(line)
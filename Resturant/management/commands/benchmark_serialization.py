@@ -0,0 +1,88 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.renderers import JSONRenderer
+
+from Resturant.models import Table_Reservation
+from RestFrameWork.renderers import FastJSONRenderer, orjson
+from RestFrameWork.serializers import Table_Reservation_Serializer, reservation_rows
+from ._synthetic_data import SyntheticData
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare reservation API serialization throughput: the DRF ModelSerializer against the "
+        "values_list() fast path, rendered by DRF's JSONRenderer and by FastJSONRenderer (orjson), as row objects "
+        "and as parallel arrays. Runs against a throwaway database of synthetic reservations."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000, help="Reservations serialized per run.")
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            SyntheticData(seed=options['seed'], reservations=options['rows'], order_ratio=0).seed()
+            queryset = Table_Reservation.objects.order_by('reservation_start', 'id')
+            self.check_parity(queryset)
+            self.report(self.run(queryset, options), options['rows'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            SyntheticData.reset_caches()
+
+    def variants(self, queryset):
+        stdlib = JSONRenderer()
+
+        def model_serializer():
+            return stdlib.render(Table_Reservation_Serializer(list(queryset), many=True).data)
+
+        def compact(render, columns=False):
+            encode = reservation_rows.as_columns if columns else reservation_rows.as_dicts
+            return lambda: render(encode(reservation_rows.project(queryset)))
+
+        variants = [
+            ("ModelSerializer + json", model_serializer),
+            ("values_list rows + json", compact(stdlib.render)),
+            ("values_list columns + json", compact(stdlib.render, columns=True)),
+        ]
+        if orjson is not None:
+            fast = FastJSONRenderer()
+            variants += [
+                ("values_list rows + orjson", compact(fast.render)),
+                ("values_list columns + orjson", compact(fast.render, columns=True)),
+            ]
+        else:
+            self.stdout.write(self.style.WARNING("orjson is not installed; skipping the orjson variants."))
+        return variants
+
+    def check_parity(self, queryset):
+        sample = queryset[:500]
+        expected = json.loads(JSONRenderer().render(Table_Reservation_Serializer(sample, many=True).data))
+        if reservation_rows.as_dicts(reservation_rows.project(sample)) != expected:
+            raise CommandError("The values_list() fast path no longer matches Table_Reservation_Serializer.")
+
+    def run(self, queryset, options):
+        results = []
+        for label, render in self.variants(queryset):
+            render()  # Warm up
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                body = render()
+                timings.append(time.perf_counter() - started)
+            results.append((label, statistics.median(timings), len(body)))
+        return results
+
+    def report(self, results, rows):
+        baseline = results[0][1]
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{rows:,} reservations, query + encode + render (median)"))
+        for label, elapsed, size in results:
+            self.stdout.write(
+                f"  {label:<30} {elapsed * 1000:9.1f} ms  {rows / elapsed:>12,.0f} rows/s  "
+                f"{size / 1024:9.0f} KiB  x{baseline / elapsed:5.1f}"
+            )
@@ -0,0 +1,278 @@
+import gc
+import json
+import os
+import platform
+import statistics
+import time
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from Resturant import cart, profiling
+from Resturant.models import Table_Reservation
+from Resturant.rules import calendar
+from ._synthetic_data import DISHES, SyntheticData
+
+# Page templates live one level down in templates/templates
+PAGE_TEMPLATES = [dict(settings.TEMPLATES[0], DIRS=[settings.BASE_DIR / 'templates' / 'templates'])]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway database with deterministic synthetic data, time the hot request paths "
+        "through the test client and write the results as JSON. With --baseline, cases slower "
+        "than the threshold or issuing more queries are reported as regressions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reservations', type=int, default=10_000, help="Try 100000 or 1000000 too.")
+        parser.add_argument('--tables', type=int, default=50)
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--menu-items', type=int, default=300)
+        parser.add_argument('--order-ratio', type=float, default=0.2, help="Share of reservations with an order.")
+        parser.add_argument('--seed', type=int, default=7)
+        parser.add_argument('--repeat', type=int, default=50, help="Timed requests per case.")
+        parser.add_argument('--warmup', type=int, default=5, help="Untimed requests per case.")
+        parser.add_argument('--case', action='append', help="Run only these cases (repeatable).")
+        parser.add_argument('--db-file', help="Seed into this SQLite file instead of memory (it is replaced).")
+        parser.add_argument('--output', help="JSON file to write (default: benchmarks/<timestamp>.json).")
+        parser.add_argument('--baseline', help="Earlier JSON output to compare against.")
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help="Flag cases whose median is this much slower than the baseline.")
+
+    def handle(self, *args, **options):
+        baseline = self.load_baseline(options['baseline'])
+        if options['db_file']:
+            connection.settings_dict['TEST']['NAME'] = options['db_file']
+
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(
+                DEBUG=False,
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                TEMPLATES=PAGE_TEMPLATES,
+            ):
+                started = time.perf_counter()
+                data = SyntheticData(
+                    seed=options['seed'],
+                    tables=options['tables'],
+                    users=options['users'],
+                    menu_items=options['menu_items'],
+                    reservations=options['reservations'],
+                    order_ratio=options['order_ratio'],
+                ).seed()
+                self.stdout.write(f"Seeded {options['reservations']:,} reservations in "
+                                  f"{time.perf_counter() - started:.1f}s")
+                results = self.run_cases(data, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            SyntheticData.reset_caches()
+
+        report = {
+            'created': timezone.now().isoformat(),
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'machine': platform.machine(),
+            },
+            'scale': data.scale,
+            'cases': results,
+        }
+        path = self.write(report, options['output'])
+        self.stdout.write(f"Results written to {path}")
+
+        if baseline is not None:
+            regressions = self.compare(report, baseline, options['threshold'])
+            if regressions:
+                raise CommandError(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
+
+    # ------------------ Cases ------------------
+    def cases(self, data, options):
+        """``name -> (expected status, request(client, iteration), untimed setup(iteration) or None)``."""
+        staff = data.users[0]
+        runs = options['warmup'] + options['repeat']
+        samples = self.sample_reservations(runs)
+        *windows, (table, start, end) = data.free_windows(runs + 1)
+        staff_reservation = Table_Reservation.objects.create(
+            user=staff, table=table, number_of_party=1, reservation_start=start, reservation_end=end,
+        )
+
+        def local(value):
+            return timezone.localtime(value).strftime('%Y-%m-%dT%H:%M')
+
+        def overlap_validation(client, index):
+            reservation = samples[index % len(samples)]
+            return client.post('/create-reservation/', {
+                'action': 'check_availability',
+                'table': reservation.table_id,
+                'number_of_party': 1,
+                'reservation_start': local(reservation.reservation_start),
+                'reservation_end': local(reservation.reservation_start + timedelta(minutes=60)),
+                'form-TOTAL_FORMS': 0,
+                'form-INITIAL_FORMS': 0,
+            })
+
+        def check_availability(client, index):
+            day = timezone.localtime(samples[index % len(samples)].reservation_start).date()
+            opening = timezone.localtime(calendar.intervals(day)[0][0])
+            return client.get(f"/check-availability/?date={day}&time={opening:%H:%M}")
+
+        def menu_search(client, index):
+            return client.get(f"/search/?query={DISHES[index % len(DISHES)]}")
+
+        def menu_typeahead(client, index):
+            return client.get(f"/search/typeahead/?term={DISHES[index % len(DISHES)][:3]}")
+
+        def cart_add_many(client, index):
+            lines = [
+                {'menu_item': data.menu[(index * 7 + offset) % len(data.menu)].pk, 'quantity': 1}
+                for offset in range(10)
+            ]
+            return client.post('/cart/add-many/', {'items': lines}, content_type='application/json')
+
+        def refill_cart(index):
+            cart.clear(staff)
+            data.fill_cart(staff, 20)
+
+        def cart_merge(client, index):
+            return client.get(f"/cart/add-to-reservation/{staff_reservation.pk}/")
+
+        def rest_create(client, index):
+            table, start, end = windows[index]
+            return client.post('/api/create/', {
+                'table': table.pk,
+                'number_of_party': 1,
+                'reservation_start': start.isoformat(),
+                'reservation_end': end.isoformat(),
+            }, content_type='application/json')
+
+        return {
+            'overlap_validation': (200, overlap_validation, None),
+            'check_availability': (200, check_availability, None),
+            'reservation_listing': (200, lambda client, index: client.get('/display-reservation/'), None),
+            'menu_search': (200, menu_search, None),
+            'menu_typeahead': (200, menu_typeahead, None),
+            'cart_add_many': (200, cart_add_many, None),
+            'cart_merge': (302, cart_merge, refill_cart),
+            'rest_list': (200, lambda client, index: client.get('/api/?limit=50'), None),
+            'rest_create': (201, rest_create, None),
+        }
+
+    def sample_reservations(self, count):
+        """Up to ``count`` reservations spread evenly over the seeded ones."""
+        total = Table_Reservation.objects.count()
+        step = max(1, total // max(1, count))
+        pks = Table_Reservation.objects.order_by('pk').values_list('pk', flat=True)[::step][:count]
+        return list(Table_Reservation.objects.filter(pk__in=list(pks)).order_by('pk'))
+
+    def run_cases(self, data, options):
+        cases = self.cases(data, options)
+        unknown = set(options['case'] or ()) - set(cases)
+        if unknown:
+            raise CommandError(f"Unknown cases: {', '.join(sorted(unknown))}. Choose from {', '.join(cases)}.")
+
+        staff = data.users[0]
+        client = Client(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(staff)}")
+        client.force_login(staff)
+
+        results = {}
+        for name, (expected, request, setup) in cases.items():
+            if options['case'] and name not in options['case']:
+                continue
+            for index in range(options['warmup']):
+                if setup is not None:
+                    setup(index)
+                request(client, index)
+
+            gc.collect()
+            profiling.registry.reset()
+            latencies, failures, view_name = [], 0, None
+            for index in range(options['warmup'], options['warmup'] + options['repeat']):
+                if setup is not None:
+                    setup(index)
+                started = time.perf_counter()
+                response = request(client, index)
+                latencies.append((time.perf_counter() - started) * 1000)
+                failures += response.status_code != expected
+                view_name = response.resolver_match.view_name
+
+            results[name] = self.summarize(latencies, failures, view_name)
+            self.report(name, results[name])
+        return results
+
+    def summarize(self, latencies, failures, view_name):
+        latencies = sorted(latencies)
+        stats = profiling.registry.snapshot()['views'].get(view_name)
+        return {
+            'requests': len(latencies),
+            'failures': failures,
+            'mean_ms': round(statistics.fmean(latencies), 3),
+            'p50_ms': round(statistics.median(latencies), 3),
+            'p95_ms': round(latencies[max(0, int(len(latencies) * 0.95) - 1)], 3),
+            'min_ms': round(latencies[0], 3),
+            'max_ms': round(latencies[-1], 3),
+            # Counted by the profiling middleware; None when PROFILING_ENABLED is off
+            'queries': stats['mean_queries'] if stats else None,
+        }
+
+    def report(self, name, result):
+        line = (
+            f"  {name:<22} p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  "
+            f"queries {result['queries'] if result['queries'] is not None else '-'}"
+        )
+        if result['failures']:
+            self.stdout.write(self.style.ERROR(f"{line}  ({result['failures']} unexpected statuses)"))
+        else:
+            self.stdout.write(line)
+
+    # ------------------ Results ------------------
+    def load_baseline(self, path):
+        if not path:
+            return None
+        try:
+            with open(path) as stream:
+                return json.load(stream)
+        except (OSError, ValueError) as error:
+            raise CommandError(f"Cannot read baseline {path}: {error}")
+
+    def write(self, report, path):
+        if not path:
+            directory = settings.BASE_DIR / 'benchmarks'
+            os.makedirs(directory, exist_ok=True)
+            path = directory / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+        with open(path, 'w') as stream:
+            json.dump(report, stream, indent=2)
+        return path
+
+    def compare(self, report, baseline, threshold):
+        if baseline.get('scale') != report['scale']:
+            self.stdout.write(self.style.WARNING("Baseline was seeded at a different scale; timings may differ."))
+
+        regressions = []
+        self.stdout.write(self.style.MIGRATE_HEADING("Against baseline"))
+        for name, result in report['cases'].items():
+            previous = baseline.get('cases', {}).get(name)
+            if previous is None:
+                continue
+            ratio = result['p50_ms'] / previous['p50_ms'] if previous['p50_ms'] else 1
+            more_queries = (
+                result['queries'] is not None and previous.get('queries') is not None
+                and result['queries'] > previous['queries']
+            )
+            line = f"  {name:<22} {ratio - 1:+7.1%} median"
+            if more_queries:
+                line += f", queries {previous['queries']} -> {result['queries']}"
+            if ratio > 1 + threshold or more_queries or result['failures']:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(line + "  REGRESSION"))
+            else:
+                self.stdout.write(line)
+        return regressions
@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from Resturant.models import Table_Reservation, CartItem
+
+
+class Command(BaseCommand):
+    help = "Print the query plan of each reservation/cart hot path and check it uses its index."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, default=1, help="User id used in the sample queries.")
+        parser.add_argument('--table', type=int, default=1, help="Table id used in the sample queries.")
+        parser.add_argument('--menu-item', type=int, default=1, help="Menu id used in the sample queries.")
+        parser.add_argument('--strict', action='store_true', help="Exit with an error if an index is not used.")
+
+    def hot_queries(self, options):
+        now = timezone.now()
+        return [
+            (
+                "Reservation listing (ViewReservationView)",
+                'reservation_user_start_idx',
+                Table_Reservation.objects.filter(
+                    user_id=options['user'], reservation_start__date=now.date()
+                ).order_by('-reservation_start'),
+            ),
+            (
+                "Overlap check (availability)",
+                'reservation_table_time_idx',
+                Table_Reservation.objects.filter(
+                    table_id=options['table'],
+                    reservation_start__lt=now + timedelta(hours=2),
+                    reservation_end__gt=now,
+                ).values('pk'),
+            ),
+            (
+                "Cart lookup",
+                # SQLite backs an inline UNIQUE constraint with sqlite_autoindex_<table>_<n>
+                ('cartitem_user_menu_uniq', f'sqlite_autoindex_{CartItem._meta.db_table}_'),
+                CartItem.objects.filter(
+                    user_id=options['user'], menu_item_id=options['menu_item']
+                ).values('quantity'),
+            ),
+        ]
+
+    def handle(self, *args, **options):
+        missing = []
+        for label, index_names, queryset in self.hot_queries(options):
+            if isinstance(index_names, str):
+                index_names = (index_names,)
+            index_name = index_names[0]
+            plan = queryset.explain()
+            used = any(name in plan for name in index_names)
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(plan)
+            if used:
+                self.stdout.write(self.style.SUCCESS(f"  uses {index_name}\n"))
+            else:
+                missing.append(index_name)
+                self.stdout.write(self.style.WARNING(f"  does NOT use {index_name}\n"))
+
+        if missing and options['strict']:
+            raise CommandError(
+                f"Indexes not used on {connection.vendor}: {', '.join(missing)}"
+            )
@@ -0,0 +1,62 @@
+import csv
+import json
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from Resturant.models import Table_Reservation
+from ._reservation_io import FIELDS, FORMATS, guess_format, open_stream
+
+
+class Command(BaseCommand):
+    help = "Stream reservations to CSV or NDJSON without loading them all into memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to write, or '-' for stdout.")
+        parser.add_argument('--format', choices=FORMATS, help="Defaults to the file extension.")
+        parser.add_argument('--start-date', help="Only reservations starting on/after YYYY-MM-DD.")
+        parser.add_argument('--end-date', help="Only reservations starting on/before YYYY-MM-DD.")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def get_queryset(self, options):
+        queryset = Table_Reservation.objects.order_by('reservation_start', 'id')
+        try:
+            if options['start_date']:
+                start = datetime.strptime(options['start_date'], '%Y-%m-%d')
+                queryset = queryset.filter(reservation_start__gte=timezone.make_aware(start))
+            if options['end_date']:
+                end = datetime.strptime(options['end_date'], '%Y-%m-%d') + timedelta(days=1)
+                queryset = queryset.filter(reservation_start__lt=timezone.make_aware(end))
+        except ValueError:
+            raise CommandError("Dates must be in YYYY-MM-DD format.")
+        columns = ['id', 'user_id', 'table_id', 'number_of_party',
+                   'reservation_start', 'reservation_end', 'special_order']
+        return queryset.values_list(*columns).iterator(chunk_size=options['chunk_size'])
+
+    def handle(self, *args, **options):
+        file_format = guess_format(options['path'], options['format'])
+        started = time.perf_counter()
+        exported = 0
+
+        with open_stream(options['path'], 'w') as stream:
+            writer = csv.writer(stream) if file_format == 'csv' else None
+            if writer:
+                writer.writerow(FIELDS)
+            for values in self.get_queryset(options):
+                values = [
+                    value.isoformat() if isinstance(value, datetime) else value
+                    for value in values
+                ]
+                if writer:
+                    writer.writerow(values)
+                else:
+                    stream.write(json.dumps(dict(zip(FIELDS, values))) + "\n")
+                exported += 1
+
+        elapsed = time.perf_counter() - started
+        rate = exported / elapsed if elapsed else 0
+        self.stderr.write(self.style.SUCCESS(
+            f"Exported {exported} reservations in {elapsed:.2f}s ({rate:,.0f} rows/s)"
+        ))
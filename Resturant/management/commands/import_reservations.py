@@ -0,0 +1,136 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from Resturant import live, occupancy
+from Resturant.availability import TableIntervalIndex, engine
+from Resturant.models import Table, Table_Reservation
+from ._reservation_io import FORMATS, guess_format, open_stream, read_rows
+
+
+class Command(BaseCommand):
+    help = "Bulk-load reservations from CSV or NDJSON, checking overlaps in memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to read, or '-' for stdin.")
+        parser.add_argument('--format', choices=FORMATS, help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--strict', action='store_true', help="Abort on the first invalid row.")
+        parser.add_argument('--dry-run', action='store_true', help="Validate only; write nothing.")
+        parser.add_argument('--show-errors', type=int, default=20, help="How many row errors to print.")
+
+    def handle(self, *args, **options):
+        self.user_ids = set(User.objects.values_list('id', flat=True))
+        self.table_seats = dict(Table.objects.values_list('id', 'seats'))
+        self.intervals = {}
+        self.errors = 0
+        self.options = options
+
+        imported = 0
+        batch = []
+        started = time.perf_counter()
+        file_format = guess_format(options['path'], options['format'])
+
+        with open_stream(options['path'], 'r') as stream:
+            for line_number, (row, error) in enumerate(read_rows(stream, file_format), start=1):
+                reservation = None
+                if error is None:
+                    reservation, error = self.build(row)
+                if error is not None:
+                    self.reject(line_number, error)
+                    continue
+
+                batch.append(reservation)
+                if len(batch) >= options['batch_size']:
+                    imported += self.write(batch)
+                    batch = []
+            imported += self.write(batch)
+
+        if imported and not options['dry_run']:
+            # bulk_create skips post_save, so let the availability index reload
+            engine.reset()
+
+        elapsed = time.perf_counter() - started
+        rate = (imported + self.errors) / elapsed if elapsed else 0
+        verb = "Validated" if options['dry_run'] else "Imported"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {imported} reservations, rejected {self.errors} rows "
+            f"in {elapsed:.2f}s ({rate:,.0f} rows/s)"
+        ))
+
+    def reject(self, line_number, error):
+        self.errors += 1
+        if self.options['strict']:
+            raise CommandError(f"Row {line_number}: {error}")
+        if self.errors <= self.options['show_errors']:
+            self.stderr.write(f"Row {line_number}: {error}")
+
+    def table_intervals(self, table_id):
+        index = self.intervals.get(table_id)
+        if index is None:
+            index = self.intervals[table_id] = TableIntervalIndex()
+            existing = Table_Reservation.objects.filter(table_id=table_id).values_list(
+                'pk', 'reservation_start', 'reservation_end'
+            ).order_by('reservation_start')
+            for pk, start, end in existing.iterator(chunk_size=self.options['batch_size']):
+                index.add(pk, start, end)
+        return index
+
+    def build(self, row):
+        try:
+            user_id = int(row['user'])
+            table_id = int(row['table'])
+            party = int(row['number_of_party'])
+            start = parse_datetime(str(row['reservation_start']))
+            end = parse_datetime(str(row['reservation_end']))
+        except (KeyError, TypeError, ValueError) as error:
+            return None, f"missing or malformed field ({error})"
+
+        if start is None or end is None:
+            return None, "reservation_start/reservation_end must be ISO 8601 datetimes"
+        if timezone.is_naive(start):
+            start = timezone.make_aware(start)
+        if timezone.is_naive(end):
+            end = timezone.make_aware(end)
+        if end <= start:
+            return None, "reservation_end must be after reservation_start"
+        if user_id not in self.user_ids:
+            return None, f"unknown user {user_id}"
+        if table_id not in self.table_seats:
+            return None, f"unknown table {table_id}"
+        if not 0 < party < 99 or party > self.table_seats[table_id]:
+            return None, f"party of {party} does not fit table {table_id}"
+
+        index = self.table_intervals(table_id)
+        if index.overlapping(start, end):
+            return None, f"table {table_id} is already reserved between {start} and {end}"
+        # Later rows in the same file must not overlap this one either
+        index.add(None, start, end)
+
+        return Table_Reservation(
+            user_id=user_id,
+            table_id=table_id,
+            number_of_party=party,
+            reservation_start=start,
+            reservation_end=end,
+            special_order=row.get('special_order') or None,
+        ), None
+
+    def write(self, batch):
+        if not batch or self.options['dry_run']:
+            return len(batch)
+        with transaction.atomic():
+            Table_Reservation.objects.bulk_create(batch, batch_size=self.options['batch_size'])
+            touched = {
+                pair for reservation in batch
+                for pair in occupancy.affected(
+                    reservation.table_id, reservation.reservation_start, reservation.reservation_end
+                )
+            }
+            occupancy.refresh(touched)
+            live.publish_resync(day for _, day in touched)
+        return len(batch)
@@ -0,0 +1,114 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import Menu, Category
+
+
+class MenuCatalog:
+    """Versioned cache of the menu catalog.
+
+    Every entry is keyed by ``(version, name)``; saving or deleting a ``Menu``
+    or ``Category`` bumps the version (see ``Resturant.signals``) so stale
+    entries simply stop being read and age out of the LRU. When
+    ``MENU_CACHE_ALIAS`` names a Django cache, the version and entries are
+    shared through it so every worker sees the same catalog; deployments with
+    more than one worker process should set it. Otherwise the catalog is
+    process-local, a bump only reaches the process that made the change, and
+    other workers reload their copy after ``MENU_CACHE_MAX_AGE`` seconds.
+    """
+
+    version_key = 'menu-catalog:version'
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._local_version = 1
+        self._loaded_at = time.monotonic()
+
+    @property
+    def shared(self):
+        alias = getattr(settings, 'MENU_CACHE_ALIAS', None)
+        return caches[alias] if alias else None
+
+    def version(self):
+        shared = self.shared
+        if shared is None:
+            return self._local_version
+        version = shared.get(self.version_key)
+        if version is None:
+            shared.add(self.version_key, 1, timeout=None)
+            version = shared.get(self.version_key, 1)
+        return version
+
+    def bump(self):
+        with self._lock:
+            self._local_version += 1
+            self._entries.clear()
+        shared = self.shared
+        if shared is not None:
+            try:
+                shared.incr(self.version_key)
+            except ValueError:
+                shared.set(self.version_key, 2, timeout=None)
+
+    def _expire_if_stale(self):
+        max_age = getattr(settings, 'MENU_CACHE_MAX_AGE', 60)
+        if max_age is not None and time.monotonic() - self._loaded_at > max_age:
+            self._entries.clear()
+            self._loaded_at = time.monotonic()
+
+    def get(self, name, loader):
+        key = (self.version(), name)
+        with self._lock:
+            self._expire_if_stale()
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        shared = self.shared
+        shared_key = f'menu-catalog:{key[0]}:{name}'
+        value = shared.get(shared_key) if shared is not None else None
+        if value is None:
+            value = loader()
+            if shared is not None:
+                shared.set(shared_key, value)
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    # ------------------ Catalog Reads ------------------
+    def items(self):
+        return self.get('items', lambda: list(Menu.objects.select_related('category').order_by('pk')))
+
+    def items_by_pk(self):
+        return self.get('items-by-pk', lambda: {item.pk: item for item in self.items()})
+
+    def item(self, pk):
+        return self.items_by_pk().get(pk)
+
+    def categories(self):
+        return self.get('categories', lambda: list(Category.objects.order_by('pk')))
+
+    def digest(self):
+        """Fingerprint of the catalog contents, computed once per version (menu ETags)."""
+        return self.get('digest', lambda: hashlib.blake2b(repr([
+            [(item.pk, item.item_name, item.item_price, item.ingredients, str(item.images), item.category_id)
+             for item in self.items()],
+            [(category.pk, category.type) for category in self.categories()],
+        ]).encode(), digest_size=12).hexdigest())
+
+    def choices(self):
+        return self.get('choices', lambda: [('', '---------')] + [(item.pk, str(item)) for item in self.items()])
+
+
+catalog = MenuCatalog()
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-16 22:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Resturant', '0003_alter_table_reservation_table'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='table_reservation',
+            index=models.Index(fields=['table', 'reservation_start', 'reservation_end'], name='reservation_table_time_idx'),
+        ),
+    ]
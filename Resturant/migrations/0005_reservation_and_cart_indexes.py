@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-16 22:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Resturant', '0004_table_reservation_time_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cartitem',
+            index=models.Index(fields=['user', 'menu_item', 'quantity'], name='cartitem_user_menu_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='table_reservation',
+            index=models.Index(fields=['user', '-reservation_start'], name='reservation_user_start_idx'),
+        ),
+    ]
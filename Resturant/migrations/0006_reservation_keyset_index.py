@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-16 22:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Resturant', '0005_reservation_and_cart_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='table_reservation',
+            index=models.Index(fields=['reservation_start', 'id'], name='reservation_start_id_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+from django.db import migrations
+
+# Frozen copy of the schema in Resturant.search at the time of this migration
+SQLITE_SETUP = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS menu_search USING fts5("
+    "item_name, ingredients, category, tokenize='unicode61', prefix='2 3')",
+]
+POSTGRES_SETUP = [
+    "CREATE TABLE IF NOT EXISTS menu_search ("
+    "menu_id bigint PRIMARY KEY REFERENCES {menu_table} (id) ON DELETE CASCADE, "
+    "document tsvector NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS menu_search_document_gin ON menu_search USING GIN (document)",
+]
+SQLITE_INSERT = "INSERT INTO menu_search (rowid, item_name, ingredients, category) VALUES (%s, %s, %s, %s)"
+POSTGRES_INSERT = (
+    "INSERT INTO menu_search (menu_id, document) VALUES (%s, "
+    "setweight(to_tsvector('simple', %s), 'A') || "
+    "setweight(to_tsvector('simple', %s), 'C') || "
+    "setweight(to_tsvector('simple', %s), 'B'))"
+)
+
+
+def create_menu_search(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in ('sqlite', 'postgresql'):
+        return  # Other databases search with icontains
+    Menu = apps.get_model('Resturant', 'Menu')
+    setup, insert = (SQLITE_SETUP, SQLITE_INSERT) if vendor == 'sqlite' else (POSTGRES_SETUP, POSTGRES_INSERT)
+    for statement in setup:
+        schema_editor.execute(statement.format(menu_table=schema_editor.quote_name(Menu._meta.db_table)))
+
+    rows = list(Menu.objects.using(schema_editor.connection.alias).values_list(
+        'pk', 'item_name', 'ingredients', 'category__type'
+    ).order_by('pk'))
+    if rows:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(insert, rows)
+
+
+def drop_menu_search(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute("DROP TABLE IF EXISTS menu_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Resturant', '0006_reservation_keyset_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_menu_search, drop_menu_search),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.1.7 on 2026-10-16 23:09
+
+from collections import defaultdict
+from datetime import datetime, time as dt_time, timedelta
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+# Frozen copy of Resturant.occupancy.rebuild at the time of this migration:
+# bit i of a day's 12 bytes (little-endian) is the 15-minute slot starting
+# i * 15 minutes after local midnight.
+SLOT = timedelta(minutes=15)
+SLOTS_PER_DAY = 96
+
+
+def _midnight(day):
+    return timezone.make_aware(datetime.combine(day, dt_time(0)))
+
+
+def build_occupancy(apps, schema_editor):
+    Table_Reservation = apps.get_model('Resturant', 'Table_Reservation')
+    TableOccupancy = apps.get_model('Resturant', 'TableOccupancy')
+    alias = schema_editor.connection.alias
+
+    bits = defaultdict(int)
+    reservations = Table_Reservation.objects.using(alias).values_list(
+        'table_id', 'reservation_start', 'reservation_end'
+    ).iterator(chunk_size=5000)
+    for table_id, start, end in reservations:
+        day = timezone.localtime(start).date()
+        last_day = timezone.localtime(end - timedelta(microseconds=1)).date()
+        while day <= last_day:
+            midnight = _midnight(day)
+            first = max(0, (start - midnight) // SLOT)
+            last = min(SLOTS_PER_DAY, -(-(end - midnight) // SLOT))
+            if last > first:
+                bits[(table_id, day)] |= ((1 << (last - first)) - 1) << first
+            day += timedelta(days=1)
+
+    TableOccupancy.objects.using(alias).bulk_create(
+        (
+            TableOccupancy(table_id=table_id, date=day, slots=value.to_bytes(SLOTS_PER_DAY // 8, 'little'))
+            for (table_id, day), value in bits.items() if value
+        ),
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Resturant', '0007_menu_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TableOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('slots', models.BinaryField(max_length=12)),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupancy', to='Resturant.table')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('date', 'table'), name='occupancy_date_table_uniq')],
+            },
+        ),
+        migrations.RunPython(build_occupancy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-16 23:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Resturant', '0008_table_occupancy'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='cartitem',
+            constraint=models.UniqueConstraint(fields=('user', 'menu_item'), name='cartitem_user_menu_uniq'),
+        ),
+    ]
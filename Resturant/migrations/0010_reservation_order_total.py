@@ -0,0 +1,37 @@
+# Generated by Django 5.1.7 on 2026-10-16 23:19
+
+from django.db import migrations, models
+from django.db.models import ExpressionWrapper, F, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+# Frozen copy of Resturant.orders.refresh_totals at the time of this migration
+def backfill_order_totals(apps, schema_editor):
+    Table_Reservation = apps.get_model('Resturant', 'Table_Reservation')
+    TableOrderItem = apps.get_model('Resturant', 'TableOrderItem')
+    alias = schema_editor.connection.alias
+
+    line_total = ExpressionWrapper(F('quantity') * F('menu_item__item_price'), output_field=FloatField())
+    order_total = TableOrderItem.objects.using(alias) \
+        .filter(table_order__reservation=OuterRef('pk')) \
+        .order_by() \
+        .values('table_order__reservation') \
+        .annotate(total=Sum(line_total)) \
+        .values('total')
+    Table_Reservation.objects.using(alias).update(order_total=Coalesce(Subquery(order_total), 0.0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Resturant', '0009_cartitem_unique_item'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='table_reservation',
+            name='order_total',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_order_totals, migrations.RunPython.noop),
+    ]
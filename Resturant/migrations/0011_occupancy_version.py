@@ -0,0 +1,22 @@
+# Generated by Django 5.1.7 on 2026-10-16 23:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Resturant', '0010_reservation_order_total'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OccupancyVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('modified', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.7 on 2026-10-16 23:50
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Resturant', '0011_occupancy_version'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='cartitem',
+            name='cartitem_user_menu_idx',
+        ),
+    ]
@@ -1,8 +1,11 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.models import User
 
+from .rules import validate_window
+
 
 # --------------------
 # Profile Model
@@ -49,10 +52,29 @@ class Table_Reservation(models.Model):
     reservation_start = models.DateTimeField()
     reservation_end = models.DateTimeField()
     special_order = models.TextField(blank=True, null=True)
+    # Sum of every order line of this reservation, kept current by Resturant/orders.py
+    order_total = models.FloatField(default=0, editable=False)
 
     class Meta:
         ordering = ["reservation_start"]
         db_table = "table_reservation"  # Keep old DB table name
+        indexes = [
+            # Overlap lookups: table = ? AND start < ? AND end > ?
+            models.Index(
+                fields=["table", "reservation_start", "reservation_end"],
+                name="reservation_table_time_idx",
+            ),
+            # "My reservations" listing: user = ? ORDER BY start DESC
+            models.Index(
+                fields=["user", "-reservation_start"],
+                name="reservation_user_start_idx",
+            ),
+            # Keyset pagination of the admin API: ORDER BY start, id
+            models.Index(
+                fields=["reservation_start", "id"],
+                name="reservation_start_id_idx",
+            ),
+        ]
 
     def __str__(self):
         start_date = self.reservation_start.strftime("%Y-%m-%d %H:%M")
@@ -61,26 +83,57 @@ class Table_Reservation(models.Model):
 
     def clean(self):
         super().clean()
-        # Check party size
-        if self.table and self.number_of_party > self.table.seats:
+        # Check opening hours (existing reservations may already lie in the past)
+        if self.reservation_start and self.reservation_end:
+            validate_window(self.reservation_start, self.reservation_end, allow_past=True)
+        # Check party size (the table may still be blank, e.g. before auto-assignment)
+        if self.table_id is not None and self.number_of_party > self.table.seats:
             raise ValidationError(
                 f"The party size ({self.number_of_party}) is greater than seats available in the table."
             )
         # Check overlapping reservations
-        if self.table:
-            existing_reservations = Table_Reservation.objects.filter(
-                table=self.table,
-                reservation_start__lt=self.reservation_end,
-                reservation_end__gt=self.reservation_start,
-            )
-            if self.pk:
-                existing_reservations = existing_reservations.exclude(pk=self.pk)
-            if existing_reservations.exists():
+        if self.table_id is not None:
+            from .availability import is_table_available
+            if not is_table_available(
+                self.table, self.reservation_start, self.reservation_end, exclude_pk=self.pk
+            ):
                 raise ValidationError(
                     "The table is already reserved for the specified date and time."
                 )
 
 
+# --------------------
+# Table Occupancy Model
+# (precomputed from Table_Reservation, see Resturant/occupancy.py)
+# --------------------
+class TableOccupancy(models.Model):
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name='occupancy')
+    date = models.DateField()
+    # Bit i set = the 15-minute slot starting i * 15 minutes after local midnight is booked
+    slots = models.BinaryField(max_length=12)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["date", "table"], name="occupancy_date_table_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.table.name} on {self.date}"
+
+
+# --------------------
+# Occupancy Version Model
+# (change counter per date, bumped by Resturant/occupancy.py; backs availability ETags)
+# --------------------
+class OccupancyVersion(models.Model):
+    date = models.DateField(unique=True)
+    version = models.PositiveIntegerField(default=0)
+    modified = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.date} v{self.version}"
+
+
 # --------------------
 # Category Model
 # --------------------
@@ -112,12 +165,28 @@ class Menu(models.Model):
 # --------------------
 # Table Order Models
 # --------------------
+class TableOrderQuerySet(models.QuerySet):
+    def with_totals(self):
+        """Annotate ``item_count``, ``subtotal`` and ``total`` (0 for empty orders) in SQL."""
+        line_total = models.ExpressionWrapper(
+            models.F('items__quantity') * models.F('items__menu_item__item_price'),
+            output_field=models.FloatField(),
+        )
+        return self.annotate(
+            item_count=Coalesce(models.Sum('items__quantity'), 0),
+            subtotal=models.Sum(line_total),
+            total=Coalesce(models.Sum(line_total), 0.0),
+        )
+
+
 class TableOrder(models.Model):
     reservation = models.ForeignKey(
         Table_Reservation, on_delete=models.CASCADE, related_name='table_orders'
     )
     menu_items = models.ManyToManyField(Menu, through='TableOrderItem', related_name='table_orders')
 
+    objects = TableOrderQuerySet.as_manager()
+
     def __str__(self):
         return f"Order for {self.reservation}"
 
@@ -139,5 +208,12 @@ class CartItem(models.Model):
     menu_item = models.ForeignKey(Menu, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField(default=1)
 
+    class Meta:
+        constraints = [
+            # One row per item; repeated adds bump its quantity. Its index also
+            # serves cart lookups by (user, menu_item).
+            models.UniqueConstraint(fields=["user", "menu_item"], name="cartitem_user_menu_uniq"),
+        ]
+
     def __str__(self):
         return f"{self.menu_item.item_name} x{self.quantity}"
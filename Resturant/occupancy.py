@@ -0,0 +1,170 @@
+from collections import defaultdict
+from datetime import datetime, time as dt_time, timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OccupancyVersion, Table_Reservation, TableOccupancy
+
+
+SLOT_MINUTES = 15
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+SLOT = timedelta(minutes=SLOT_MINUTES)
+
+
+# ------------------ Bitmaps ------------------
+def to_bits(slots):
+    return int.from_bytes(bytes(slots), 'little')
+
+
+def from_bits(bits):
+    return bits.to_bytes(SLOTS_PER_DAY // 8, 'little')
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, dt_time(0)))
+
+
+def aware(value):
+    return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+
+def days_spanned(start, end):
+    first = timezone.localtime(start).date()
+    last = timezone.localtime(end - timedelta(microseconds=1)).date()
+    return [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+
+
+def slot_mask(midnight, start, end):
+    first = max(0, (start - midnight) // SLOT)
+    last = min(SLOTS_PER_DAY, -(-(end - midnight) // SLOT))
+    if last <= first:
+        return 0
+    return ((1 << (last - first)) - 1) << first
+
+
+def window_masks(start, end):
+    """``{date: mask}`` of the slots touched by ``[start, end)``."""
+    start, end = aware(start), aware(end)
+    return {day: slot_mask(day_start(day), start, end) for day in days_spanned(start, end)}
+
+
+# ------------------ Maintenance ------------------
+def affected(table_id, start, end):
+    start, end = aware(start), aware(end)
+    return {(table_id, day) for day in days_spanned(start, end)}
+
+
+def refresh(pairs):
+    """Recompute the occupancy rows of every ``(table_id, date)`` in ``pairs``.
+
+    Each table costs one range read of its reservations for the affected days,
+    so the result is exact even when overlapping legacy bookings exist.
+    """
+    days_by_table = defaultdict(set)
+    for table_id, day in pairs:
+        days_by_table[table_id].add(day)
+
+    for table_id, days in days_by_table.items():
+        window_start = day_start(min(days))
+        window_end = day_start(max(days)) + timedelta(days=1)
+        bits = dict.fromkeys(days, 0)
+        reservations = Table_Reservation.objects.filter(
+            table_id=table_id,
+            reservation_start__lt=window_end,
+            reservation_end__gt=window_start,
+        ).values_list('reservation_start', 'reservation_end')
+        for start, end in reservations:
+            for day in days_spanned(start, end):
+                if day in bits:
+                    bits[day] |= slot_mask(day_start(day), start, end)
+
+        with transaction.atomic():
+            empty = [day for day, value in bits.items() if not value]
+            if empty:
+                TableOccupancy.objects.filter(table_id=table_id, date__in=empty).delete()
+            TableOccupancy.objects.bulk_create(
+                [
+                    TableOccupancy(table_id=table_id, date=day, slots=from_bits(value))
+                    for day, value in bits.items() if value
+                ],
+                update_conflicts=True,
+                unique_fields=['date', 'table'],
+                update_fields=['slots'],
+            )
+
+    bump_versions(day for _, day in pairs)
+
+
+def bump_versions(days):
+    """Advance the change counter of every date in ``days``, in the caller's transaction."""
+    days = set(days)
+    if not days:
+        return
+    now = timezone.now()
+    # Insert first: a concurrent first bump then waits for the row and increments it
+    OccupancyVersion.objects.bulk_create(
+        [OccupancyVersion(date=day, modified=now) for day in days], ignore_conflicts=True
+    )
+    OccupancyVersion.objects.filter(date__in=days).update(version=F('version') + 1, modified=now)
+
+
+def rebuild(batch_size=5000):
+    """Recompute every occupancy row from scratch; returns the number of rows written."""
+    bits = defaultdict(int)
+    reservations = Table_Reservation.objects.values_list(
+        'table_id', 'reservation_start', 'reservation_end'
+    ).iterator(chunk_size=batch_size)
+    for table_id, start, end in reservations:
+        for day in days_spanned(start, end):
+            bits[(table_id, day)] |= slot_mask(day_start(day), start, end)
+
+    with transaction.atomic():
+        TableOccupancy.objects.all().delete()
+        TableOccupancy.objects.bulk_create(
+            (
+                TableOccupancy(table_id=table_id, date=day, slots=from_bits(value))
+                for (table_id, day), value in bits.items() if value
+            ),
+            batch_size=batch_size,
+        )
+    return len(bits)
+
+
+# ------------------ Reads ------------------
+def rows_for(start, end, table_ids=None):
+    masks = window_masks(start, end)
+    rows = TableOccupancy.objects.filter(date__in=list(masks))
+    if table_ids is not None:
+        rows = rows.filter(table_id__in=table_ids)
+    return masks, rows.values_list('table_id', 'date', 'slots')
+
+
+def colliding(masks, rows):
+    return {table_id for table_id, day, slots in rows if to_bits(slots) & masks[day]}
+
+
+def candidate_table_ids(start, end, table_ids=None):
+    """Tables whose booked slots touch ``[start, end)``.
+
+    Slots are 15 minutes wide, so a table missing from the result is certainly
+    free; a table in it may still be free and needs an exact check.
+    """
+    masks, rows = rows_for(start, end, table_ids)
+    return colliding(masks, rows)
+
+
+def versions(days):
+    """``{date: (version, modified)}``; dates never changed read as ``(0, None)``."""
+    found = {
+        day: (version, modified)
+        for day, version, modified in OccupancyVersion.objects.filter(date__in=list(days))
+        .values_list('date', 'version', 'modified')
+    }
+    return {day: found.get(day, (0, None)) for day in days}
+
+
+async def acandidate_table_ids(start, end, table_ids=None):
+    masks, rows = rows_for(start, end, table_ids)
+    return colliding(masks, [row async for row in rows])
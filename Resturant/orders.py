@@ -0,0 +1,39 @@
+from django.db.models import Count, ExpressionWrapper, F, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+from .models import Table_Reservation, TableOrderItem
+
+LINE_TOTAL = ExpressionWrapper(F('quantity') * F('menu_item__item_price'), output_field=FloatField())
+
+
+def refresh_totals(reservations=None):
+    """Recompute ``Table_Reservation.order_total`` with one correlated ``UPDATE``.
+
+    ``reservations`` is a queryset or a list of ids; ``None`` refreshes every
+    reservation.
+    """
+    if reservations is None:
+        reservations = Table_Reservation.objects.all()
+    elif not hasattr(reservations, 'update'):
+        reservations = Table_Reservation.objects.filter(pk__in=list(reservations))
+
+    order_total = TableOrderItem.objects.filter(table_order__reservation=OuterRef('pk')) \
+        .order_by() \
+        .values('table_order__reservation') \
+        .annotate(total=Sum(LINE_TOTAL)) \
+        .values('total')
+    return reservations.update(order_total=Coalesce(Subquery(order_total), 0.0))
+
+
+def daily_revenue(first_day, last_day):
+    """Reservations, covers and order revenue per local day, from one grouped query."""
+    return Table_Reservation.objects \
+        .filter(reservation_start__date__range=(first_day, last_day)) \
+        .annotate(day=TruncDate('reservation_start')) \
+        .order_by('day') \
+        .values('day') \
+        .annotate(
+            reservations=Count('id'),
+            covers=Sum('number_of_party'),
+            revenue=Sum('order_total'),
+        )
@@ -0,0 +1,302 @@
+import bisect
+import contextvars
+import cProfile
+import heapq
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.base import Template
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+_current = contextvars.ContextVar('profile', default=None)
+
+
+# ------------------ Histograms ------------------
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+
+    def add(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the ``fraction`` quantile (``None`` past the last bound)."""
+        target = fraction * sum(self.counts)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return self.bounds[index] if index < len(self.bounds) else None
+        return 0
+
+    def as_dict(self):
+        labels = [f"<={bound}" for bound in self.bounds] + [f">{self.bounds[-1]}"]
+        return {
+            'buckets': dict(zip(labels, self.counts)),
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+        }
+
+
+class ViewStats:
+    def __init__(self, slow_query_count):
+        self.requests = 0
+        self.errors = 0
+        self.latency_ms = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+        self.slow_query_count = slow_query_count
+        self.slowest = []  # min-heap of (duration_ms, sql)
+
+    def record(self, profile, status_code):
+        self.requests += 1
+        self.errors += status_code >= 500
+        self.latency_ms.add(profile.elapsed_ms)
+        self.queries.add(profile.query_count)
+        self.sql_ms += profile.sql_ms
+        self.template_ms += profile.template_ms
+        for entry in profile.slowest:
+            if len(self.slowest) < self.slow_query_count:
+                heapq.heappush(self.slowest, entry)
+            elif entry > self.slowest[0]:
+                heapq.heapreplace(self.slowest, entry)
+
+    def as_dict(self):
+        requests = self.requests or 1
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'latency_ms': self.latency_ms.as_dict(),
+            'mean_latency_ms': round(self.latency_ms.total / requests, 2),
+            'queries': self.queries.as_dict(),
+            'mean_queries': round(self.queries.total / requests, 2),
+            'mean_sql_ms': round(self.sql_ms / requests, 2),
+            'mean_template_ms': round(self.template_ms / requests, 2),
+            'slowest_queries': [
+                {'ms': round(duration, 2), 'sql': sql} for duration, sql in sorted(self.slowest, reverse=True)
+            ],
+        }
+
+
+class ProfileRegistry:
+    """Per-view statistics of this process, keyed by URL name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._views = {}
+            self._since = time.time()
+
+    def record(self, view_name, profile, status_code):
+        slow_query_count = getattr(settings, 'PROFILING_SLOW_QUERIES', 5)
+        with self._lock:
+            stats = self._views.get(view_name)
+            if stats is None:
+                stats = self._views[view_name] = ViewStats(slow_query_count)
+            stats.record(profile, status_code)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'since': self._since,
+                'pid': os.getpid(),
+                'views': {name: stats.as_dict() for name, stats in sorted(self._views.items())},
+            }
+
+
+registry = ProfileRegistry()
+
+
+# ------------------ Per-request Recording ------------------
+class RequestProfile:
+    __slots__ = ('started', 'elapsed_ms', 'query_count', 'sql_ms', 'template_ms', 'template_depth', 'slowest',
+                 'slow_query_count')
+
+    def __init__(self, slow_query_count):
+        self.started = time.perf_counter()
+        self.elapsed_ms = 0.0
+        self.query_count = 0
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+        self.template_depth = 0
+        self.slowest = []
+        self.slow_query_count = slow_query_count
+
+    def add_query(self, sql, duration_ms):
+        self.query_count += 1
+        self.sql_ms += duration_ms
+        if len(self.slowest) < self.slow_query_count:
+            heapq.heappush(self.slowest, (duration_ms, sql[:300]))
+        elif duration_ms > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (duration_ms, sql[:300]))
+
+
+def _record_query(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.add_query(sql, (time.perf_counter() - started) * 1000)
+
+
+def install_query_recorder(connection, **kwargs):
+    """Wrap every query of ``connection``; a no-op beyond a context lookup outside profiled requests."""
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+_original_render = Template.render
+_template_timing_lock = threading.Lock()
+_template_timing_users = 0
+
+
+def _timed_render(self, context):
+    profile = _current.get()
+    if profile is None:
+        return _original_render(self, context)
+    # Only the outermost template is timed; {% include %}/{% extends %} render nested templates
+    profile.template_depth += 1
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        profile.template_depth -= 1
+        if not profile.template_depth:
+            profile.template_ms += (time.perf_counter() - started) * 1000
+
+
+@contextmanager
+def timing_templates():
+    """Route ``Template.render`` through the timer only while a profiled request is in flight.
+
+    The patch is counted, so it goes in with the first concurrent profiled
+    request and the original method is restored when the last one finishes.
+    """
+    global _original_render, _template_timing_users
+    with _template_timing_lock:
+        if not _template_timing_users:
+            _original_render = Template.render
+            Template.render = _timed_render
+        _template_timing_users += 1
+    try:
+        yield
+    finally:
+        with _template_timing_lock:
+            _template_timing_users -= 1
+            if not _template_timing_users and Template.render is _timed_render:
+                Template.render = _original_render
+
+
+# ------------------ Middleware ------------------
+class ProfilingMiddleware:
+    """Record SQL, template and total time of every request under its URL name.
+
+    Costs one ``perf_counter`` pair per query and per top-level template, so it
+    can stay on in production. The query recorder is installed once on every
+    database connection and finds the current request through a context
+    variable, which also follows async views into their ORM threads; template
+    timing is patched in only while profiled requests are running.
+
+    Sending the ``X-Profile`` header with the value of ``PROFILING_TOKEN`` (any
+    value when ``DEBUG``) also runs the request under ``cProfile`` and writes
+    the stats to ``PROFILING_DUMP_DIR``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        connection_created.connect(install_query_recorder, dispatch_uid='profiling.install_query_recorder')
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+
+    def enabled(self):
+        return getattr(settings, 'PROFILING_ENABLED', True)
+
+    def wants_cprofile(self, request):
+        header = request.headers.get('X-Profile')
+        if not header:
+            return False
+        token = getattr(settings, 'PROFILING_TOKEN', None)
+        return settings.DEBUG or (token and header == token)
+
+    def finish(self, request, response, profile, profiler=None):
+        profile.elapsed_ms = (time.perf_counter() - profile.started) * 1000
+
+        match = request.resolver_match
+        view_name = (match.view_name if match else None) or 'unresolved'
+        registry.record(view_name, profile, response.status_code)
+
+        response['Server-Timing'] = (
+            f"db;dur={profile.sql_ms:.1f};desc=\"{profile.query_count} queries\", "
+            f"tpl;dur={profile.template_ms:.1f}, total;dur={profile.elapsed_ms:.1f}"
+        )
+        if profiler is not None:
+            response['X-Profile-Dump'] = self.dump(profiler, view_name)
+        return response
+
+    def dump(self, profiler, view_name):
+        directory = getattr(settings, 'PROFILING_DUMP_DIR', None) or tempfile.gettempdir()
+        os.makedirs(directory, exist_ok=True)
+        safe_name = ''.join(char if char.isalnum() else '_' for char in view_name)
+        path = os.path.join(directory, f"{safe_name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.prof")
+        profiler.dump_stats(path)
+        return os.path.basename(path)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled():
+            return self.get_response(request)
+
+        profile = RequestProfile(getattr(settings, 'PROFILING_SLOW_QUERIES', 5))
+        profiler = cProfile.Profile() if self.wants_cprofile(request) else None
+        token = _current.set(profile)
+        try:
+            with timing_templates():
+                if profiler is not None:
+                    profiler.enable()
+                response = self.get_response(request)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            _current.reset(token)
+        return self.finish(request, response, profile, profiler)
+
+    async def __acall__(self, request):
+        if not self.enabled():
+            return await self.get_response(request)
+
+        profile = RequestProfile(getattr(settings, 'PROFILING_SLOW_QUERIES', 5))
+        # cProfile only follows the current thread, so it is not offered for async views
+        token = _current.set(profile)
+        try:
+            with timing_templates():
+                response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, profile)
@@ -0,0 +1,190 @@
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, time as dt_time, timedelta
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.utils import timezone
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+# Used when settings.OPENING_HOURS is not defined
+DEFAULT_OPENING_HOURS = {
+    **{weekday: [('08:00', '23:00')] for weekday in WEEKDAYS},
+    'saturday': [],
+}
+
+
+# ------------------ Settings Parsing ------------------
+def _minutes(value):
+    """``'HH:MM'`` -> minutes after midnight; ``'24:00'`` is accepted as closing time."""
+    try:
+        hours, minutes = (int(part) for part in value.split(':'))
+    except (AttributeError, ValueError):
+        raise ImproperlyConfigured(f"Opening hours must be 'HH:MM' strings, got {value!r}.")
+    if not (0 <= hours <= 24 and 0 <= minutes < 60) or hours * 60 + minutes > 24 * 60:
+        raise ImproperlyConfigured(f"{value!r} is not a time of day.")
+    return hours * 60 + minutes
+
+
+def _intervals(hours):
+    intervals = sorted((_minutes(opening), _minutes(closing)) for opening, closing in hours)
+    for opening, closing in intervals:
+        if closing <= opening:
+            raise ImproperlyConfigured("Opening hours must close after they open, on the same day.")
+    return tuple(intervals)
+
+
+def _date(value):
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def _at(day, minutes):
+    return timezone.make_aware(datetime.combine(day, dt_time(0)) + timedelta(minutes=minutes))
+
+
+def _clock(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+# ------------------ Calendar ------------------
+class OpeningCalendar:
+    """Opening hours compiled from settings into per-date open intervals.
+
+    ``OPENING_HOURS`` maps weekday names to ``('HH:MM', 'HH:MM')`` intervals
+    (an empty list closes that weekday), ``SPECIAL_HOURS`` overrides given
+    dates the same way and ``CLOSED_DATES`` lists holidays as dates or
+    ``(first, last)`` ranges. Each date's intervals are computed once and kept
+    in a bounded cache, so checking a window costs a dictionary lookup.
+    """
+
+    cache_size = 1024
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._compiled = None
+            self._days = OrderedDict()
+
+    def _compile(self):
+        hours = getattr(settings, 'OPENING_HOURS', DEFAULT_OPENING_HOURS)
+        unknown = set(hours) - set(WEEKDAYS)
+        if unknown:
+            raise ImproperlyConfigured(f"Unknown weekdays in OPENING_HOURS: {sorted(unknown)}.")
+        weekly = tuple(_intervals(hours.get(weekday, ())) for weekday in WEEKDAYS)
+
+        closed = set()
+        for entry in getattr(settings, 'CLOSED_DATES', ()):
+            first, last = (entry, entry) if isinstance(entry, (str, date)) else entry
+            day, last = _date(first), _date(last)
+            while day <= last:
+                closed.add(day)
+                day += timedelta(days=1)
+
+        special = {
+            _date(day): _intervals(day_hours)
+            for day, day_hours in getattr(settings, 'SPECIAL_HOURS', {}).items()
+        }
+        return weekly, closed, special
+
+    def _rules(self):
+        if self._compiled is None:
+            self._compiled = self._compile()
+        return self._compiled
+
+    def _minute_intervals(self, day):
+        weekly, closed, special = self._rules()
+        if day in closed:
+            return ()
+        if day in special:
+            return special[day]
+        return weekly[day.weekday()]
+
+    def hours(self, day):
+        """Open intervals of ``day`` as ``(opening, closing)`` minutes after midnight."""
+        with self._lock:
+            return self._minute_intervals(day)
+
+    def weekday_hours(self, weekday):
+        with self._lock:
+            return self._rules()[0][weekday]
+
+    def intervals(self, day):
+        """Open intervals of ``day`` as aware ``(opening, closing)`` datetimes."""
+        with self._lock:
+            cached = self._days.get(day)
+            if cached is None:
+                cached = self._days[day] = tuple(
+                    (_at(day, opening), _at(day, closing)) for opening, closing in self._minute_intervals(day)
+                )
+                if len(self._days) > self.cache_size:
+                    self._days.popitem(last=False)
+            return cached
+
+    def span(self):
+        """Earliest opening and latest closing of any weekday, as offsets from midnight."""
+        with self._lock:
+            weekly, _, special = self._rules()
+        intervals = [interval for day in (*weekly, *special.values()) for interval in day]
+        if not intervals:
+            return timedelta(0), timedelta(0)
+        return (
+            timedelta(minutes=min(opening for opening, _ in intervals)),
+            timedelta(minutes=max(closing for _, closing in intervals)),
+        )
+
+    def is_open(self, start, end):
+        """``True`` when ``[start, end)`` lies inside one open interval of its day."""
+        start = timezone.localtime(start)
+        return any(
+            opening <= start and end <= closing
+            for opening, closing in self.intervals(start.date())
+        )
+
+    def describe(self, day):
+        hours = self.hours(day)
+        if len(hours) == 1:
+            return f"between {_clock(hours[0][0])} and {_clock(hours[0][1])}"
+        return "during " + ", ".join(f"{_clock(opening)}–{_clock(closing)}" for opening, closing in hours)
+
+
+calendar = OpeningCalendar()
+
+
+def opening_hours(day):
+    """``[('HH:MM', 'HH:MM'), ...]`` of ``day``; empty when closed."""
+    return [(_clock(opening), _clock(closing)) for opening, closing in calendar.hours(day)]
+
+
+# ------------------ Validation ------------------
+def validate_window(start, end, allow_past=False):
+    """Raise ``ValidationError`` unless ``[start, end)`` is a bookable reservation window."""
+    if timezone.is_naive(start):
+        start = timezone.make_aware(start)
+    if timezone.is_naive(end):
+        end = timezone.make_aware(end)
+
+    if end <= start:
+        raise ValidationError("Reservation end must be after the start time.")
+    if not allow_past and start < timezone.now():
+        raise ValidationError("Reservation can't be made in the past.")
+    if calendar.is_open(start, end):
+        return
+
+    day = timezone.localtime(start).date()
+    if not calendar.hours(day):
+        if not calendar.weekday_hours(day.weekday()):
+            raise ValidationError(f"The restaurant is closed on {day:%A}s.")
+        raise ValidationError(f"The restaurant is closed on {day:%A %d %B %Y}.")
+    raise ValidationError(f"Reservations on {day:%A} are allowed only {calendar.describe(day)}.")
+
+
+def is_bookable(start, end, allow_past=False):
+    try:
+        validate_window(start, end, allow_past)
+    except ValidationError:
+        return False
+    return True
@@ -0,0 +1,207 @@
+import re
+
+from asgiref.sync import sync_to_async
+from django.db import connection as default_connection
+from django.db.models import Q
+
+from .models import Menu, Category
+
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    return TOKEN_RE.findall(query.lower())[:8]
+
+
+# ------------------ Backends ------------------
+class FallbackMenuSearch:
+    """``icontains`` across name, ingredients and category for other databases."""
+
+    def __init__(self, connection=None):
+        self.connection = connection or default_connection
+
+    def setup(self, schema_editor):
+        pass
+
+    def teardown(self, schema_editor):
+        pass
+
+    def index(self, menu_ids):
+        pass
+
+    def remove(self, menu_ids):
+        pass
+
+    def search(self, tokens, limit, offset, with_total=True):
+        filters = Q()
+        for token in tokens:
+            filters &= (
+                Q(item_name__icontains=token)
+                | Q(ingredients__icontains=token)
+                | Q(category__type__icontains=token)
+            )
+        queryset = Menu.objects.filter(filters).order_by('item_name')
+        ids = list(queryset.values_list('pk', flat=True)[offset:offset + limit])
+        return ids, queryset.count() if with_total else None
+
+
+class SQLiteMenuSearch(FallbackMenuSearch):
+    """FTS5 table whose rowid is the menu id; ranked with weighted bm25."""
+
+    table = 'menu_search'
+
+    def setup(self, schema_editor):
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+            "item_name, ingredients, category, tokenize='unicode61', prefix='2 3')"
+        )
+
+    def teardown(self, schema_editor):
+        schema_editor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def index(self, menu_ids):
+        if menu_ids is not None and not menu_ids:
+            return
+        with self.connection.cursor() as cursor:
+            self._delete(cursor, menu_ids)
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, item_name, ingredients, category) "
+                f"SELECT m.id, m.item_name, m.ingredients, c.type "
+                f"FROM {Menu._meta.db_table} m JOIN {Category._meta.db_table} c "
+                f"ON c.id = m.category_id"
+                + (f" WHERE m.id IN ({', '.join(['%s'] * len(menu_ids))})" if menu_ids is not None else ""),
+                list(menu_ids or []),
+            )
+
+    def remove(self, menu_ids):
+        with self.connection.cursor() as cursor:
+            self._delete(cursor, menu_ids)
+
+    def _delete(self, cursor, menu_ids):
+        if menu_ids is None:
+            cursor.execute(f"DELETE FROM {self.table}")
+        elif menu_ids:
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE rowid IN ({', '.join(['%s'] * len(menu_ids))})",
+                list(menu_ids),
+            )
+
+    def search(self, tokens, limit, offset, with_total=True):
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s "
+                f"ORDER BY bm25({self.table}, 10.0, 2.0, 4.0) LIMIT %s OFFSET %s",
+                [match, limit, offset],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+            if not with_total:
+                return ids, None
+            cursor.execute(f"SELECT count(*) FROM {self.table} WHERE {self.table} MATCH %s", [match])
+            return ids, cursor.fetchone()[0]
+
+
+class PostgresMenuSearch(SQLiteMenuSearch):
+    """Weighted ``tsvector`` per menu item with a GIN index, ranked by ts_rank."""
+
+    document = (
+        "setweight(to_tsvector('simple', m.item_name), 'A') || "
+        "setweight(to_tsvector('simple', c.type), 'B') || "
+        "setweight(to_tsvector('simple', m.ingredients), 'C')"
+    )
+
+    def setup(self, schema_editor):
+        schema_editor.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            f"menu_id bigint PRIMARY KEY REFERENCES {Menu._meta.db_table} (id) ON DELETE CASCADE, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table}_document_gin ON {self.table} USING GIN (document)"
+        )
+
+    def index(self, menu_ids):
+        if menu_ids is not None and not menu_ids:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {self.table} (menu_id, document) "
+                f"SELECT m.id, {self.document} "
+                f"FROM {Menu._meta.db_table} m JOIN {Category._meta.db_table} c "
+                f"ON c.id = m.category_id"
+                + (" WHERE m.id = ANY(%s)" if menu_ids is not None else "")
+                + " ON CONFLICT (menu_id) DO UPDATE SET document = EXCLUDED.document",
+                [list(menu_ids)] if menu_ids is not None else [],
+            )
+
+    def _delete(self, cursor, menu_ids):
+        if menu_ids is None:
+            cursor.execute(f"DELETE FROM {self.table}")
+        elif menu_ids:
+            cursor.execute(f"DELETE FROM {self.table} WHERE menu_id = ANY(%s)", [list(menu_ids)])
+
+    def search(self, tokens, limit, offset, with_total=True):
+        match = ' & '.join(f'{token}:*' for token in tokens)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT menu_id FROM {self.table}, to_tsquery('simple', %s) query "
+                "WHERE document @@ query ORDER BY ts_rank(document, query) DESC, menu_id "
+                "LIMIT %s OFFSET %s",
+                [match, limit, offset],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+            if not with_total:
+                return ids, None
+            cursor.execute(
+                f"SELECT count(*) FROM {self.table} WHERE document @@ to_tsquery('simple', %s)", [match]
+            )
+            return ids, cursor.fetchone()[0]
+
+
+BACKENDS = {
+    'sqlite': SQLiteMenuSearch,
+    'postgresql': PostgresMenuSearch,
+}
+
+
+def get_backend(connection=None):
+    connection = connection or default_connection
+    return BACKENDS.get(connection.vendor, FallbackMenuSearch)(connection)
+
+
+# ------------------ Public API ------------------
+def reindex(menu_ids=None):
+    """Refresh the search rows of ``menu_ids`` (all items when ``None``)."""
+    get_backend().index(None if menu_ids is None else list(menu_ids))
+
+
+def unindex(menu_ids):
+    get_backend().remove(list(menu_ids))
+
+
+def search_menu_items(query, limit=20, offset=0, with_total=True):
+    """Return ``(menu_items, total)`` ranked by relevance; every word matches as a prefix.
+
+    Typeahead callers pass ``with_total=False`` to skip counting every match.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return [], 0
+    ids, total = get_backend().search(tokens, limit, offset, with_total)
+    menu_items = Menu.objects.select_related('category').in_bulk(ids)
+    return [menu_items[pk] for pk in ids if pk in menu_items], total
+
+
+async def asearch_menu_items(query, limit=20, offset=0, with_total=True):
+    """Async counterpart of :func:`search_menu_items`.
+
+    The ranking query goes through a raw cursor, which Django only offers
+    synchronously, so it runs in the sync thread; items load via the async ORM.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return [], 0
+    ids, total = await sync_to_async(lambda: get_backend().search(tokens, limit, offset, with_total))()
+    menu_items = await Menu.objects.select_related('category').ain_bulk(ids)
+    return [menu_items[pk] for pk in ids if pk in menu_items], total
@@ -0,0 +1,129 @@
+from copy import copy
+
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .models import Table, Table_Reservation, TableOrderItem, Menu, Category
+from .availability import engine
+from .menu_cache import catalog
+from .autocomplete import table_names
+from .rules import calendar
+from . import live, occupancy, orders, search
+
+
+# ------------------ Availability Index ------------------
+@receiver(post_save, sender=Table_Reservation)
+def index_reservation(sender, instance, **kwargs):
+    # The index is shared by every request of the process; a rolled back
+    # write must not leave a phantom booking in it.
+    reservation = copy(instance)
+    transaction.on_commit(lambda: engine.add(reservation))
+
+
+@receiver(post_delete, sender=Table_Reservation)
+def unindex_reservation(sender, instance, **kwargs):
+    reservation = copy(instance)  # delete() clears instance.pk afterwards
+    transaction.on_commit(lambda: engine.discard(reservation))
+
+
+# ------------------ Menu Catalog ------------------
+@receiver(post_save, sender=Menu)
+@receiver(post_delete, sender=Menu)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_menu_catalog(sender, **kwargs):
+    # Bumping before commit would let a concurrent read cache the old rows again
+    transaction.on_commit(catalog.bump)
+
+
+# ------------------ Menu Search Index ------------------
+@receiver(post_save, sender=Menu)
+def index_menu_item(sender, instance, **kwargs):
+    search.reindex([instance.pk])
+
+
+@receiver(post_delete, sender=Menu)
+def unindex_menu_item(sender, instance, **kwargs):
+    search.unindex([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+def reindex_category(sender, instance, created, **kwargs):
+    if not created:
+        search.reindex(instance.menu_set.values_list('pk', flat=True))
+
+
+# ------------------ Table Name Autocomplete ------------------
+@receiver(post_save, sender=Table)
+@receiver(post_delete, sender=Table)
+def invalidate_table_names(sender, **kwargs):
+    transaction.on_commit(table_names.invalidate)
+
+
+# ------------------ Occupancy Bitsets ------------------
+@receiver(pre_save, sender=Table_Reservation)
+def remember_previous_window(sender, instance, raw=False, **kwargs):
+    instance._previous_window = None
+    if instance.pk and not raw:
+        instance._previous_window = Table_Reservation.objects.filter(pk=instance.pk).values_list(
+            'table_id', 'reservation_start', 'reservation_end'
+        ).first()
+
+
+@receiver(post_save, sender=Table_Reservation)
+def refresh_occupancy(sender, instance, **kwargs):
+    pairs = occupancy.affected(instance.table_id, instance.reservation_start, instance.reservation_end)
+    previous = getattr(instance, '_previous_window', None)
+    if previous:
+        pairs |= occupancy.affected(*previous)
+    occupancy.refresh(pairs)
+
+
+@receiver(post_delete, sender=Table_Reservation)
+def clear_occupancy(sender, instance, **kwargs):
+    occupancy.refresh(occupancy.affected(instance.table_id, instance.reservation_start, instance.reservation_end))
+
+
+# ------------------ Live Availability ------------------
+@receiver(post_save, sender=Table_Reservation)
+def publish_booking(sender, instance, **kwargs):
+    live.publish_reservation(
+        instance.pk,
+        window=(instance.table_id, instance.reservation_start, instance.reservation_end),
+        previous=getattr(instance, '_previous_window', None),
+    )
+
+
+@receiver(post_delete, sender=Table_Reservation)
+def publish_release(sender, instance, **kwargs):
+    live.publish_reservation(
+        instance.pk, previous=(instance.table_id, instance.reservation_start, instance.reservation_end)
+    )
+
+
+@receiver(setting_changed)
+def reload_live_broker(setting, **kwargs):
+    if setting == 'LIVE_BROKER':
+        live.reset_broker()
+
+
+# ------------------ Opening Hours ------------------
+@receiver(setting_changed)
+def recompile_opening_hours(setting, **kwargs):
+    if setting in ('OPENING_HOURS', 'CLOSED_DATES', 'SPECIAL_HOURS', 'TIME_ZONE'):
+        calendar.reset()
+
+
+# ------------------ Order Totals ------------------
+@receiver(post_save, sender=TableOrderItem)
+@receiver(post_delete, sender=TableOrderItem)
+def refresh_order_total(sender, instance, **kwargs):
+    orders.refresh_totals(Table_Reservation.objects.filter(table_orders=instance.table_order_id))
+
+
+@receiver(post_save, sender=Menu)
+def reprice_order_totals(sender, instance, created, **kwargs):
+    if not created:
+        orders.refresh_totals(Table_Reservation.objects.filter(table_orders__items__menu_item=instance))
@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .assignment import free_tables
+from .availability import _aware
+from .models import Table_Reservation
+from .rules import calendar, is_bookable
+
+STEP = timedelta(minutes=15)
+
+
+def _day_offsets(days):
+    yield 0
+    for distance in range(1, days + 1):
+        yield distance
+        yield -distance
+
+
+def _free_windows(busy, opening, closing, duration):
+    """Start times on the 15-minute grid of every ``duration`` window between ``busy`` intervals."""
+    cursor = opening
+    for busy_start, busy_end in [*busy, (closing, closing)]:
+        # Round up onto the grid, which starts at opening time
+        start = opening + -(-(cursor - opening) // STEP) * STEP
+        while start + duration <= min(busy_start, closing):
+            yield start
+            start += STEP
+        cursor = max(cursor, busy_end)
+
+
+def _closest_possible(day, start, duration):
+    """Lower bound on how far from ``start`` a window on ``day`` can begin; None when closed."""
+    intervals = calendar.intervals(day)
+    if not intervals:
+        return None
+    earliest, latest = intervals[0][0], intervals[-1][1] - duration
+    return max(timedelta(0), earliest - start, start - latest)
+
+
+def nearest_windows(table, start, end, limit=3, exclude_pk=None, days=None):
+    """The ``limit`` free windows of ``table``, as long as ``[start, end)``, closest to ``start``.
+
+    Each day costs one range query for the table's bookings; gaps inside the
+    day's opening hours are then walked in memory. Days are searched outwards
+    from the requested one, up to ``SUGGESTION_SEARCH_DAYS`` away.
+    """
+    table_id = getattr(table, 'pk', table)
+    start, end = _aware(start), _aware(end)
+    duration = end - start
+    if days is None:
+        days = getattr(settings, 'SUGGESTION_SEARCH_DAYS', 3)
+    now = timezone.now()
+    origin = timezone.localtime(start).date()
+
+    def distance(window):
+        return abs(window[0] - start)
+
+    found = []
+    offsets = list(_day_offsets(days))
+    for index, offset in enumerate(offsets):
+        if len(found) >= limit:
+            # Stop once no day left to search can hold a window closer than the limit-th found
+            found.sort(key=distance)
+            bounds = [
+                bound for bound in (
+                    _closest_possible(origin + timedelta(days=later), start, duration) for later in offsets[index:]
+                ) if bound is not None
+            ]
+            if not bounds or distance(found[limit - 1]) <= min(bounds):
+                break
+        intervals = calendar.intervals(origin + timedelta(days=offset))
+        if not intervals or intervals[-1][1] <= now:
+            continue
+
+        busy = Table_Reservation.objects.filter(
+            table_id=table_id, reservation_start__lt=intervals[-1][1], reservation_end__gt=intervals[0][0],
+        ).order_by('reservation_start')
+        if exclude_pk:
+            busy = busy.exclude(pk=exclude_pk)
+        busy = list(busy.values_list('reservation_start', 'reservation_end'))
+        for opening, closing in intervals:
+            for window_start in _free_windows(busy, opening, closing, duration):
+                if window_start != start and window_start >= now:
+                    found.append((window_start, window_start + duration))
+
+    found.sort(key=distance)
+    return found[:limit]
+
+
+def other_tables(table, number_of_party, start, end, limit=3, exclude_pk=None):
+    """Best-fit free tables other than ``table`` for ``[start, end)``."""
+    table_id = getattr(table, 'pk', table)
+    tables = free_tables(number_of_party, start, end, exclude_pk)
+    return [candidate for candidate in tables if candidate.pk != table_id][:limit]
+
+
+def suggest(table, number_of_party, start, end, limit=3, exclude_pk=None):
+    """Alternatives for a booked request: other times for ``table`` and other tables at that time."""
+    return {
+        'windows': nearest_windows(table, start, end, limit, exclude_pk),
+        'tables': other_tables(table, number_of_party, start, end, limit, exclude_pk)
+        if is_bookable(start, end) else [],
+    }
@@ -1,3 +1,1239 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import re
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.http import JsonResponse
+from django.template.base import Template
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import cart, live, occupancy, orders, profiling
+from .autocomplete import table_names
+from .availability import TableIntervalIndex, availability_grid, engine, is_table_available
+from .booking import book, book_batch, BookingConflict
+from .forms import Table_ReservationForm
+from .management.commands._synthetic_data import SyntheticData
+from .menu_cache import catalog
+from .models import CartItem, Table, Table_Reservation, Category, Menu, TableOrder, TableOrderItem
+from .rules import calendar, is_bookable, opening_hours, validate_window
+from .search import search_menu_items
+from .suggestions import nearest_windows
+from .views import CART_MAX_QUANTITY
+
+
+# Page templates live one level down in templates/templates
+PAGE_TEMPLATES = [dict(settings.TEMPLATES[0], DIRS=[settings.BASE_DIR / 'templates' / 'templates'])]
+
+
+# ------------------ Booking Concurrency ------------------
+class ConcurrentBookingTests(TransactionTestCase):
+    threads = 8
+    attempts_per_thread = 40
+
+    def setUp(self):
+        engine.reset()
+        self.user = User.objects.create(username='stress')
+        self.table = Table.objects.create(name='Window', seats=4)
+        self.day = timezone.make_aware(datetime(2030, 1, 7, 8, 0))
+
+    def attempt(self, offset_minutes):
+        start = self.day + timedelta(minutes=offset_minutes)
+        reservation = Table_Reservation(
+            user=self.user,
+            table=self.table,
+            number_of_party=2,
+            reservation_start=start,
+            reservation_end=start + timedelta(minutes=90),
+        )
+        try:
+            book(self.table, reservation.reservation_start, reservation.reservation_end, reservation.save)
+            return True
+        except BookingConflict:
+            return False
+
+    def test_overlapping_bookings_never_double_book(self):
+        barrier = threading.Barrier(self.threads)
+        errors = []
+
+        def worker(thread_index):
+            try:
+                barrier.wait()
+                for attempt in range(self.attempts_per_thread):
+                    # Every thread races for the same 15-minute grid of 90-minute windows
+                    self.attempt(((attempt + thread_index) % self.attempts_per_thread) * 15)
+            except Exception as error:  # pragma: no cover - surfaced below
+                errors.append(error)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker, args=(index,)) for index in range(self.threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        intervals = list(
+            Table_Reservation.objects.filter(table=self.table)
+            .order_by('reservation_start')
+            .values_list('reservation_start', 'reservation_end')
+        )
+        self.assertTrue(intervals)
+        for (_, previous_end), (next_start, _) in zip(intervals, intervals[1:]):
+            self.assertLessEqual(previous_end, next_start)
+
+
+# ------------------ Availability Index ------------------
+class TableIntervalIndexTests(TestCase):
+
+    def setUp(self):
+        self.start = timezone.make_aware(datetime(2030, 1, 7, 12, 0))
+        self.index = TableIntervalIndex()
+        self.index.add(1, self.start, self.start + timedelta(hours=2))
+        self.index.add(2, self.start + timedelta(hours=4), self.start + timedelta(hours=5))
+
+    def pks(self, start_hours, end_hours, exclude_pk=None):
+        start, end = self.start + timedelta(hours=start_hours), self.start + timedelta(hours=end_hours)
+        return [pk for _, _, pk in self.index.overlapping(start, end, exclude_pk)]
+
+    def test_overlap(self):
+        self.assertEqual(self.pks(1, 3), [1])
+        self.assertEqual(self.pks(-1, 4.5), [1, 2])
+        self.assertEqual(self.pks(0.5, 1), [1])
+        self.assertEqual(self.pks(1, 3, exclude_pk=1), [])
+
+    def test_touching_windows_do_not_overlap(self):
+        self.assertEqual(self.pks(2, 4), [])
+        self.assertEqual(self.pks(-1, 0), [])
+        self.assertEqual(self.pks(5, 6), [])
+
+    def test_discard(self):
+        self.assertFalse(self.index.discard(2, self.start))
+        self.assertTrue(self.index.discard(1, self.start))
+        self.assertEqual(self.pks(0, 6), [2])
+
+
+class AvailabilityEngineTests(TestCase):
+
+    def setUp(self):
+        engine.reset()
+        self.user = User.objects.create(username='index')
+        self.patio = Table.objects.create(name='Patio', seats=4)
+        self.bar = Table.objects.create(name='Bar', seats=2)
+        self.start = timezone.make_aware(datetime(2030, 1, 7, 12, 0))
+        self.end = self.start + timedelta(hours=2)
+
+    def book(self, table):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Table_Reservation.objects.create(
+                user=self.user, table=table, number_of_party=2,
+                reservation_start=self.start, reservation_end=self.end,
+            )
+
+    def test_overlap_and_boundaries(self):
+        self.assertTrue(engine.is_available(self.patio.pk, self.start, self.end))
+        reservation = self.book(self.patio)
+        self.assertFalse(engine.is_available(self.patio.pk, self.start + timedelta(hours=1), self.end))
+        self.assertTrue(engine.is_available(self.patio.pk, self.end, self.end + timedelta(hours=1)))
+        self.assertTrue(engine.is_available(self.patio.pk, self.start - timedelta(hours=1), self.start))
+        self.assertTrue(engine.is_available(self.patio.pk, self.start, self.end, exclude_pk=reservation.pk))
+        self.assertEqual(engine.booked_table_ids(self.start, self.end), {self.patio.pk})
+
+    def test_update_moves_reservation(self):
+        reservation = self.book(self.patio)
+        self.assertFalse(engine.is_available(self.patio.pk, self.start, self.end))
+        reservation.table = self.bar
+        reservation.reservation_start += timedelta(hours=3)
+        reservation.reservation_end += timedelta(hours=3)
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation.save()
+        self.assertTrue(engine.is_available(self.patio.pk, self.start, self.end))
+        self.assertTrue(engine.is_available(self.bar.pk, self.start, self.end))
+        self.assertFalse(engine.is_available(self.bar.pk, reservation.reservation_start, reservation.reservation_end))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation.delete()
+        self.assertEqual(engine.booked_table_ids(self.start, self.end + timedelta(hours=3)), set())
+
+    def test_rolled_back_booking_is_not_indexed(self):
+        self.assertTrue(engine.is_available(self.patio.pk, self.start, self.end))
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Table_Reservation.objects.create(
+                        user=self.user, table=self.patio, number_of_party=2,
+                        reservation_start=self.start, reservation_end=self.end,
+                    )
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertTrue(engine.is_available(self.patio.pk, self.start, self.end))
+
+    def test_index_expires(self):
+        self.assertTrue(engine.is_available(self.patio.pk, self.start, self.end))
+        # Rows written by another process never reach this one's signals
+        Table_Reservation.objects.bulk_create([Table_Reservation(
+            user=self.user, table=self.patio, number_of_party=2,
+            reservation_start=self.start, reservation_end=self.end,
+        )])
+        now = engine._loaded_at
+        with mock.patch('Resturant.availability.time.monotonic', return_value=now + 59):
+            self.assertTrue(engine.is_available(self.patio.pk, self.start, self.end))
+        with mock.patch('Resturant.availability.time.monotonic', return_value=now + 61):
+            self.assertFalse(engine.is_available(self.patio.pk, self.start, self.end))
+
+
+# ------------------ Availability Grid ------------------
+class AvailabilityGridTests(TestCase):
+
+    def setUp(self):
+        engine.reset()
+        self.user = User.objects.create(username='grid')
+        self.tables = [Table.objects.create(name=f'Table {index}', seats=4) for index in range(2)]
+        self.first_day = datetime(2030, 1, 7).date()
+        self.last_day = datetime(2030, 1, 9).date()
+
+        def at(day, hour, minute=0):
+            return timezone.make_aware(datetime(2030, 1, day, hour, minute))
+
+        for table, start, end in [
+            (self.tables[0], at(7, 12), at(7, 14)),
+            (self.tables[0], at(8, 22, 50), at(9, 9, 10)),
+            (self.tables[1], at(8, 8), at(8, 8, 5)),
+            # Inside the last slot of the last day, which runs past closing time
+            (self.tables[1], at(9, 23, 5), at(9, 23, 15)),
+        ]:
+            Table_Reservation.objects.create(
+                user=self.user, table=table, number_of_party=2, reservation_start=start, reservation_end=end,
+            )
+
+    def assert_grid_matches_engine(self, slot_minutes):
+        grid = availability_grid(self.first_day, self.last_day, slot_minutes)
+        slot = timedelta(minutes=slot_minutes)
+        for table in self.tables:
+            for day_start, bits in zip(grid['slot_starts'], grid['bitmaps'][table.pk]):
+                for index in range(grid['slot_count']):
+                    start = day_start + index * slot
+                    self.assertEqual(
+                        bool(bits >> index & 1), not is_table_available(table, start, start + slot),
+                        (table.name, slot_minutes, start),
+                    )
+
+    def test_grid_matches_is_table_available(self):
+        for slot_minutes in (15, 30, 40, 25):
+            with self.subTest(slot_minutes=slot_minutes):
+                self.assert_grid_matches_engine(slot_minutes)
+
+
+# ------------------ Menu Catalog ------------------
+class MenuCatalogTests(TestCase):
+
+    def setUp(self):
+        self.category = Category.objects.create()
+        self.soup = Menu.objects.create(item_name='Soup', item_price=4.5, ingredients='Tomato', category=self.category)
+        catalog.bump()
+
+    def names(self):
+        return [item.item_name for item in catalog.items()]
+
+    def test_edit_is_served_after_commit(self):
+        self.assertEqual(self.names(), ['Soup'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.soup.item_name = 'Broth'
+            self.soup.save()
+            self.assertEqual(self.names(), ['Soup'])  # Not committed yet
+        self.assertEqual(self.names(), ['Broth'])
+
+    def test_local_entries_expire(self):
+        self.assertEqual(self.names(), ['Soup'])
+        # Edits from another worker process never bump this one's version
+        Menu.objects.filter(pk=self.soup.pk).update(item_name='Broth')
+        now = catalog._loaded_at
+        with mock.patch('Resturant.menu_cache.time.monotonic', return_value=now + 59):
+            self.assertEqual(self.names(), ['Soup'])
+        with mock.patch('Resturant.menu_cache.time.monotonic', return_value=now + 61):
+            self.assertEqual(self.names(), ['Broth'])
+
+
+# ------------------ Table Name Autocomplete ------------------
+class TableNameIndexTests(TestCase):
+
+    def setUp(self):
+        table_names.invalidate()
+        self.window = Table.objects.create(name='Window 2', seats=2)
+
+    def test_rename_is_served_after_commit(self):
+        self.assertEqual(table_names.complete('win'), ['Window 2'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.window.name = 'Patio 2'
+            self.window.save()
+            self.assertEqual(table_names.complete('win'), ['Window 2'])  # Not committed yet
+        self.assertEqual(table_names.complete('win'), [])
+        self.assertEqual(table_names.complete('2'), ['Patio 2'])
+
+    def test_index_expires(self):
+        self.assertEqual(table_names.complete('win'), ['Window 2'])
+        Table.objects.filter(pk=self.window.pk).update(name='Patio 2')
+        now = table_names._loaded_at
+        with mock.patch('Resturant.autocomplete.time.monotonic', return_value=now + 59):
+            self.assertEqual(table_names.complete('pat'), [])
+        with mock.patch('Resturant.autocomplete.time.monotonic', return_value=now + 61):
+            self.assertEqual(table_names.complete('pat'), ['Patio 2'])
+
+
+# ------------------ Reservation Import ------------------
+class ImportReservationsTests(TestCase):
+
+    def setUp(self):
+        engine.reset()
+        self.user = User.objects.create(username='importer')
+        self.patio = Table.objects.create(name='Patio', seats=4)
+        self.bar = Table.objects.create(name='Bar', seats=2)
+        self.start = timezone.make_aware(datetime(2030, 1, 7, 12, 0))
+        Table_Reservation.objects.create(
+            user=self.user, table=self.patio, number_of_party=2,
+            reservation_start=self.start, reservation_end=self.start + timedelta(hours=2),
+        )
+
+    def row(self, table, start_hours, end_hours, party=2, **extra):
+        return dict({
+            'user': self.user.pk, 'table': table.pk, 'number_of_party': party,
+            'reservation_start': (self.start + timedelta(hours=start_hours)).isoformat(),
+            'reservation_end': (self.start + timedelta(hours=end_hours)).isoformat(),
+        }, **extra)
+
+    def run_import(self, rows, *args):
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', encoding='utf-8') as source:
+            source.write('\n'.join(row if isinstance(row, str) else json.dumps(row) for row in rows))
+            source.flush()
+            stdout, stderr = io.StringIO(), io.StringIO()
+            call_command('import_reservations', source.name, *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_conflicting_and_invalid_rows_are_rejected(self):
+        stdout, stderr = self.run_import([
+            self.row(self.patio, 1, 3),  # Overlaps the existing booking
+            self.row(self.patio, 2, 4),  # Touches it: fine
+            self.row(self.patio, 3, 5),  # Overlaps the previous row of the file
+            self.row(self.bar, 0, 2, party=3),  # Too many guests
+            self.row(self.bar, 2, 1),
+            dict(self.row(self.bar, 0, 1), table=999),
+            dict(self.row(self.bar, 0, 1), reservation_start='noon'),
+            '{not json',
+            self.row(self.bar, 0, 2),
+        ])
+        self.assertIn("Imported 2 reservations, rejected 7 rows", stdout)
+        for line_number in (1, 3, 4, 5, 6, 7, 8):
+            self.assertIn(f"Row {line_number}:", stderr)
+        self.assertEqual(
+            sorted(Table_Reservation.objects.values_list('table_id', 'reservation_start')),
+            sorted([
+                (self.patio.pk, self.start),
+                (self.patio.pk, self.start + timedelta(hours=2)),
+                (self.bar.pk, self.start),
+            ]),
+        )
+
+    def test_strict_and_dry_run(self):
+        with self.assertRaisesMessage(CommandError, "Row 1:"):
+            self.run_import([self.row(self.patio, 1, 3)], '--strict')
+        stdout, _ = self.run_import([self.row(self.bar, 0, 2)], '--dry-run')
+        self.assertIn("Validated 1 reservations", stdout)
+        self.assertEqual(Table_Reservation.objects.count(), 1)
+
+    def test_import_updates_occupancy_engine_and_streams(self):
+        self.assertTrue(engine.is_available(self.bar.pk, self.start, self.start + timedelta(hours=2)))
+        broker = mock.Mock()
+        with mock.patch('Resturant.live.get_broker', return_value=broker):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.run_import([self.row(self.bar, 0, 2), self.row(self.bar, 11, 13)])
+
+        window = (self.start, self.start + timedelta(hours=2))
+        self.assertEqual(occupancy.candidate_table_ids(*window), {self.patio.pk, self.bar.pk})
+        self.assertFalse(engine.is_available(self.bar.pk, *window))
+        self.assertFalse(engine.is_available(self.bar.pk, self.start + timedelta(hours=12), self.start + timedelta(hours=13)))
+        # The second row runs past midnight, so both days' streams reload
+        published = sorted((name, message['type']) for (name, message), _ in broker.publish.call_args_list)
+        self.assertEqual(published, [
+            (live.channel(self.start.date()), 'resync'),
+            (live.channel(self.start.date() + timedelta(days=1)), 'resync'),
+        ])
+
+
+# ------------------ Batch Booking ------------------
+class BookBatchTests(TestCase):
+
+    def setUp(self):
+        engine.reset()
+        self.user = User.objects.create(username='batch')
+        self.patio = Table.objects.create(name='Patio', seats=4)
+        self.bar = Table.objects.create(name='Bar', seats=4)
+        self.start = timezone.make_aware(datetime(2030, 1, 7, 12, 0))
+        self.existing = self.reservation(self.patio, 0, 2)
+        self.existing.save()
+
+    def reservation(self, table, start_hours, end_hours):
+        return Table_Reservation(
+            user=self.user, table=table, number_of_party=2,
+            reservation_start=self.start + timedelta(hours=start_hours),
+            reservation_end=self.start + timedelta(hours=end_hours),
+        )
+
+    def windows(self):
+        return sorted(
+            (table_id, start - self.start)
+            for table_id, start in Table_Reservation.objects.values_list('table_id', 'reservation_start')
+        )
+
+    def test_conflicts_all_or_nothing(self):
+        batch = [self.reservation(self.patio, 1, 3), self.reservation(self.bar, 0, 2)]
+        self.assertEqual(book_batch(batch), ['conflict', 'skipped'])
+        self.assertEqual(Table_Reservation.objects.count(), 1)
+
+    def test_conflicts_best_effort(self):
+        batch = [
+            self.reservation(self.patio, 1, 3),  # Overlaps a saved booking
+            self.reservation(self.bar, 0, 2),
+            self.reservation(self.bar, 1, 2),  # Overlaps the previous item
+            self.reservation(self.patio, 2, 3),  # Touches the saved booking
+        ]
+        self.assertEqual(book_batch(batch, all_or_nothing=False), ['conflict', 'created', 'conflict', 'created'])
+        self.assertEqual(self.windows(), [
+            (self.patio.pk, timedelta(0)), (self.patio.pk, timedelta(hours=2)), (self.bar.pk, timedelta(0)),
+        ])
+
+    def test_move_between_tables_frees_the_old_slot(self):
+        self.existing.table = self.bar
+        batch = [self.existing, self.reservation(self.patio, 0, 2)]
+        self.assertEqual(book_batch(batch), ['updated', 'created'])
+        self.assertEqual(self.windows(), [(self.patio.pk, timedelta(0)), (self.bar.pk, timedelta(0))])
+        self.assertEqual(Table_Reservation.objects.get(pk=self.existing.pk).table_id, self.bar.pk)
+
+
+# ------------------ Occupancy Bitsets ------------------
+class OccupancyConsistencyTests(TestCase):
+    """The bitsets must agree with a direct overlap query on every 15-minute slot."""
+
+    def setUp(self):
+        engine.reset()
+        self.user = User.objects.create(username='occupancy')
+        self.patio = Table.objects.create(name='Patio', seats=4)
+        self.bar = Table.objects.create(name='Bar', seats=4)
+        self.day = datetime(2030, 1, 7).date()
+        self.start = timezone.make_aware(datetime(2030, 1, 7, 22, 10))
+
+    def assert_consistent(self):
+        slot_start = occupancy.day_start(self.day)
+        for _ in range(2 * occupancy.SLOTS_PER_DAY):
+            slot_end = slot_start + occupancy.SLOT
+            expected = set(Table_Reservation.objects.filter(
+                reservation_start__lt=slot_end, reservation_end__gt=slot_start,
+            ).values_list('table_id', flat=True))
+            self.assertEqual(occupancy.candidate_table_ids(slot_start, slot_end), expected, slot_start)
+            self.assertEqual(
+                {table_id for table_id in (self.patio.pk, self.bar.pk)
+                 if not engine.is_available(table_id, slot_start, slot_end)},
+                expected, slot_start,
+            )
+            slot_start = slot_end
+
+    def reserve(self, table, start, hours=2):
+        return Table_Reservation.objects.create(
+            user=self.user, table=table, number_of_party=2,
+            reservation_start=start, reservation_end=start + timedelta(hours=hours),
+        )
+
+    def test_create_update_move_and_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            # Crosses midnight, so two days of bits change
+            reservation = self.reserve(self.patio, self.start)
+            self.reserve(self.bar, self.start - timedelta(hours=10), hours=1)
+        self.assert_consistent()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation.reservation_start -= timedelta(hours=5, minutes=5)
+            reservation.reservation_end -= timedelta(hours=5)
+            reservation.save()
+        self.assert_consistent()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation.table = self.bar
+            reservation.save()
+        self.assert_consistent()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation.delete()
+        self.assert_consistent()
+
+    def test_bulk_writes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            moved = self.reserve(self.patio, self.start)
+        moved.table = self.bar
+        moved.reservation_start -= timedelta(hours=12)
+        moved.reservation_end -= timedelta(hours=12)
+        with self.captureOnCommitCallbacks(execute=True):
+            book_batch([moved, Table_Reservation(
+                user=self.user, table=self.patio, number_of_party=2,
+                reservation_start=self.start + timedelta(minutes=5), reservation_end=self.start + timedelta(hours=1),
+            )])
+        self.assert_consistent()
+
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', encoding='utf-8') as source:
+            source.write(json.dumps({
+                'user': self.user.pk, 'table': self.bar.pk, 'number_of_party': 2,
+                'reservation_start': (self.start + timedelta(hours=1)).isoformat(),
+                'reservation_end': (self.start + timedelta(hours=3, minutes=20)).isoformat(),
+            }))
+            source.flush()
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command('import_reservations', source.name, stdout=io.StringIO())
+        self.assertEqual(Table_Reservation.objects.count(), 3)
+        self.assert_consistent()
+
+
+# ------------------ Opening Hours ------------------
+@override_settings(
+    OPENING_HOURS={
+        'monday': [('08:00', '23:00')],
+        'tuesday': [('12:00', '14:30'), ('18:00', '24:00')],
+        'saturday': [],
+    },
+    CLOSED_DATES=['2030-01-14', ('2030-01-21', '2030-01-22')],
+    SPECIAL_HOURS={'2030-01-28': [('10:00', '12:00')]},
+)
+class OpeningHoursTests(TestCase):
+    # 2030-01-07 is a Monday
+
+    def at(self, day, clock):
+        hours, minutes = map(int, clock.split(':'))
+        return timezone.make_aware(datetime(2030, 1, day) + timedelta(hours=hours, minutes=minutes))
+
+    def bookable(self, day, start, end):
+        return is_bookable(self.at(day, start), self.at(day, end))
+
+    def test_window_must_lie_inside_opening_hours(self):
+        self.assertTrue(self.bookable(7, '08:00', '10:00'))
+        self.assertTrue(self.bookable(7, '21:00', '23:00'))  # Ends exactly at closing time
+        self.assertFalse(self.bookable(7, '21:00', '23:01'))
+        self.assertFalse(self.bookable(7, '07:59', '09:00'))
+
+    def test_split_hours(self):
+        self.assertTrue(self.bookable(8, '12:00', '14:30'))
+        self.assertTrue(self.bookable(8, '22:00', '24:00'))
+        self.assertFalse(self.bookable(8, '14:00', '18:30'))  # Spans the afternoon break
+        with self.assertRaisesMessage(ValidationError, "allowed only during 12:00–14:30, 18:00–24:00"):
+            validate_window(self.at(8, '15:00'), self.at(8, '16:00'))
+
+    def test_closed_days(self):
+        self.assertFalse(self.bookable(12, '12:00', '13:00'))
+        self.assertEqual(opening_hours(datetime(2030, 1, 12).date()), [])
+        with self.assertRaisesMessage(ValidationError, "closed on Saturdays"):
+            validate_window(self.at(12, '12:00'), self.at(12, '13:00'))
+        for day in (14, 21, 22):
+            self.assertFalse(self.bookable(day, '12:00', '13:00'))
+        with self.assertRaisesMessage(ValidationError, "closed on Monday 21 January 2030"):
+            validate_window(self.at(21, '12:00'), self.at(21, '13:00'))
+        self.assertFalse(self.bookable(23, '12:00', '13:00'))  # Wednesday has no hours either
+
+    def test_special_hours_override_the_weekday(self):
+        self.assertEqual(opening_hours(datetime(2030, 1, 28).date()), [('10:00', '12:00')])
+        self.assertTrue(self.bookable(28, '10:00', '12:00'))
+        self.assertFalse(self.bookable(28, '12:00', '13:00'))
+
+    def test_order_and_past(self):
+        with self.assertRaisesMessage(ValidationError, "end must be after the start"):
+            validate_window(self.at(7, '12:00'), self.at(7, '12:00'))
+        past = timezone.make_aware(datetime(2020, 1, 6, 12, 0))  # A Monday
+        self.assertFalse(is_bookable(past, past + timedelta(hours=1)))
+        self.assertTrue(is_bookable(past, past + timedelta(hours=1), allow_past=True))
+
+    def test_settings_are_validated(self):
+        with override_settings(OPENING_HOURS={'funday': []}):
+            with self.assertRaises(ImproperlyConfigured):
+                calendar.hours(datetime(2030, 1, 7).date())
+        with override_settings(OPENING_HOURS={'monday': [('23:00', '08:00')]}):
+            with self.assertRaises(ImproperlyConfigured):
+                calendar.hours(datetime(2030, 1, 7).date())
+
+
+# ------------------ Suggestions ------------------
+@override_settings(
+    OPENING_HOURS={
+        'monday': [('08:00', '23:00')],
+        'tuesday': [('06:00', '12:00')],
+        'wednesday': [('08:00', '23:00')],
+    },
+    CLOSED_DATES=[],
+    SPECIAL_HOURS={},
+)
+class NearestWindowsTests(TestCase):
+    # 2030-01-07 is a Monday
+
+    def setUp(self):
+        self.user = User.objects.create(username='suggest')
+        self.table = Table.objects.create(name='Corner', seats=4)
+
+    def at(self, day, clock):
+        hours, minutes = map(int, clock.split(':'))
+        return timezone.make_aware(datetime(2030, 1, day) + timedelta(hours=hours, minutes=minutes))
+
+    def book(self, day, start, end):
+        return Table_Reservation.objects.create(
+            user=self.user, table=self.table, number_of_party=2,
+            reservation_start=self.at(day, start), reservation_end=self.at(day, end),
+        )
+
+    def starts(self, windows):
+        return [timezone.localtime(start).strftime('%d %H:%M') for start, _ in windows]
+
+    def test_closer_windows_on_a_later_day_win(self):
+        self.book(7, '11:00', '23:00')
+        # Monday still has 08:00-10:00 starts, but Tuesday 06:00 is nine hours away
+        windows = nearest_windows(self.table, self.at(7, '21:00'), self.at(7, '22:00'))
+        self.assertEqual(self.starts(windows), ['08 06:00', '08 06:15', '08 06:30'])
+        self.assertTrue(all(end - start == timedelta(hours=1) for start, end in windows))
+
+    def test_ordered_by_distance_from_the_request(self):
+        self.book(7, '08:00', '20:00')
+        windows = nearest_windows(self.table, self.at(7, '19:00'), self.at(7, '20:00'), limit=4)
+        self.assertEqual(self.starts(windows), ['07 20:00', '07 20:15', '07 20:30', '07 20:45'])
+
+    def test_exclude_pk_frees_the_reservation_being_moved(self):
+        reservation = self.book(7, '11:00', '23:00')
+        request = self.at(7, '21:00'), self.at(7, '22:00')
+        self.assertNotIn('07 21:15', self.starts(nearest_windows(self.table, *request)))
+        windows = nearest_windows(self.table, *request, exclude_pk=reservation.pk)
+        self.assertEqual(self.starts(windows)[:2], ['07 20:45', '07 21:15'])
+
+    @override_settings(CLOSED_DATES=['2030-01-08'])
+    def test_closed_days_are_skipped_without_a_query(self):
+        self.book(7, '08:00', '23:00')
+        with self.assertNumQueries(2):  # Monday and Wednesday
+            windows = nearest_windows(self.table, self.at(7, '21:00'), self.at(7, '22:00'))
+        self.assertEqual(self.starts(windows), ['09 08:00', '09 08:15', '09 08:30'])
+
+
+# ------------------ Reservation Form ------------------
+class ReservationFormTests(TestCase):
+
+    def setUp(self):
+        engine.reset()
+        self.small = Table.objects.create(name='Bar', seats=2)
+        self.large = Table.objects.create(name='Patio', seats=6)
+        self.start = timezone.make_aware(datetime(2030, 1, 7, 12, 0))
+
+    def form(self, party, start_hours=0, end_hours=2, table=None):
+        return Table_ReservationForm(data={
+            'table': table.pk if table else '',
+            'number_of_party': party,
+            'reservation_start': (self.start + timedelta(hours=start_hours)).strftime('%Y-%m-%dT%H:%M'),
+            'reservation_end': (self.start + timedelta(hours=end_hours)).strftime('%Y-%m-%dT%H:%M'),
+        })
+
+    def test_blank_table_is_assigned(self):
+        form = self.form(party=2)
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertTrue(form.table_assigned)
+        self.assertEqual(form.cleaned_data['table'], self.small)
+        self.assertEqual(form.instance.table, self.small)
+
+    def test_blank_table_without_a_fit(self):
+        form = self.form(party=8)
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.non_field_errors(), ["No table for a party of 8 is free during this time."])
+
+    def test_blank_table_with_invalid_window(self):
+        form = self.form(party=2, start_hours=2, end_hours=1)
+        self.assertFalse(form.is_valid())
+        self.assertTrue(form.non_field_errors())
+        self.assertFalse(form.table_assigned)
+
+        form = self.form(party=2, start_hours=10, end_hours=12)  # Past closing time
+        self.assertFalse(form.is_valid())
+        self.assertTrue(form.non_field_errors())
+
+        # Past windows pass Model.clean(), which then reaches the blank table
+        self.start = timezone.make_aware(datetime(2020, 1, 6, 12, 0))
+        form = self.form(party=2)
+        self.assertFalse(form.is_valid())
+        self.assertTrue(form.non_field_errors())
+
+
+
+# ------------------ Cart ------------------
+class CartTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username='shopper')
+        category = Category.objects.create()
+        self.soup, self.bread = (
+            Menu.objects.create(item_name=name, item_price=price, ingredients='', category=category)
+            for name, price in (('Soup', 4.5), ('Bread', 2.0))
+        )
+        self.client.force_login(self.user)
+
+    def add_many(self, lines):
+        return self.client.post(
+            reverse('add_many_to_cart'), json.dumps({'items': lines}), content_type='application/json'
+        )
+
+    def test_add_bumps_the_existing_line(self):
+        url = reverse('add_to_cart', args=[self.soup.pk])
+        self.client.post(url, {'quantity': 2})
+        response = self.client.post(url, {'quantity': 3})
+        self.assertRedirects(response, reverse('menu_detail', args=[self.soup.pk]), fetch_redirect_response=False)
+        self.assertEqual(cart.quantities(self.user), {self.soup.pk: 5})
+
+    def test_add_rejects_oversized_quantities(self):
+        response = self.client.post(reverse('add_to_cart', args=[self.soup.pk]), {'quantity': CART_MAX_QUANTITY + 1})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(cart.quantities(self.user), {})
+
+    def test_add_many(self):
+        cart.add(self.user, self.soup.pk, 1)
+        response = self.add_many([
+            {'menu_item': self.soup.pk, 'quantity': 2},
+            {'menu_item': self.bread.pk},
+            {'menu_item': self.bread.pk, 'quantity': 2},
+            {'menu_item': 999999, 'quantity': 1},
+        ])
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['added'], sorted([self.soup.pk, self.bread.pk]))
+        self.assertEqual(body['unknown'], [999999])
+        self.assertEqual(body['summary'], {'lines': 2, 'units': 6, 'total': 3 * 4.5 + 3 * 2.0})
+        self.assertEqual(cart.quantities(self.user), {self.soup.pk: 3, self.bread.pk: 3})
+
+    def test_add_many_rejects_bad_quantities(self):
+        for quantity in (0, -1, CART_MAX_QUANTITY + 1):
+            self.assertEqual(self.add_many([{'menu_item': self.soup.pk, 'quantity': quantity}]).status_code, 400)
+        self.assertEqual(self.add_many({'menu_item': self.soup.pk}).status_code, 400)
+        self.assertEqual(cart.quantities(self.user), {})
+
+    def test_add_many_adds_onto_a_row_inserted_concurrently(self):
+        bulk_update = CartItem.objects.bulk_update
+
+        def racing_bulk_update(*args, **kwargs):
+            # Another request's first add of the bread lands after the row lock was taken
+            CartItem.objects.create(user=self.user, menu_item=self.bread, quantity=4)
+            return bulk_update(*args, **kwargs)
+
+        with mock.patch.object(CartItem.objects, 'bulk_update', racing_bulk_update):
+            cart.add_many(self.user, {self.soup.pk: 1, self.bread.pk: 2})
+        self.assertEqual(cart.quantities(self.user), {self.soup.pk: 1, self.bread.pk: 6})
+
+    def test_adopts_the_legacy_session_cart(self):
+        cart.add(self.user, self.soup.pk, 1)
+        session = self.client.session
+        session[cart.SESSION_KEY] = [self.soup.pk, self.bread.pk, self.bread.pk]
+        session.save()
+
+        response = self.client.get(reverse('cart_summary'))
+        self.assertEqual(response.json(), {'lines': 2, 'units': 4, 'total': 2 * 4.5 + 2 * 2.0})
+        self.assertNotIn(cart.SESSION_KEY, self.client.session)
+        self.client.get(reverse('cart_summary'))
+        self.assertEqual(cart.quantities(self.user), {self.soup.pk: 2, self.bread.pk: 2})
+
+    def test_summary_is_a_single_query(self):
+        cart.add_many(self.user, {self.soup.pk: 2, self.bread.pk: 1})
+        with self.assertNumQueries(1):
+            totals = cart.summary(self.user)
+        self.assertEqual(totals, {'lines': 2, 'units': 3, 'total': 11.0})
+        self.assertEqual(cart.summary(User.objects.create(username='empty')), {'lines': 0, 'units': 0, 'total': 0.0})
+
+
+class AddCartToTableTests(TestCase):
+
+    def setUp(self):
+        engine.reset()
+        self.user = User.objects.create(username='diner')
+        category = Category.objects.create()
+        self.soup, self.bread, self.tea = (
+            Menu.objects.create(item_name=name, item_price=price, ingredients='', category=category)
+            for name, price in (('Soup', 4.5), ('Bread', 2.0), ('Tea', 1.5))
+        )
+        table = Table.objects.create(name='Patio', seats=4)
+        start = timezone.make_aware(datetime(2030, 1, 7, 12, 0))
+        self.reservation = Table_Reservation.objects.create(
+            user=self.user, table=table, number_of_party=2,
+            reservation_start=start, reservation_end=start + timedelta(hours=2),
+        )
+        self.order = TableOrder.objects.create(reservation=self.reservation)
+        TableOrderItem.objects.create(table_order=self.order, menu_item=self.soup, quantity=2)
+        self.client.force_login(self.user)
+
+    def merge(self):
+        return self.client.get(reverse('add_cart_to_table', args=[self.reservation.pk]))
+
+    def test_merges_into_existing_order(self):
+        cart.add_many(self.user, {self.soup.pk: 3, self.bread.pk: 1})
+        response = self.merge()
+        self.assertRedirects(response, reverse('view-reservation'), fetch_redirect_response=False)
+
+        self.assertEqual(
+            dict(self.order.items.values_list('menu_item_id', 'quantity')),
+            {self.soup.pk: 5, self.bread.pk: 1},
+        )
+        self.assertEqual(TableOrder.objects.filter(reservation=self.reservation).count(), 1)
+        self.assertEqual(cart.quantities(self.user), {})
+        self.reservation.refresh_from_db()
+        self.assertEqual(self.reservation.order_total, 5 * 4.5 + 2.0)
+
+    def test_query_count_does_not_grow_with_the_cart(self):
+        cart.add_many(self.user, {self.soup.pk: 1, self.bread.pk: 1})
+        with self.assertNumQueries(12):
+            self.merge()
+        cart.add_many(self.user, {self.soup.pk: 1, self.bread.pk: 2, self.tea.pk: 3})
+        with self.assertNumQueries(12):
+            self.merge()
+        self.assertEqual(
+            dict(self.order.items.values_list('menu_item_id', 'quantity')),
+            {self.soup.pk: 4, self.bread.pk: 3, self.tea.pk: 3},
+        )
+
+    def test_empty_cart(self):
+        response = self.merge()
+        self.assertRedirects(response, reverse('view_cart'), fetch_redirect_response=False)
+        self.assertEqual(dict(self.order.items.values_list('menu_item_id', 'quantity')), {self.soup.pk: 2})
+
+
+# ------------------ Order Totals ------------------
+class OrderTotalsTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(username='host', is_staff=True, is_superuser=True)
+        self.table = Table.objects.create(name='Booth', seats=6)
+        category = Category.objects.create()
+        self.soup, self.bread = (
+            Menu.objects.create(item_name=name, item_price=price, ingredients='', category=category)
+            for name, price in (('Soup', 4.5), ('Bread', 2.0))
+        )
+        self.lunch = self.reserve(datetime(2030, 1, 7, 12, 0), party=2)
+        self.dinner = self.reserve(datetime(2030, 1, 7, 19, 0), party=4)
+        self.order = TableOrder.objects.create(reservation=self.lunch)
+
+    def reserve(self, start, party):
+        start = timezone.make_aware(start)
+        return Table_Reservation.objects.create(
+            user=self.user, table=self.table, number_of_party=party,
+            reservation_start=start, reservation_end=start + timedelta(hours=1),
+        )
+
+    def total(self, reservation):
+        reservation.refresh_from_db()
+        return reservation.order_total
+
+    def test_with_totals(self):
+        TableOrderItem.objects.create(table_order=self.order, menu_item=self.soup, quantity=2)
+        TableOrderItem.objects.create(table_order=self.order, menu_item=self.bread, quantity=3)
+        TableOrder.objects.create(reservation=self.dinner)
+        totals = {
+            order.reservation_id: (order.item_count, order.subtotal, order.total)
+            for order in TableOrder.objects.with_totals()
+        }
+        self.assertEqual(totals, {self.lunch.pk: (5, 15.0, 15.0), self.dinner.pk: (0, None, 0.0)})
+
+    def test_item_save_and_delete_refresh_the_reservation(self):
+        item = TableOrderItem.objects.create(table_order=self.order, menu_item=self.soup, quantity=2)
+        self.assertEqual(self.total(self.lunch), 9.0)
+        item.quantity = 3
+        item.save()
+        self.assertEqual(self.total(self.lunch), 13.5)
+        item.delete()
+        self.assertEqual(self.total(self.lunch), 0.0)
+        self.assertEqual(self.total(self.dinner), 0.0)
+
+    def test_menu_reprice_refreshes_orders_containing_it(self):
+        TableOrderItem.objects.create(table_order=self.order, menu_item=self.soup, quantity=2)
+        dinner_order = TableOrder.objects.create(reservation=self.dinner)
+        TableOrderItem.objects.create(table_order=dinner_order, menu_item=self.bread, quantity=1)
+        self.soup.item_price = 5.25
+        self.soup.save()
+        self.assertEqual(self.total(self.lunch), 10.5)
+        self.assertEqual(self.total(self.dinner), 2.0)
+
+    def test_daily_revenue(self):
+        TableOrderItem.objects.create(table_order=self.order, menu_item=self.soup, quantity=2)
+        dinner_order = TableOrder.objects.create(reservation=self.dinner)
+        TableOrderItem.objects.create(table_order=dinner_order, menu_item=self.bread, quantity=5)
+        self.reserve(datetime(2030, 1, 8, 12, 0), party=3)
+        self.reserve(datetime(2030, 1, 10, 12, 0), party=1)  # Outside the range
+
+        first, last = datetime(2030, 1, 7).date(), datetime(2030, 1, 9).date()
+        with self.assertNumQueries(1):
+            rows = list(orders.daily_revenue(first, last))
+        self.assertEqual(rows, [
+            {'day': first, 'reservations': 2, 'covers': 6, 'revenue': 19.0},
+            {'day': datetime(2030, 1, 8).date(), 'reservations': 1, 'covers': 3, 'revenue': 0.0},
+        ])
+
+    def test_admin_total_column(self):
+        TableOrderItem.objects.create(table_order=self.order, menu_item=self.soup, quantity=2)
+        dinner_order = TableOrder.objects.create(reservation=self.dinner)
+        TableOrderItem.objects.create(table_order=dinner_order, menu_item=self.bread, quantity=1)
+        self.client.force_login(self.user)
+
+        url = reverse('admin:Resturant_tableorder_changelist')
+        response = self.client.get(url, {'o': '3'})  # Sort by the Total column
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([order.pk for order in response.context['cl'].result_list], [dinner_order.pk, self.order.pk])
+        self.assertContains(response, '<td class="field-order_total">9.00</td>', html=True)
+        self.assertContains(response, '<td class="field-order_total">2.00</td>', html=True)
+
+
+# ------------------ Menu Search ------------------
+class MenuSearchTests(TestCase):
+
+    def setUp(self):
+        self.mains = Category.objects.create(type='Mains')
+        self.drinks = Category.objects.create(type='Drinks')
+        self.curry = Menu.objects.create(
+            item_name='Chicken Curry', item_price=9.0, ingredients='chicken, rice', category=self.mains)
+        self.salad = Menu.objects.create(
+            item_name='Caesar Salad', item_price=6.0, ingredients='lettuce, chicken strips', category=self.mains)
+        self.lassi = Menu.objects.create(
+            item_name='Mango Lassi', item_price=3.0, ingredients='mango, yoghurt', category=self.drinks)
+
+    def names(self, query, **kwargs):
+        items, total = search_menu_items(query, **kwargs)
+        return [item.item_name for item in items], total
+
+    def test_name_matches_rank_first(self):
+        # 'Caesar Salad' sorts first by name but only has chicken in its ingredients
+        self.assertEqual(self.names('chicken'), (['Chicken Curry', 'Caesar Salad'], 2))
+
+    def test_prefixes_and_every_word(self):
+        self.assertEqual(self.names('chi'), (['Chicken Curry', 'Caesar Salad'], 2))
+        self.assertEqual(self.names('chick lett'), (['Caesar Salad'], 1))
+        self.assertEqual(self.names('drin'), (['Mango Lassi'], 1))  # Category
+        self.assertEqual(self.names('chicken', limit=1, offset=1), (['Caesar Salad'], 2))
+        self.assertEqual(self.names('chicken', with_total=False), (['Chicken Curry', 'Caesar Salad'], None))
+        self.assertEqual(self.names('  '), ([], 0))
+
+    def test_index_follows_edits(self):
+        self.mains.type = 'Specials'
+        self.mains.save()
+        self.assertEqual(self.names('special')[1], 2)
+        self.assertEqual(self.names('mains')[1], 0)
+
+        self.salad.delete()
+        self.assertEqual(self.names('chicken'), (['Chicken Curry'], 1))
+
+        self.lassi.item_name = 'Mango Smoothie'
+        self.lassi.save()
+        self.assertEqual(self.names('smoo'), (['Mango Smoothie'], 1))
+
+    def test_fallback_backend(self):
+        with mock.patch.dict('Resturant.search.BACKENDS', clear=True):
+            # Ordered by name instead of relevance
+            self.assertEqual(self.names('chicken'), (['Caesar Salad', 'Chicken Curry'], 2))
+            self.assertEqual(self.names('chick lett'), (['Caesar Salad'], 1))
+            self.assertEqual(self.names('drinks'), (['Mango Lassi'], 1))
+            self.assertEqual(self.names('chicken', limit=1, offset=1), (['Chicken Curry'], 2))
+
+
+# ------------------ Reservation Listing ------------------
+@override_settings(TEMPLATES=PAGE_TEMPLATES)
+class ReservationListingQueryTests(TestCase):
+
+    def setUp(self):
+        engine.reset()
+        self.user = User.objects.create(username='diner')
+        self.category = Category.objects.create()
+        self.menu_item = Menu.objects.create(
+            item_name='Soup', item_price=4.5, ingredients='Tomato', category=self.category
+        )
+        self.start = timezone.make_aware(datetime(2030, 1, 7, 12, 0))
+        self.client.force_login(self.user)
+
+    def add_reservations(self, count):
+        for index in range(count):
+            table = Table.objects.create(name=f'Table {Table.objects.count()}', seats=4)
+            start = self.start + timedelta(days=Table_Reservation.objects.count())
+            reservation = Table_Reservation.objects.create(
+                user=self.user, table=table, number_of_party=2,
+                reservation_start=start, reservation_end=start + timedelta(hours=2),
+            )
+            order = TableOrder.objects.create(reservation=reservation)
+            TableOrderItem.objects.create(table_order=order, menu_item=self.menu_item, quantity=2)
+
+    def count_listing_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('view-reservation'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_reservations(self):
+        self.add_reservations(1)
+        self.count_listing_queries()  # Warm the menu catalog cache
+        single = self.count_listing_queries()
+
+        self.add_reservations(9)
+        full_page = self.count_listing_queries()
+
+        self.assertEqual(single, full_page)
+
+
+# ------------------ Conditional GET ------------------
+@override_settings(TEMPLATES=PAGE_TEMPLATES)
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        engine.reset()
+        catalog.bump()
+        self.user = User.objects.create(username='regular')
+        self.table = Table.objects.create(name='Bar', seats=2)
+        category = Category.objects.create(type='Mains')
+        self.dish = Menu.objects.create(item_name='Stew', item_price=12.0, ingredients='beef', category=category)
+        self.client.force_login(self.user)
+
+    def revalidate(self, url, params=None):
+        """``(first response, response to a repeat sending its ETag)``."""
+        self.client.get(url, params)  # Page ETags include the CSRF cookie, set by the first visit
+        first = self.client.get(url, params)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('no-cache', first['Cache-Control'])
+        return first, self.client.get(url, params, HTTP_IF_NONE_MATCH=first['ETag'])
+
+    def test_availability_is_304_until_a_booking(self):
+        url, params = reverse('check-availability'), {'date': '2030-01-07', 'time': '12:00'}
+        first, repeat = self.revalidate(url, params)
+        self.assertEqual(repeat.status_code, 304)
+        self.assertEqual(repeat.content, b'')
+
+        start = timezone.make_aware(datetime(2030, 1, 7, 12, 30))
+        with self.captureOnCommitCallbacks(execute=True):
+            Table_Reservation.objects.create(
+                user=self.user, table=self.table, number_of_party=2,
+                reservation_start=start, reservation_end=start + timedelta(hours=1),
+            )
+        response = self.client.get(url, params, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertEqual(response.json()['tables'][0]['status'], 'Booked')
+
+    def test_bookings_on_other_days_keep_the_etag(self):
+        url, params = reverse('check-availability'), {'date': '2030-01-07', 'time': '12:00'}
+        first = self.client.get(url, params)
+        start = timezone.make_aware(datetime(2030, 1, 8, 12, 0))
+        with self.captureOnCommitCallbacks(execute=True):
+            Table_Reservation.objects.create(
+                user=self.user, table=self.table, number_of_party=2,
+                reservation_start=start, reservation_end=start + timedelta(hours=1),
+            )
+        self.assertEqual(self.client.get(url, params, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+    def test_menu_pages_are_304_until_a_menu_edit(self):
+        for url in (reverse('menu-list'), reverse('menu_detail', args=[self.dish.pk])):
+            with self.subTest(url=url):
+                first, repeat = self.revalidate(url)
+                self.assertEqual(repeat.status_code, 304)
+
+                with self.captureOnCommitCallbacks(execute=True):
+                    self.dish.item_name += ' Special'
+                    self.dish.save()
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], first['ETag'])
+                self.assertContains(response, self.dish.item_name)
+
+
+# ------------------ Async Views ------------------
+class AsyncViewTests(TestCase):
+
+    def setUp(self):
+        engine.reset()
+        self.user = User.objects.create(username='host')
+        self.patio = Table.objects.create(name='Patio', seats=4)
+        self.bar = Table.objects.create(name='Bar', seats=2)
+        start = timezone.make_aware(datetime(2030, 1, 7, 18, 0))
+        Table_Reservation.objects.create(
+            user=self.user, table=self.patio, number_of_party=2,
+            reservation_start=start, reservation_end=start + timedelta(hours=2),
+        )
+        category = Category.objects.create(type='Mains')
+        for name in ('Chicken Curry', 'Chickpea Salad', 'Mango Lassi'):
+            Menu.objects.create(item_name=name, item_price=5.0, ingredients='', category=category)
+        self.client.force_login(self.user)
+        self.async_client.force_login(self.user)
+
+    async def assert_same_json(self, sync_name, async_name, params):
+        expected = await sync_to_async(self.client.get)(reverse(sync_name), params)
+        response = await self.async_client.get(reverse(async_name), params)
+        self.assertEqual((response.status_code, response['Content-Type']), (200, 'application/json'))
+        self.assertEqual(response.json(), expected.json())
+        return response.json()
+
+    async def test_check_availability_matches_sync(self):
+        data = await self.assert_same_json(
+            'check-availability', 'check-availability-async', {'date': '2030-01-07', 'time': '19:00'})
+        self.assertEqual(
+            {table['name']: table['status'] for table in data['tables']}, {'Patio': 'Booked', 'Bar': 'Available'})
+        await self.assert_same_json('check-availability', 'check-availability-async', {'date': '2030-01-07', 'time': '20:00'})
+
+    async def test_availability_grid_matches_sync(self):
+        for params in ({'date': '2030-01-07'}, {'date': '2030-01-07', 'slot': 25, 'format': 'runs'}):
+            data = await self.assert_same_json('availability-grid', 'availability-grid-async', params)
+            self.assertEqual(len(data['days']), 1)
+
+    async def test_typeahead_matches_sync(self):
+        data = await self.assert_same_json('menu-typeahead', 'menu-typeahead-async', {'term': 'chick'})
+        self.assertEqual(sorted(item['item_name'] for item in data), ['Chicken Curry', 'Chickpea Salad'])
+
+    async def test_search_shape(self):
+        response = await self.async_client.get(reverse('search-menu-async'), {'query': 'chick'})
+        data = response.json()
+        self.assertEqual((data['query'], data['total'], data['page']), ('chick', 2, 1))
+        self.assertEqual(set(data['results'][0]), {'id', 'item_name', 'item_price', 'category'})
+
+    async def test_errors_and_login(self):
+        response = await self.async_client.get(reverse('check-availability-async'), {'date': 'x', 'time': '19:00'})
+        self.assertEqual(response.status_code, 400)
+        await self.async_client.alogout()
+        for name in ('check-availability-async', 'availability-grid-async'):
+            response = await self.async_client.get(reverse(name), {'date': '2030-01-07', 'time': '19:00'})
+            self.assertEqual(response.status_code, 302)
+
+
+# ------------------ Live Availability ------------------
+@override_settings(LIVE_BROKER='Resturant.live.LocalBroker')
+class LiveAvailabilityTests(TestCase):
+
+    def setUp(self):
+        engine.reset()
+        self.user = User.objects.create(username='host')
+        self.table = Table.objects.create(name='Patio', seats=4)
+        self.start = timezone.make_aware(datetime(2030, 1, 7, 12, 0))
+
+    def book(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Table_Reservation.objects.create(
+                user=self.user, table=self.table, number_of_party=2,
+                reservation_start=self.start, reservation_end=self.start + timedelta(hours=2),
+            )
+
+    def cancel(self, reservation):
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation.delete()
+
+    async def next_event(self, stream):
+        chunk = await asyncio.wait_for(anext(stream), timeout=1)
+        event, data = chunk.strip().split('\n')
+        return event.removeprefix('event: '), json.loads(data.removeprefix('data: '))
+
+    async def test_stream_sends_snapshot_then_deltas(self):
+        stream = live.event_stream(self.start.date())
+        try:
+            self.assertTrue((await anext(stream)).startswith('retry:'))
+            event, data = await self.next_event(stream)
+            self.assertEqual(event, 'snapshot')
+            self.assertEqual(data['reservations'], [])
+
+            reservation = await sync_to_async(self.book)()
+            event, data = await self.next_event(stream)
+            self.assertEqual((event, data['reservation'], data['table']), ('booked', reservation.pk, self.table.pk))
+
+            booked_pk = reservation.pk
+            await sync_to_async(self.cancel)(reservation)
+            event, data = await self.next_event(stream)
+            self.assertEqual((event, data['reservation']), ('released', booked_pk))
+        finally:
+            await stream.aclose()
+
+    def test_endpoint_needs_asgi(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('availability-stream'))
+        self.assertEqual(response.status_code, 501)
+
+    async def test_endpoint_streams_under_asgi(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('availability-stream'), {'date': '2030-01-07'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        try:
+            self.assertTrue((await anext(stream)).startswith(b'retry:'))
+            chunk = await asyncio.wait_for(anext(stream), timeout=1)
+            self.assertTrue(chunk.startswith(b'event: snapshot'))
+        finally:
+            await stream.aclose()
+
+
+# ------------------ Profiling ------------------
+@override_settings(TEMPLATES=PAGE_TEMPLATES, PROFILING_ENABLED=True)
+class ProfilingMiddlewareTests(TestCase):
+    SERVER_TIMING = re.compile(
+        r'db;dur=(?P<db>[\d.]+);desc="(?P<queries>\d+) queries", tpl;dur=(?P<tpl>[\d.]+), total;dur=[\d.]+'
+    )
+
+    def setUp(self):
+        profiling.registry.reset()
+        self.user = User.objects.create(username='profiled', is_staff=True)
+        category = Category.objects.create()
+        soup = Menu.objects.create(item_name='Soup', item_price=4.5, ingredients='', category=category)
+        cart.add(self.user, soup.pk, 2)
+        self.client.force_login(self.user)
+
+    def test_server_timing_counts_every_query_and_the_template(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('view_cart'))
+        self.assertEqual(response.status_code, 200)
+        timing = self.SERVER_TIMING.fullmatch(response['Server-Timing'])
+        self.assertIsNotNone(timing, response['Server-Timing'])
+        self.assertEqual(int(timing['queries']), len(queries))
+        self.assertGreater(float(timing['tpl']), 0)
+
+        stats = profiling.registry.snapshot()['views']['view_cart']
+        self.assertEqual(stats['requests'], 1)
+        self.assertEqual(stats['mean_queries'], len(queries))
+
+    def test_template_render_is_only_patched_during_requests(self):
+        self.client.get(reverse('view_cart'))  # Middleware already built and used by the test client
+        original = Template.render
+        self.assertIsNot(original, profiling._timed_render)
+        seen = []
+
+        def spy(request):
+            seen.append(Template.render)
+            return JsonResponse({})
+
+        middleware = profiling.ProfilingMiddleware(spy)
+        self.assertIs(Template.render, original)
+        request = RequestFactory().get('/')
+        request.resolver_match = None
+        middleware(request)
+        self.assertIs(seen[-1], profiling._timed_render)
+        self.assertIs(Template.render, original)
+
+        with override_settings(PROFILING_ENABLED=False):
+            response = middleware(request)
+        self.assertIs(seen[-1], original)
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+# ------------------ Benchmark Data ------------------
+class SyntheticDataTests(TestCase):
+
+    def test_seeds_the_requested_reservations(self):
+        data = SyntheticData(tables=3, users=4, menu_items=5, reservations=40).seed()
+        self.assertEqual(Table_Reservation.objects.count(), 40)
+        self.assertEqual(len(data.free_windows(5)), 5)
+
+    @override_settings(OPENING_HOURS={'monday': [('08:00', '08:30')]})
+    def test_hours_without_room_for_a_booking_raise(self):
+        with self.assertRaisesMessage(CommandError, "No open interval long enough for a booking"):
+            SyntheticData(tables=1, users=1, menu_items=1, reservations=1).seed()
@@ -14,10 +14,21 @@ from .views import (
     add_to_table,
     MenuDetailView,
     add_to_cart,
+    add_many_to_cart,
+    cart_summary,
     view_cart,
     check_availability,
+    suggest_alternatives,
+    availability_grid,
     MenuListView,
     search_menu,
+    menu_typeahead,
+    check_availability_async,
+    availability_grid_async,
+    search_menu_async,
+    menu_typeahead_async,
+    availability_stream,
+    profiling_stats,
 )
 
 urlpatterns = [
@@ -44,13 +55,28 @@ urlpatterns = [
     path('menu/<int:pk>/', MenuDetailView.as_view(), name='menu_detail'),
     path('menu/<int:pk>/add-to-cart/', add_to_cart, name='add_to_cart'),
     path('cart/',view_cart, name='view_cart'),
+    path('cart/add-many/', add_many_to_cart, name='add_many_to_cart'),
+    path('cart/summary/', cart_summary, name='cart_summary'),
 
     # Table Orders
     path('reservation/<int:reservation_id>/add-to-table/', add_to_table, name='add-to-table'),
 
     # Search
     path('search/', views.search_menu, name='search-menu'),
+    path('search/typeahead/', menu_typeahead, name='menu-typeahead'),
     path('cart/add-to-reservation/<int:reservation_id>/', views.add_cart_to_table, name='add_cart_to_table'),
-    path('check-availability/', views.check_availability, name='check-availability')
+    path('check-availability/', views.check_availability, name='check-availability'),
+    path('suggest-alternatives/', suggest_alternatives, name='suggest-alternatives'),
+    path('availability-grid/', availability_grid, name='availability-grid'),
+
+    # Async (ASGI) variants of the hot read endpoints
+    path('async/check-availability/', check_availability_async, name='check-availability-async'),
+    path('async/availability-grid/', availability_grid_async, name='availability-grid-async'),
+    path('async/search/', search_menu_async, name='search-menu-async'),
+    path('async/search/typeahead/', menu_typeahead_async, name='menu-typeahead-async'),
+    path('live/availability/', availability_stream, name='availability-stream'),
+
+    # Internal
+    path('internal/profiling/', profiling_stats, name='profiling-stats'),
 
 ]
\ No newline at end of file
@@ -1,20 +1,27 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse_lazy
 from django.utils import timezone
+from django.utils.decorators import method_decorator
 from django.contrib import messages
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.views import LoginView as DjangoLoginView, LogoutView as DjangoLogoutView
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q
-from django.http import JsonResponse
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import Count, F, Prefetch, Q
+from django.http import Http404, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.views import View
 from django.views.generic import ListView, DetailView
 from django.views.generic.edit import FormView, UpdateView, DeleteView
 from django.forms import inlineformset_factory
+from collections import Counter
 from datetime import datetime
+import json
 
 from .models import (
+    Table,
     Table_Reservation,
     Profile,
     Menu,
@@ -28,6 +35,25 @@ from .forms import (
     TableOrderForm,
     TableOrderItemForm
 )
+from .booking import book, BookingConflict
+from .assignment import assign_table
+from .suggestions import suggest
+from .rules import opening_hours, validate_window
+from .menu_cache import catalog
+from . import cart, live, occupancy, profiling
+from .conditional import make_etag, menu_etag, revalidate
+from .orders import refresh_totals
+from .search import search_menu_items, asearch_menu_items
+from .occupancy import acandidate_table_ids
+from .availability import (
+    booked_table_ids,
+    is_table_available,
+    availability_grid as build_availability_grid,
+    aavailability_grid,
+    encode_bits,
+    encode_runs
+)
+
 # ------------------ Formset Definition ------------------
 TableOrderItemFormSet = inlineformset_factory(
     TableOrder,
@@ -77,6 +103,16 @@ class LogoutView(DjangoLogoutView):
         return super().dispatch(request, *args, **kwargs)
 
 # ------------------ Reservation: Create ------------------
+def _booking_suggestions(form):
+    """Other times and tables to offer when the form's table turned out to be booked."""
+    if not form.table_booked:
+        return None
+    data = form.cleaned_data
+    return suggest(
+        data['table'], data['number_of_party'], data['reservation_start'], data['reservation_end'],
+        exclude_pk=form.instance.pk,
+    )
+
 class CreateReservationView(LoginRequiredMixin, View):
     template_name = 'create_reservation.html'
     success_url = reverse_lazy('view-reservation')
@@ -86,6 +122,38 @@ class CreateReservationView(LoginRequiredMixin, View):
         formset = TableOrderItemFormSet()
         return render(request, self.template_name, {'form': form, 'order_formset': formset})
 
+    def save_reservation(self, reservation, formset):
+        reservation.save()
+
+        table_order = TableOrder.objects.create(reservation=reservation)
+
+        order_items = formset.save(commit=False)
+        for item in order_items:
+            item.table_order = table_order
+            item.save()
+
+        for obj in formset.deleted_objects:
+            obj.delete()
+
+    def book(self, reservation, formset, reassign=False):
+        """Save through ``book()``; an auto-assigned table taken meanwhile is replaced once."""
+        try:
+            return book(
+                reservation.table, reservation.reservation_start, reservation.reservation_end,
+                lambda: self.save_reservation(reservation, formset)
+            )
+        except BookingConflict:
+            table = reassign and assign_table(
+                reservation.number_of_party, reservation.reservation_start, reservation.reservation_end
+            )
+            if not table:
+                raise
+            reservation.table = table
+            return book(
+                table, reservation.reservation_start, reservation.reservation_end,
+                lambda: self.save_reservation(reservation, formset)
+            )
+
     def post(self, request):
         form = Table_ReservationForm(request.POST)
         formset = TableOrderItemFormSet(request.POST)
@@ -98,13 +166,10 @@ class CreateReservationView(LoginRequiredMixin, View):
                 reservation_end = form.cleaned_data['reservation_end']
 
                 # Check if table is booked during this time
-                is_booked = Table_Reservation.objects.filter(
-                    table=table,
-                    reservation_start__lt=reservation_end,
-                    reservation_end__gt=reservation_start
-                ).exists()
+                is_booked = not is_table_available(table, reservation_start, reservation_end)
 
                 if is_booked:
+                    form.table_booked = True
                     availability_message = f"Sorry, the table '{table.name}' is already booked during this time."
                 else:
                     availability_message = f"Good news! The table '{table.name}' is available during this time."
@@ -112,37 +177,34 @@ class CreateReservationView(LoginRequiredMixin, View):
                 return render(request, self.template_name, {
                     'form': form,
                     'order_formset': formset,
-                    'availability_message': availability_message
+                    'availability_message': availability_message,
+                    'suggestions': _booking_suggestions(form)
                 })
             else:
                 # Show form errors if invalid
                 return render(request, self.template_name, {
                     'form': form,
-                    'order_formset': formset
+                    'order_formset': formset,
+                    'suggestions': _booking_suggestions(form)
                 })
 
         elif action == 'reserve':
             if form.is_valid() and formset.is_valid():
                 reservation = form.save(commit=False)
                 reservation.user = request.user
-                reservation.save()
-
-                table_order = TableOrder.objects.create(reservation=reservation)
-
-                order_items = formset.save(commit=False)
-                for item in order_items:
-                    item.table_order = table_order
-                    item.save()
-
-                for obj in formset.deleted_objects:
-                    obj.delete()
-
-                messages.success(request, "Reservation created successfully!")
-                return redirect(self.success_url)
+                try:
+                    self.book(reservation, formset, reassign=form.table_assigned)
+                except BookingConflict as error:
+                    form.add_error(None, str(error))
+                    form.table_booked = True
+                else:
+                    messages.success(request, "Reservation created successfully!")
+                    return redirect(self.success_url)
 
             return render(request, self.template_name, {
                 'form': form,
-                'order_formset': formset
+                'order_formset': formset,
+                'suggestions': _booking_suggestions(form)
             })
 
         else:
@@ -175,14 +237,24 @@ class ViewReservationView(LoginRequiredMixin, ListView):
                 pass
 
         return Table_Reservation.objects.filter(filters) \
-            .prefetch_related('table_orders__items__menu_item') \
+            .select_related('table') \
+            .annotate(order_count=Count('table_orders')) \
+            .prefetch_related(
+                Prefetch('table_orders', queryset=TableOrder.objects.with_totals()),
+                'table_orders__items__menu_item',
+            ) \
             .order_by('-reservation_start')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        reservations = context['reservation']
-        context['menu'] = Menu.objects.all()
-        context['table'] = sorted(set(res.table.name for res in reservations))
+        context['menu'] = catalog.items()
+        # Filter dropdown: one DISTINCT query instead of walking every row's table
+        context['table'] = list(
+            Table.objects.filter(table_reservation__user=self.request.user)
+            .order_by('name')
+            .values_list('name', flat=True)
+            .distinct()
+        )
         return context
 
 
@@ -206,10 +278,20 @@ class UpdateReservationView(LoginRequiredMixin, UpdateView):
             context['order_formset'] = TableOrderItemFormSet(self.request.POST, instance=table_order)
         else:
             context['order_formset'] = TableOrderItemFormSet(instance=table_order)
+        context['suggestions'] = _booking_suggestions(context['form'])
         return context
 
     def form_valid(self, form):
-        self.object = form.save()
+        reservation = form.instance
+        try:
+            self.object = book(
+                reservation.table, reservation.reservation_start, reservation.reservation_end,
+                form.save, exclude_pk=reservation.pk
+            )
+        except BookingConflict as error:
+            form.add_error(None, str(error))
+            form.table_booked = True
+            return self.form_invalid(form)
         table_order = self.get_table_order()
         formset = TableOrderItemFormSet(self.request.POST, instance=table_order)
 
@@ -245,47 +327,154 @@ def add_to_table(request):
     return render(request, 'add_to_table.html', {
         'form': form,
         'reservations': Table_Reservation.objects.all(),
-        'menu_items': Menu.objects.all()
+        'menu_items': catalog.items()
     })
 
 # ------------------ Menu Search + Detail ------------------
+SEARCH_PAGE_SIZE = 20
+TYPEAHEAD_LIMIT = 8
+
+@revalidate(menu_etag)
 def search_menu(request):
     query = request.GET.get('query', '')
-    results = Menu.objects.filter(item_name__icontains=query) if query else []
-    return render(request, 'search_results.html', {'results': results, 'query': query})
+    try:
+        page = max(1, int(request.GET.get('page', 1)))
+    except ValueError:
+        page = 1
+
+    results, total = search_menu_items(query, limit=SEARCH_PAGE_SIZE, offset=(page - 1) * SEARCH_PAGE_SIZE)
+    return render(request, 'search_results.html', {
+        'results': results,
+        'query': query,
+        'total': total,
+        'page': page,
+        'previous_page': page - 1 if page > 1 else None,
+        'next_page': page + 1 if page * SEARCH_PAGE_SIZE < total else None,
+    })
+
+async def search_menu_async(request):
+    # JSON variant of search_menu for ASGI deployments
+    query = request.GET.get('query', '')
+    try:
+        page = max(1, int(request.GET.get('page', 1)))
+    except ValueError:
+        page = 1
+
+    results, total = await asearch_menu_items(query, limit=SEARCH_PAGE_SIZE, offset=(page - 1) * SEARCH_PAGE_SIZE)
+    return JsonResponse({
+        'query': query,
+        'total': total,
+        'page': page,
+        'results': [
+            {
+                'id': item.id,
+                'item_name': item.item_name,
+                'item_price': item.item_price,
+                'category': item.category.type,
+            }
+            for item in results
+        ],
+    })
 
+def _typeahead_response(results):
+    return JsonResponse([
+        {'id': item.id, 'item_name': item.item_name, 'category': item.category.type}
+        for item in results
+    ], safe=False)
+
+@revalidate(lambda request: make_etag(catalog.digest()))
+def menu_typeahead(request):
+    query = request.GET.get('term', '')
+    results, _ = search_menu_items(query, limit=TYPEAHEAD_LIMIT, with_total=False)
+    return _typeahead_response(results)
+
+async def menu_typeahead_async(request):
+    query = request.GET.get('term', '')
+    results, _ = await asearch_menu_items(query, limit=TYPEAHEAD_LIMIT, with_total=False)
+    return _typeahead_response(results)
+
+@method_decorator(revalidate(menu_etag), name='get')
 class MenuDetailView(DetailView):
     model = Menu
     template_name = 'menu_detail.html'
     context_object_name = 'menu_item'
 
+    def get_object(self, queryset=None):
+        menu_item = catalog.item(self.kwargs['pk'])
+        if menu_item is None:
+            raise Http404("No menu item found matching the query")
+        return menu_item
+
+@method_decorator(revalidate(menu_etag), name='get')
 class MenuListView(ListView):
     model = Menu
     template_name = 'menu_list.html'         
     context_object_name = 'menu_items'
 
+    def get_queryset(self):
+        return catalog.items()
+
 
 # ------------------ Cart ------------------
+CART_MAX_LINES = 100
+CART_MAX_QUANTITY = 99
+
 @login_required
 def add_to_cart(request, pk):
     item = get_object_or_404(Menu, pk=pk)
-    cart = request.session.get('cart', [])
-    if pk not in cart:
-        cart.append(pk)
-        request.session['cart'] = cart
-        messages.success(request, f"Added {item.item_name} to cart!")
-    else:
-        messages.info(request, f"{item.item_name} is already in your cart.")
+    try:
+        quantity = max(1, int(request.POST.get('quantity', 1)))
+    except ValueError:
+        quantity = 1
+    if quantity > CART_MAX_QUANTITY:
+        return HttpResponseBadRequest(f"At most {CART_MAX_QUANTITY} of an item per request")
+    cart.adopt_session_cart(request)
+    cart.add(request.user, item.pk, quantity)
+    messages.success(request, f"Added {quantity} x {item.item_name} to cart!")
     return redirect('menu_detail', pk=pk)
 
+@login_required
+def add_many_to_cart(request):
+    """POST ``{"items": [{"menu_item": id, "quantity": n}, ...]}``; responds with the cart summary."""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST required'}, status=405)
+    try:
+        lines = json.loads(request.body)['items']
+        if len(lines) > CART_MAX_LINES:
+            return JsonResponse({'error': f'At most {CART_MAX_LINES} items per request'}, status=400)
+        quantities = Counter()
+        for line in lines:
+            quantities[int(line['menu_item'])] += int(line.get('quantity', 1))
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'error': 'Expected {"items": [{"menu_item": id, "quantity": n}, ...]}'}, status=400)
+    if any(quantity <= 0 for quantity in quantities.values()):
+        return JsonResponse({'error': 'Quantities must be positive'}, status=400)
+    if any(quantity > CART_MAX_QUANTITY for quantity in quantities.values()):
+        return JsonResponse({'error': f'At most {CART_MAX_QUANTITY} of an item per request'}, status=400)
+
+    cart.adopt_session_cart(request)
+    added = cart.add_many(request.user, quantities)
+    return JsonResponse({
+        'added': sorted(added),
+        'unknown': sorted(set(quantities) - added),
+        'summary': cart.summary(request.user),
+    })
+
+@login_required
+def cart_summary(request):
+    cart.adopt_session_cart(request)
+    return JsonResponse(cart.summary(request.user))
+
 @login_required
 def view_cart(request):
-    cart = request.session.get('cart', [])
-    menu_items = Menu.objects.filter(id__in=cart)
+    cart.adopt_session_cart(request)
+    cart_items = list(cart.items(request.user))
     reservations = Table_Reservation.objects.filter(user=request.user)
 
     return render(request, 'view_cart.html', {
-        'menu_items': menu_items,
+        'cart_items': cart_items,
+        'cart_quantity': sum(item.quantity for item in cart_items),
+        'cart_total': round(sum(item.line_total for item in cart_items), 2),
         'reservations': reservations
     })
 
@@ -296,66 +485,263 @@ def add_cart_to_table(request, reservation_id):
     # Get reservation
     reservation = get_object_or_404(Table_Reservation, pk=reservation_id, user=request.user)
 
-    # Get session cart
-    cart = request.session.get('cart', [])
-    if not cart:
-        messages.error(request, "Your cart is empty.")
-        return redirect('view_cart')
+    cart.adopt_session_cart(request)
+
+    # Merge the whole cart with a fixed number of queries
+    with transaction.atomic():
+        quantities = cart.quantities(request.user)
+        if not quantities:
+            messages.error(request, "Your cart is empty.")
+            return redirect('view_cart')
+
+        table_order = reservation.table_orders.order_by('id').first()
+        if table_order is None:
+            table_order = TableOrder.objects.create(reservation=reservation)
+
+        existing_items = {
+            item.menu_item_id: item
+            for item in TableOrderItem.objects.filter(table_order=table_order, menu_item_id__in=quantities)
+        }
+
+        items_to_update = []
+        items_to_create = []
+        for menu_id, quantity in quantities.items():
+            item = existing_items.get(menu_id)
+            if item is not None:
+                item.quantity = F('quantity') + quantity
+                items_to_update.append(item)
+            else:
+                items_to_create.append(TableOrderItem(
+                    table_order=table_order, menu_item_id=menu_id, quantity=quantity
+                ))
 
-    # Get or create TableOrder for the reservation
-    table_order, created = TableOrder.objects.get_or_create(reservation=reservation)
+        TableOrderItem.objects.bulk_update(items_to_update, ['quantity'])
+        TableOrderItem.objects.bulk_create(items_to_create)
 
-    # Loop through cart items and add them to TableOrder
-    for menu_id in cart:
-        try:
-            menu_item = Menu.objects.get(pk=menu_id)
-        except Menu.DoesNotExist:
-            continue  # Skip if item doesn't exist
-
-        # Check if item already exists in the order
-        item, created = TableOrderItem.objects.get_or_create(
-            order=table_order,  # ✅ Ensure this matches your FK name!
-            menu_item=menu_item,
-            defaults={'quantity': 1}
-        )
-        if not created:
-            item.quantity += 1
-            item.save()
+        # Clear cart
+        cart.clear(request.user)
+
+        # bulk_create/bulk_update skip the signals that keep the cached total current
+        refresh_totals([reservation.pk])
 
-    # Clear cart
-    request.session['cart'] = []
     messages.success(request, "Cart items added to reservation!")
     return redirect('view-reservation')
 
-@login_required
-def check_availability(request):
+def _availability_window(request, check_hours=True):
+    """Return ``(start, end, None)`` for the requested 2-hour window or ``(None, None, error)``."""
     date = request.GET.get('date')
     time = request.GET.get('time')
 
     if not date or not time:
-        return JsonResponse({'error': 'Missing parameters'}, status=400)
+        return None, None, JsonResponse({'error': 'Missing parameters'}, status=400)
 
     try:
-        check_start = datetime.strptime(f"{date} {time}", "%Y-%m-%d %H:%M")
+        check_start = timezone.make_aware(datetime.strptime(f"{date} {time}", "%Y-%m-%d %H:%M"))
     except ValueError:
-        return JsonResponse({'error': 'Invalid date or time format'}, status=400)
+        return None, None, JsonResponse({'error': 'Invalid date or time format'}, status=400)
 
     check_end = check_start + timezone.timedelta(hours=2)  # assuming a 2-hour reservation
+    if check_hours:
+        try:
+            validate_window(check_start, check_end, allow_past=True)
+        except ValidationError as error:
+            return None, None, JsonResponse({'error': error.messages[0]}, status=400)
+    return check_start, check_end, None
+
+def _availability_response(tables, booked_table_ids):
+    return JsonResponse({'tables': [
+        {
+            'id': table_id,
+            'name': name,
+            'status': 'Booked' if table_id in booked_table_ids else 'Available'
+        }
+        for table_id, name in tables
+    ]})
+
+def _availability_freshness(request):
+    """``(etag, last_modified)`` of a ``check_availability`` answer, from the per-day change counters.
+
+    Both are ``None`` for invalid windows so the view renders its error.
+    """
+    if not hasattr(request, '_availability_freshness'):
+        freshness = None, None
+        check_start, check_end, error = _availability_window(request)
+        if not error:
+            versions = occupancy.versions(occupancy.days_spanned(check_start, check_end))
+            # Renaming or adding a table changes the answer without touching a reservation
+            tables = list(Table.objects.values_list('id', 'name').order_by('id'))
+            modified = [modified for _, modified in versions.values()]
+            freshness = (
+                make_etag(sorted(versions.items()), tables),
+                max(modified) if None not in modified else None,
+            )
+        request._availability_freshness = freshness
+    return request._availability_freshness
+
+@login_required
+@revalidate(
+    etag_func=lambda request: _availability_freshness(request)[0],
+    last_modified_func=lambda request: _availability_freshness(request)[1],
+)
+def check_availability(request):
+    check_start, check_end, error = _availability_window(request)
+    if error:
+        return error
+
+    return _availability_response(Table.objects.values_list('id', 'name'), booked_table_ids(check_start, check_end))
+
+@login_required
+async def check_availability_async(request):
+    check_start, check_end, error = _availability_window(request)
+    if error:
+        return error
+
+    # Only tables whose occupancy slots collide need the exact overlap query
+    candidates = await acandidate_table_ids(check_start, check_end)
+    booked = {
+        table_id async for table_id in Table_Reservation.objects.filter(
+            table_id__in=candidates,
+            reservation_start__lt=check_end,
+            reservation_end__gt=check_start
+        ).values_list('table_id', flat=True)
+    } if candidates else set()
+    tables = [table async for table in Table.objects.values_list('id', 'name')]
+    return _availability_response(tables, booked)
+
+SUGGESTION_MAX_LIMIT = 10
+
+@login_required
+def suggest_alternatives(request):
+    """Nearest free windows for a table plus other free tables at the requested time."""
+    check_start, _, error = _availability_window(request, check_hours=False)
+    if error:
+        return error
+
+    try:
+        table = Table.objects.get(pk=int(request.GET.get('table_id', '')))
+        duration = int(request.GET.get('duration', 120))
+        party = int(request.GET.get('party', 1))
+        limit = min(int(request.GET.get('limit', 3)), SUGGESTION_MAX_LIMIT)
+    except (ValueError, Table.DoesNotExist):
+        return JsonResponse({'error': 'Invalid table_id, duration, party or limit'}, status=400)
+    if duration <= 0 or party <= 0 or limit <= 0:
+        return JsonResponse({'error': 'duration, party and limit must be positive'}, status=400)
+
+    check_end = check_start + timezone.timedelta(minutes=duration)
+    suggestions = suggest(table, party, check_start, check_end, limit)
+    return JsonResponse({
+        'table': {'id': table.id, 'name': table.name, 'available': is_table_available(table, check_start, check_end)},
+        'windows': [
+            {'start': start.isoformat(), 'end': end.isoformat()} for start, end in suggestions['windows']
+        ],
+        'tables': [
+            {'id': other.id, 'name': other.name, 'seats': other.seats} for other in suggestions['tables']
+        ],
+    })
 
-    booked_table_ids = Table_Reservation.objects.filter(
-        reservation_start__lt=check_end,
-        reservation_end__gt=check_start
-    ).values_list('table_id', flat=True)
 
-    Table = Table_Reservation._meta.get_field('table').related_model
-    all_tables = Table.objects.all()
+def _grid_params(request):
+    """Return ``((first_day, last_day, slot_minutes, grid_format), None)`` or ``(None, error)``."""
+    date = request.GET.get('date')
+    end_date = request.GET.get('end_date') or date
+    grid_format = request.GET.get('format', 'bits')
+
+    if not date:
+        return None, JsonResponse({'error': 'Missing parameters'}, status=400)
 
-    tables = []
-    for table in all_tables:
-        tables.append({
-            'id': table.id,
-            'name': table.name,
-            'status': 'Booked' if table.id in booked_table_ids else 'Available'
+    try:
+        first_day = datetime.strptime(date, "%Y-%m-%d").date()
+        last_day = datetime.strptime(end_date, "%Y-%m-%d").date()
+        slot_minutes = int(request.GET.get('slot', 30))
+    except ValueError:
+        return None, JsonResponse({'error': 'Invalid date or slot format'}, status=400)
+
+    if last_day < first_day or (last_day - first_day).days >= 31:
+        return None, JsonResponse({'error': 'Date range must cover 1 to 31 days'}, status=400)
+    if not 5 <= slot_minutes <= 240:
+        return None, JsonResponse({'error': 'Slot must be between 5 and 240 minutes'}, status=400)
+    if grid_format not in ('bits', 'runs'):
+        return None, JsonResponse({'error': "Format must be 'bits' or 'runs'"}, status=400)
+
+    return (first_day, last_day, slot_minutes, grid_format), None
+
+def _grid_response(grid, slot_minutes, grid_format):
+    encode = encode_bits if grid_format == 'bits' else encode_runs
+    slot_count = grid['slot_count']
+
+    days = []
+    for offset, day_start in enumerate(grid['slot_starts']):
+        days.append({
+            'date': day_start.date().isoformat(),
+            'start': day_start.isoformat(),
+            'open': opening_hours(day_start.date()),
+            'booked': {
+                str(table_id): encode(grid['bitmaps'][table_id][offset], slot_count)
+                for table_id, _, _ in grid['tables']
+            },
         })
 
-    return JsonResponse({'tables': tables})
+    return JsonResponse({
+        'slot_minutes': slot_minutes,
+        'slot_count': slot_count,
+        'format': grid_format,
+        'tables': [
+            {'id': table_id, 'name': name, 'seats': seats}
+            for table_id, name, seats in grid['tables']
+        ],
+        'days': days,
+    })
+
+@login_required
+def availability_grid(request):
+    params, error = _grid_params(request)
+    if error:
+        return error
+    first_day, last_day, slot_minutes, grid_format = params
+
+    grid = build_availability_grid(first_day, last_day, slot_minutes)
+    return _grid_response(grid, slot_minutes, grid_format)
+
+@login_required
+async def availability_grid_async(request):
+    params, error = _grid_params(request)
+    if error:
+        return error
+    first_day, last_day, slot_minutes, grid_format = params
+
+    grid = await aavailability_grid(first_day, last_day, slot_minutes)
+    return _grid_response(grid, slot_minutes, grid_format)
+
+
+# ------------------ Live Availability (SSE) ------------------
+@login_required
+async def availability_stream(request):
+    """Server-sent events with the bookings of ``?date=`` (default today), then live deltas.
+
+    The stream never ends, so it is only served under ASGI; a WSGI worker
+    would hold its thread forever while buffering an async iterator.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'error': 'Live availability needs the ASGI server (ResturantTableBooking.asgi)'}, status=501)
+    try:
+        day = datetime.strptime(request.GET['date'], '%Y-%m-%d').date() if request.GET.get('date') \
+            else timezone.localdate()
+    except ValueError:
+        return JsonResponse({'error': 'Invalid date format'}, status=400)
+
+    response = StreamingHttpResponse(live.event_stream(day), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+# ------------------ Internal: Profiling ------------------
+@login_required
+def profiling_stats(request):
+    """Per-view latency/query histograms of this worker process; POST clears them."""
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Staff only'}, status=403)
+    if request.method == 'POST':
+        profiling.registry.reset()
+    return JsonResponse(profiling.registry.snapshot())
@@ -96,6 +96,7 @@ SIMPLE_JWT = {
 }
 
 MIDDLEWARE = [
+    'Resturant.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -126,6 +127,9 @@ TEMPLATES = [
 
 
 WSGI_APPLICATION = 'ResturantTableBooking.wsgi.application'
+# Serve with an ASGI server (e.g. `uvicorn ResturantTableBooking.asgi:application`) so the
+# streaming /live/availability/ endpoint works; under WSGI it answers 501
+ASGI_APPLICATION = 'ResturantTableBooking.asgi.application'
 
 
 # Database
@@ -142,6 +146,11 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Take the write lock at BEGIN so concurrent bookings queue instead of racing
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     }
 }
 
@@ -196,3 +205,50 @@ LOGIN_URL = 'login'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LOGOUT_URL = 'logout'
+
+# Seconds before the in-memory availability index is reloaded from the database
+# (picks up reservations written by other worker processes)
+AVAILABILITY_INDEX_MAX_AGE = 60
+
+# Cache alias shared by all workers for the menu catalog; None keeps it process-local,
+# which is only exact with a single worker process
+MENU_CACHE_ALIAS = None
+# Seconds before a process-local menu catalog is reloaded (picks up edits made by other workers)
+MENU_CACHE_MAX_AGE = 60
+
+# Seconds before the table name autocomplete index is rebuilt (picks up other workers' edits)
+TABLE_NAMES_MAX_AGE = 60
+
+# Auto-assigned tables prefer the one whose neighbouring bookings leave the least idle time
+TABLE_ASSIGNMENT_PACK = False
+
+# Days before and after the requested one searched for alternative reservation times
+SUGGESTION_SEARCH_DAYS = 3
+
+# Pub/sub behind /live/availability/; 'Resturant.live.PostgresBroker' shares events between workers
+LIVE_BROKER = 'Resturant.live.LocalBroker'
+# Seconds between keep-alive comments on idle event streams
+LIVE_HEARTBEAT_SECONDS = 15
+
+# Opening hours per weekday as ('HH:MM', 'HH:MM') intervals; an empty list closes the day
+OPENING_HOURS = {
+    'monday': [('08:00', '23:00')],
+    'tuesday': [('08:00', '23:00')],
+    'wednesday': [('08:00', '23:00')],
+    'thursday': [('08:00', '23:00')],
+    'friday': [('08:00', '23:00')],
+    'saturday': [],
+    'sunday': [('08:00', '23:00')],
+}
+# Holidays and closures: 'YYYY-MM-DD' dates or ('YYYY-MM-DD', 'YYYY-MM-DD') inclusive ranges
+CLOSED_DATES = []
+# Dates with their own hours, overriding OPENING_HOURS: {'YYYY-MM-DD': [('HH:MM', 'HH:MM')]}
+SPECIAL_HOURS = {}
+
+# Per-view query/latency profiling (Resturant.profiling), served at /internal/profiling/
+PROFILING_ENABLED = True
+PROFILING_SLOW_QUERIES = 5
+# Value of the X-Profile request header that triggers a cProfile dump outside DEBUG; None disables it
+PROFILING_TOKEN = None
+# Directory for the .prof dumps; None uses the system temp directory
+PROFILING_DUMP_DIR = None